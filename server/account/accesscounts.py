@@ -0,0 +1,87 @@
+"""
+Counts of the requests which the access log policy does not log.
+
+TrackingMiddleware hands such requests to `access_counter.count()`, which
+only increments an in-process counter by (date, URL name). A background
+thread adds the counters to `AccessCount` rows every
+`ACCESS_COUNT_FLUSH_INTERVAL` seconds with `count = count + n`, which is
+safe for any number of workers flushing into the same row.
+
+Requests whose path resolves to no URL name are counted together under
+`AccessCount.UNRESOLVED`, so that scans of random paths add no rows.
+Counts since the last flush are lost when a worker dies.
+"""
+import logging
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, router, transaction
+from django.db.models import F
+from .flushing import PeriodicFlusher
+from .models import AccessCount
+
+
+logger = logging.getLogger(__name__)
+
+
+def add_count(date, name, count):
+    """
+    Adds to the stored count of a day and URL name
+    """
+    using = router.db_for_write(AccessCount)
+    rows = AccessCount.objects.using(using)
+    for attempt in range(2):
+        try:
+            with transaction.atomic(using=using):
+                if not rows.filter(date=date, name=name).update(count=F('count') + count):
+                    rows.create(date=date, name=name, count=count)
+            return
+        except IntegrityError:
+            # the row was created by another worker, add to it
+            if attempt:
+                raise
+
+
+class AccessCounter:
+    def __init__(self, flush_interval=None):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._flusher = PeriodicFlusher(self.flush, flush_interval, 'access-count-flusher') if flush_interval else None
+
+    def count(self, date, url_name):
+        with self._lock:
+            self._counts[date, url_name or AccessCount.UNRESOLVED] += 1
+        if self._flusher is not None:
+            self._flusher.start()
+
+    def take(self):
+        """
+        Returns the counts since the last call, by (date, URL name)
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def restore(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+    def flush(self):
+        """
+        Adds the counts to the stored ones, counts which fail to be stored
+        are kept for the next flush
+        """
+        counts = self.take()
+        failed = Counter()
+        for (date, name), count in sorted(counts.items()):
+            try:
+                add_count(date, name, count)
+            except DatabaseError:
+                logger.exception('Failed to store access count of %s (%s)', date, name)
+                failed[date, name] = count
+        if failed:
+            self.restore(failed)
+        return len(counts) - len(failed)
+
+
+access_counter = AccessCounter(getattr(settings, 'ACCESS_COUNT_FLUSH_INTERVAL', None))
@@ -0,0 +1,127 @@
+"""
+Coalesced "last seen" times of users.
+
+TrackingMiddleware hands every authenticated request to
+`activity_tracker.seen()`, which only remembers the time in an in-process
+dict. A background thread flushes the remembered times every
+`ACTIVITY_FLUSH_INTERVAL` seconds with one `UPDATE ... SET last_seen =
+CASE id WHEN ... END` per batch of users.
+
+A user's row is written at most once per `ACTIVITY_WRITE_INTERVAL`
+seconds by all workers together: the worker which writes it claims the
+user in the shared cache for that long, others keep their times until the
+claim expires. `User.last_seen` is therefore up to the write interval
+plus a flush interval behind. The UPDATE sends no signals, so it does not
+change the user's version for conditional GETs (see account.conditional),
+and last_seen is left out of the payloads those serve.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from .flushing import PeriodicFlusher
+
+
+logger = logging.getLogger(__name__)
+
+# users per UPDATE
+BATCH_SIZE = 500
+
+
+def later_of(when):
+    when = Value(when, output_field=DateTimeField())
+    # Greatest() is NULL when any argument is on some databases
+    return Greatest(Coalesce(F('last_seen'), when), when)
+
+
+def write_last_seen(times):
+    """
+    Sets last_seen from {user id: timestamp}, one UPDATE per batch. Times
+    older than the stored ones are ignored, e.g. those of a worker which
+    claimed a user after a newer time was written.
+    """
+    items = sorted(times.items())
+    updated = 0
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start:start + BATCH_SIZE]
+        last_seen = Case(
+            *[When(pk=pk, then=later_of(datetime.fromtimestamp(seen, dt_timezone.utc))) for pk, seen in batch],
+            output_field=DateTimeField(),
+        )
+        updated += get_user_model().objects.filter(pk__in=[pk for pk, _ in batch]).update(last_seen=last_seen)
+    return updated
+
+
+class ActivityTracker:
+    key_prefix = 'account:last-seen-claim:'
+
+    def __init__(self, flush_interval=None, write_interval=300):
+        self.flush_interval = flush_interval
+        self.write_interval = write_interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flusher = PeriodicFlusher(self.flush, flush_interval, 'activity-flusher') if flush_interval else None
+
+    def seen(self, user_id, when=None):
+        when = time.time() if when is None else when
+        with self._lock:
+            if when > self._pending.get(user_id, 0):
+                self._pending[user_id] = when
+        if self._flusher is not None:
+            self._flusher.start()
+
+    def claim(self, user_ids):
+        """
+        Returns the users this process may write now, claiming them for the write interval
+        """
+        if not self.write_interval:
+            return list(user_ids)
+        return [pk for pk in user_ids if cache.add(self.key_prefix + str(pk), 1, self.write_interval)]
+
+    def flush(self):
+        """
+        Writes the remembered times of the users this process can claim,
+        returns the number of written users. Other times are kept for the
+        next flush.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        try:
+            times = {pk: pending[pk] for pk in self.claim(pending)}
+        except Exception:
+            # e.g. the cache is unavailable, everything is kept for the next flush
+            logger.exception('Failed to claim last seen times of %d users', len(pending))
+            times = {}
+        written = 0
+        if times:
+            try:
+                write_last_seen(times)
+            except DatabaseError:
+                logger.exception('Failed to store last seen times of %d users', len(times))
+                # claimable again by the next flush
+                cache.delete_many([self.key_prefix + str(pk) for pk in times])
+            else:
+                for pk in times:
+                    del pending[pk]
+                written = len(times)
+
+        with self._lock:
+            for pk, seen in pending.items():
+                if seen > self._pending.get(pk, 0):
+                    self._pending[pk] = seen
+        return written
+
+    def __len__(self):
+        return len(self._pending)
+
+
+activity_tracker = ActivityTracker(
+    getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', None),
+    getattr(settings, 'ACTIVITY_WRITE_INTERVAL', 300),
+)
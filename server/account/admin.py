@@ -1,3 +1,209 @@
+import calendar
+from datetime import date
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .deletion import request_deletion
+from .models import (
+    AccessLog,
+    AccountDeletion,
+    User,
+    SignupRouteCategory,
+    UserRouteMap,
+    DropoutReasonCategory,
+    UserDropoutReasonMap,
+)
 
-# Register your models here.
+
+def estimate_row_count(model, using):
+    """
+    Cheap row count estimate of the whole table, from planner statistics
+    where available, or else from the highest primary key
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+    return model._base_manager.using(using).aggregate(count=Max('pk'))['count'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which never runs an unbounded COUNT(*).
+
+    Unfiltered changelists of large tables use an estimate, filtered ones are
+    counted up to `count_limit` rows.
+    """
+    estimate_threshold = 100000
+    count_limit = 10000
+
+    def __init__(self, object_list, *args, **kwargs):
+        # pages of an unordered queryset are not stable, newest rows first
+        if isinstance(object_list, QuerySet) and not object_list.ordered:
+            object_list = object_list.order_by('-pk')
+        super().__init__(object_list, *args, **kwargs)
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+            return super().count
+        return queryset.order_by()[:self.count_limit].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class CreatedMonthFilter(admin.SimpleListFilter):
+    """
+    Filters on the indexed month bucket, offering recent months without querying the table
+    """
+    title = 'month'
+    parameter_name = 'created_month'
+    months = 12
+
+    def lookups(self, request, model_admin):
+        today = timezone.localdate()
+        year, month = today.year, today.month
+        choices = []
+        for _ in range(self.months):
+            bucket = '{:04d}-{:02d}'.format(year, month)
+            choices.append((bucket, bucket))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        return choices
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(created_month=self.value())
+        return queryset
+
+
+class CreatedDateFilter(admin.SimpleListFilter):
+    """
+    Filters on the indexed date bucket, drilling down from the selected month
+    """
+    title = 'date'
+    parameter_name = 'created_date'
+
+    def lookups(self, request, model_admin):
+        try:
+            year, month = map(int, request.GET['created_month'].split('-'))
+            days = calendar.monthrange(year, month)[1]
+        except (KeyError, ValueError, calendar.IllegalMonthError):
+            return ()
+        return [
+            (bucket, bucket) for bucket in (
+                date(year, month, day).isoformat() for day in range(days, 0, -1)
+            )
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(created_date=self.value())
+        return queryset
+
+
+class StatusClassFilter(admin.SimpleListFilter):
+    title = 'status'
+    parameter_name = 'status_class'
+
+    def lookups(self, request, model_admin):
+        return [(str(status_class), '{}xx'.format(status_class)) for status_class in range(1, 6)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            status_class = int(self.value())
+            return queryset.filter(status_code__gte=status_class * 100, status_code__lt=(status_class + 1) * 100)
+        return queryset
+
+
+@admin.register(AccessLog)
+class AccessLogAdmin(LargeTableAdmin):
+    list_display = (
+        'created', 'request_method', 'uri', 'status_code',
+        'latency', 'ip_addr', 'user_id',
+    )
+    list_filter = (CreatedMonthFilter, CreatedDateFilter, StatusClassFilter)
+    # users may live in another database than access logs, they are not joined
+    list_select_related = ('requested_uri_ref',)
+    raw_id_fields = ('user', 'requested_uri_ref', 'referer_ref', 'user_agent_ref')
+    ordering = ('-id',)
+
+    def uri(self, obj):
+        # rows not yet converted by compact_access_logs keep the legacy column
+        return obj.requested_uri_ref.value if obj.requested_uri_ref_id else obj.requested_uri
+    uri.short_description = 'requested uri'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class UserRouteMapInline(admin.TabularInline):
+    model = UserRouteMap
+    fields = ('category', 'description')
+    raw_id_fields = ('category',)
+    extra = 0
+
+
+class UserDropoutReasonMapInline(admin.TabularInline):
+    model = UserDropoutReasonMap
+    fields = ('category', 'description')
+    raw_id_fields = ('category',)
+    extra = 0
+
+
+@admin.register(User)
+class UserAdmin(LargeTableAdmin):
+    list_display = ('email', 'is_active', 'is_verified', 'is_staff', 'date_joined', 'last_login', 'last_seen')
+    list_filter = ('is_active', 'is_verified', 'is_staff')
+    search_fields = ('^email',)
+    ordering = ('-date_joined', '-id')
+    fields = (
+        'email', 'is_active', 'is_verified', 'is_staff', 'is_superuser',
+        'groups', 'user_permissions', 'date_joined', 'last_login', 'last_seen',
+    )
+    readonly_fields = ('date_joined', 'last_login', 'last_seen')
+    filter_horizontal = ('groups', 'user_permissions')
+    inlines = (UserRouteMapInline, UserDropoutReasonMapInline)
+
+    # deactivated now, deleted in batches by run_account_deletions
+    def delete_model(self, request, obj):
+        request_deletion(obj, by=request.user.email)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            request_deletion(user, by=request.user.email)
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'state', 'step', 'processed', 'requested', 'requested_by', 'finished')
+    list_filter = ('state',)
+    ordering = ('-requested',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SignupRouteCategory, DropoutReasonCategory)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'created', 'updated')
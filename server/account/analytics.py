@@ -0,0 +1,211 @@
+"""
+Vectorized access log statistics.
+
+Rows are streamed from the database in primary key chunks of `values_list`
+tuples and turned into NumPy columns. Per-URI counts, error rates and
+latency percentiles are then computed on the whole period at once, and
+distinct IPs and users per day are estimated with HyperLogLog sketches.
+
+Counts are weighted by `sample_weight`, so sampled rows stand for the
+requests they replaced. Distinct counts can only see logged rows.
+"""
+from datetime import timedelta
+import numpy as np
+from django.utils import timezone
+from .dictionaries import requested_uris
+from .models import AccessLog
+from .sketches import HyperLogLog
+
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+STREAMED_FIELDS = (
+    'created_date', 'requested_uri_ref_id', 'requested_uri',
+    'status_code', 'latency', 'sample_weight', 'ip_addr', 'user_id',
+)
+
+
+def weighted_percentiles(values, weights, percentiles):
+    """
+    Returns percentiles of values, each value counting as its weight
+    """
+    if not len(values):
+        return [None for _ in percentiles]
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    cumulative = np.cumsum(weights, dtype='float64')
+    targets = np.asarray(percentiles, dtype='float64') / 100 * cumulative[-1]
+    indexes = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(values) - 1)
+    return [values[index].item() for index in indexes]
+
+
+def grouped_percentiles(groups, values, weights, percentiles, group_count):
+    """
+    Returns a (group_count, len(percentiles)) array of weighted percentiles of
+    values per group, NaN for empty groups. `groups` are codes in [0, group_count).
+    """
+    result = np.full((group_count, len(percentiles)), np.nan)
+    if not len(values):
+        return result
+    order = np.lexsort((values, groups))
+    groups, values, weights = groups[order], values[order], weights[order]
+    cumulative = np.cumsum(weights, dtype='float64')
+
+    sizes = np.bincount(groups, minlength=group_count)
+    totals = np.bincount(groups, weights=weights, minlength=group_count)
+    ends = np.cumsum(sizes)
+    firsts, lasts = ends - sizes, ends - 1
+    before = np.cumsum(totals) - totals
+    present = sizes > 0
+    for column, percentile in enumerate(percentiles):
+        targets = before + totals * (percentile / 100)
+        indexes = np.searchsorted(cumulative, targets, side='left')
+        # rounding must not step into a neighbouring group
+        indexes = np.clip(indexes, firsts, np.maximum(lasts, firsts))
+        result[present, column] = values[indexes[present]]
+    return result
+
+
+def stream(queryset, fields, chunk_size=10000):
+    """
+    Yields lists of columns of `fields` for chunks of rows, in primary key order
+    """
+    queryset = queryset.order_by('pk').values_list('pk', *fields)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield [list(column) for column in zip(*rows)][1:]
+
+
+def as_array(values, dtype, missing=0):
+    return np.fromiter((missing if value is None else value for value in values), dtype=dtype, count=len(values))
+
+
+class AccessLogStats:
+    """
+    Accumulates streamed chunks, `result()` computes the statistics
+    """
+    def __init__(self, percentiles=DEFAULT_PERCENTILES):
+        self.percentiles = tuple(percentiles)
+        self.days = {}
+        self.day_sketches = []
+        self.legacy_uris = {}
+        self.chunks = []
+
+    def code_days(self, dates):
+        days = self.days
+        for date in dates:
+            if date not in days:
+                days[date] = len(days)
+                self.day_sketches.append((HyperLogLog(), HyperLogLog()))
+        return as_array([days[date] for date in dates], np.int32)
+
+    def code_uris(self, ref_ids, legacy):
+        """
+        URIs are coded by dictionary id, legacy strings get negative codes
+        """
+        codes = as_array(ref_ids, np.int64)
+        for index in np.flatnonzero(codes == 0):
+            value = legacy[index]
+            if value:
+                codes[index] = -self.legacy_uris.setdefault(value, len(self.legacy_uris) + 1)
+        return codes
+
+    def add(self, columns):
+        dates, ref_ids, legacy_uris, status_codes, latencies, weights, ip_addrs, user_ids = columns
+        days = self.code_days(dates)
+        user_ids = as_array(user_ids, np.int64)
+        ip_addrs = np.array(ip_addrs, dtype=object)
+        for day in np.unique(days):
+            ips, users = self.day_sketches[day]
+            in_day = days == day
+            ips.add_strings(ip_addrs[in_day])
+            users.add_integers(user_ids[in_day & (user_ids != 0)])
+
+        self.chunks.append((
+            days,
+            self.code_uris(ref_ids, legacy_uris),
+            as_array(status_codes, np.int16),
+            as_array(latencies, np.int32, missing=-1),
+            as_array(weights, np.float64),
+        ))
+
+    def uri_values(self, codes):
+        values = requested_uris.values_for(code.item() for code in codes if code > 0)
+        legacy = {code: value for value, code in self.legacy_uris.items()}
+        return [values.get(code, '') if code > 0 else legacy.get(-code, '') for code in codes.tolist()]
+
+    def result(self, top=None):
+        if self.chunks:
+            days, uris, status_codes, latencies, weights = (np.concatenate(column) for column in zip(*self.chunks))
+        else:
+            days = uris = status_codes = latencies = np.empty(0, dtype=np.int64)
+            weights = np.empty(0)
+        errors = status_codes >= 500
+        timed = latencies >= 0
+        labels = ['p{}'.format(percentile) for percentile in self.percentiles]
+
+        # per URI, most requested first
+        codes, groups = np.unique(uris, return_inverse=True)
+        groups = groups.reshape(-1)
+        requests = np.bincount(groups, weights=weights, minlength=len(codes))
+        failed = np.bincount(groups, weights=weights * errors, minlength=len(codes))
+        latency = grouped_percentiles(groups[timed], latencies[timed], weights[timed], self.percentiles, len(codes))
+        order = np.argsort(-requests, kind='stable')[:top]
+        values = self.uri_values(codes[order])
+        per_uri = [
+            {
+                'uri': value,
+                'requests': requests[index].item(),
+                'error_rate': (failed[index] / requests[index]).item(),
+                'latency': {
+                    label: None if np.isnan(latency[index, column]) else int(latency[index, column])
+                    for column, label in enumerate(labels)
+                },
+            }
+            for value, index in zip(values, order)
+        ]
+
+        # per day
+        day_requests = np.bincount(days, weights=weights, minlength=len(self.days))
+        per_day = [
+            {
+                'date': date,
+                'requests': day_requests[code].item(),
+                'unique_ips': self.day_sketches[code][0].count(),
+                'unique_users': self.day_sketches[code][1].count(),
+            }
+            for date, code in sorted(self.days.items())
+        ]
+
+        total = weights.sum().item()
+        return {
+            'requests': total,
+            'error_rate': (weights[errors].sum() / total).item() if total else 0.0,
+            'latency': dict(zip(labels, weighted_percentiles(latencies[timed], weights[timed], self.percentiles))),
+            'uris': per_uri,
+            'days': per_day,
+        }
+
+
+def summarize(queryset=None, since=None, until=None, top=20, percentiles=DEFAULT_PERCENTILES, chunk_size=10000):
+    """
+    Returns access log statistics of [since, until] (dates, inclusive),
+    by default of the last 7 days
+    """
+    until = until or timezone.localdate()
+    since = since or until - timedelta(days=6)
+    if queryset is None:
+        queryset = AccessLog.objects.all()
+    queryset = queryset.filter(created_date__gte=since.isoformat(), created_date__lte=until.isoformat())
+
+    stats = AccessLogStats(percentiles)
+    for columns in stream(queryset, STREAMED_FIELDS, chunk_size):
+        stats.add(columns)
+    result = stats.result(top)
+    result.update(since=since.isoformat(), until=until.isoformat())
+    return result
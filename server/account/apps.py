@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class AccountConfig(AppConfig):
     name = 'account'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import install_connection_handlers
+        from .keys import install_token_backend
+        install_connection_handlers()
+        install_token_backend()
@@ -0,0 +1,370 @@
+"""
+Columnar archive of closed access log months.
+
+Each month lives in `settings.ACCESS_LOG_ARCHIVE_DIR/<YYYY-MM>/` as one
+`.npy` file per column plus `meta.json`. String columns are dictionary
+encoded per month: the `.npy` file holds codes, in the smallest unsigned
+type that fits, into the month's string table. A table is stored as its
+UTF-8 values back to back in `<column>.strings` and their int64 offsets in
+`<column>.offsets.npy`, as columns like `query_string` have about as many
+distinct values as rows. Everything is opened memory-mapped, so queries
+only page in the columns they touch, filter them vectorized, and decode
+only the strings they return.
+
+Missing values are stored as 0 for `status_code` and `user_id` and as -1
+for `latency`.
+"""
+import json
+import os
+import shutil
+import numpy as np
+from django.conf import settings
+from django.db.models import Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+from .analytics import weighted_percentiles
+from .middleware.policy import compile_status
+from .models import AccessLog
+
+
+META_FILE = 'meta.json'
+OFFSETS_SUFFIX = '.offsets.npy'
+STRINGS_SUFFIX = '.strings'
+
+NUMERIC_COLUMNS = (
+    ('id', 'int64'),
+    ('created', 'datetime64[us]'),  # UTC
+    ('day', 'uint8'),  # local day of the month
+    ('status_code', 'int16'),
+    ('latency', 'int32'),
+    ('user_id', 'int64'),
+    ('sample_weight', 'float32'),
+)
+
+STRING_COLUMNS = (
+    'request_method',
+    'requested_uri',
+    'query_string',
+    'referer',
+    'user_agent',
+    'ip_addr',
+    'comment',
+)
+
+
+def code_dtype(count):
+    """
+    Smallest unsigned type holding the codes of a table of `count` strings
+    """
+    return np.min_scalar_type(max(count - 1, 0))
+
+
+def write_strings(path, name, values):
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='int64')
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(os.path.join(path, name + OFFSETS_SUFFIX), offsets)
+    with open(os.path.join(path, name + STRINGS_SUFFIX), 'wb') as f:
+        f.writelines(encoded)
+
+
+class StringTable:
+    """
+    String table of an archived column, decoded from its memory-mapped files on access
+    """
+    def __init__(self, path, name):
+        self.offsets = np.load(os.path.join(path, name + OFFSETS_SUFFIX), mmap_mode='r')
+        strings_path = os.path.join(path, name + STRINGS_SUFFIX)
+        # empty files cannot be mapped
+        if os.path.getsize(strings_path):
+            self.data = np.memmap(strings_path, dtype='uint8', mode='r')
+        else:
+            self.data = np.empty(0, dtype='uint8')
+        self._codes = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        return self.data[self.offsets[code]:self.offsets[code + 1]].tobytes().decode()
+
+    def __iter__(self):
+        return (self[code] for code in range(len(self)))
+
+    def __contains__(self, value):
+        return self.code(value) is not None
+
+    def code(self, value):
+        """
+        Returns the code of a string, None when it never occurs
+        """
+        if self._codes is None:
+            # built on the first lookup, most queries never need it
+            self._codes = {value: code for code, value in enumerate(self)}
+        return self._codes.get(value)
+
+    def take(self, codes):
+        """
+        Returns the strings of an array of codes as an object array, decoding each distinct code once
+        """
+        distinct, inverse = np.unique(codes, return_inverse=True)
+        return np.array([self[code] for code in distinct], dtype=object)[inverse]
+
+
+def archive_directory():
+    return str(settings.ACCESS_LOG_ARCHIVE_DIR)
+
+
+def month_rows(month):
+    """
+    Returns a values_list queryset of the rows of a month, strings read from
+    the legacy columns or, for compacted rows, from the dictionaries
+    """
+    return AccessLog.objects.filter(created_month=month).annotate(
+        uri_value=Coalesce(NullIf('requested_uri', Value('')), 'requested_uri_ref__value'),
+        referer_value=Coalesce(NullIf('referer', Value('')), 'referer_ref__value'),
+        user_agent_value=Coalesce(NullIf('user_agent', Value('')), 'user_agent_ref__value'),
+    ).order_by('pk').values_list(
+        'id', 'created', 'status_code', 'latency', 'user_id', 'sample_weight',
+        'request_method', 'uri_value', 'query_string', 'referer_value', 'user_agent_value',
+        'ip_addr', 'comment',
+    )
+
+
+class MonthWriter:
+    """
+    Writes the rows of a month into a directory, `count` rows at most
+    """
+    def __init__(self, path, count):
+        os.makedirs(path)
+        self.path = path
+        self.count = 0
+        columns = list(NUMERIC_COLUMNS) + [(name, 'int32') for name in STRING_COLUMNS]
+        self.arrays = {
+            name: np.lib.format.open_memmap(os.path.join(path, name + '.npy'), mode='w+', dtype=dtype, shape=(count,))
+            for name, dtype in columns
+        }
+        self.codes = {name: {} for name in STRING_COLUMNS}
+
+    def encode(self, name, values):
+        codes = self.codes[name]
+        return [codes.setdefault(value or '', len(codes)) for value in values]
+
+    def write(self, rows):
+        start, end = self.count, self.count + len(rows)
+        columns = list(zip(*rows))
+        ids, created, status_codes, latencies, user_ids, weights = columns[:6]
+        local = [timezone.localtime(value) for value in created]
+
+        arrays = self.arrays
+        arrays['id'][start:end] = ids
+        arrays['created'][start:end] = [timezone.make_naive(value, timezone.utc) for value in created]
+        arrays['day'][start:end] = [value.day for value in local]
+        arrays['status_code'][start:end] = [0 if value is None else value for value in status_codes]
+        arrays['latency'][start:end] = [-1 if value is None else value for value in latencies]
+        arrays['user_id'][start:end] = [0 if value is None else value for value in user_ids]
+        arrays['sample_weight'][start:end] = weights
+        for name, values in zip(STRING_COLUMNS, columns[6:]):
+            arrays[name][start:end] = self.encode(name, values)
+        self.count = end
+
+    def close(self, month):
+        for array in self.arrays.values():
+            array.flush()
+        for name, codes in self.codes.items():
+            dtype = code_dtype(len(codes))
+            if dtype != self.arrays[name].dtype:
+                narrowed_path = os.path.join(self.path, name + '.narrowed.npy')
+                np.save(narrowed_path, self.arrays.pop(name).astype(dtype))
+                os.replace(narrowed_path, os.path.join(self.path, name + '.npy'))
+            write_strings(self.path, name, codes)
+        self.arrays = {}
+        meta = {
+            'month': month,
+            'rows': self.count,
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+
+def write_month(month, directory=None, chunk_size=5000):
+    """
+    Archives a month, returns the number of archived rows. The month is
+    written into a temporary directory which is renamed when complete.
+    """
+    directory = directory or archive_directory()
+    rows = month_rows(month)
+    last_pk = rows.order_by('-pk').values_list('pk', flat=True).first()
+    if last_pk is None:
+        return 0
+    rows = rows.filter(pk__lte=last_pk)
+    count = rows.count()
+
+    path = os.path.join(directory, month)
+    tmp_path = '{}.tmp-{}'.format(path, os.getpid())
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    writer = MonthWriter(tmp_path, count)
+    after = 0
+    while writer.count < count:
+        chunk = list(rows.filter(pk__gt=after)[:min(chunk_size, count - writer.count)])
+        if not chunk:
+            break
+        writer.write(chunk)
+        after = chunk[-1][0]
+    if writer.count != count:
+        shutil.rmtree(tmp_path)
+        raise RuntimeError('Rows of {} changed while archiving'.format(month))
+    writer.close(month)
+    os.replace(tmp_path, path)
+    return count
+
+
+class ArchivedMonth:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.month = meta['month']
+        self.rows = meta['rows']
+        self._columns = {}
+        self._strings = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        """
+        Returns a column as a read-only memory-mapped array
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            column = np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+            self._columns[name] = column
+            return column
+
+    def strings(self, name):
+        """
+        Returns the StringTable of a string column
+        """
+        try:
+            return self._strings[name]
+        except KeyError:
+            table = StringTable(self.path, name)
+            self._strings[name] = table
+            return table
+
+    def code(self, name, value):
+        """
+        Returns the code of a string in a column, None when it never occurs
+        """
+        return self.strings(name).code(value)
+
+    def equals(self, name, value):
+        """
+        Returns a boolean mask of the rows whose string column equals `value`
+        """
+        code = self.code(name, value)
+        if code is None:
+            return np.zeros(self.rows, dtype=bool)
+        return self[name] == code
+
+    def where(self, status=None, uri=None, method=None, since=None, until=None, min_latency=None):
+        """
+        Returns a boolean mask of the rows matching all given conditions,
+        `status` accepts what access log policies do (404, '5xx' or a list)
+        """
+        mask = np.ones(self.rows, dtype=bool)
+        if status is not None:
+            codes = self['status_code']
+            matched = np.zeros(self.rows, dtype=bool)
+            for low, high in compile_status(status):
+                matched |= (codes >= low) & (codes < high)
+            mask &= matched
+        if uri is not None:
+            mask &= self.equals('requested_uri', uri)
+        if method is not None:
+            mask &= self.equals('request_method', method.upper())
+        if since is not None:
+            mask &= self['created'] >= np.datetime64(timezone.make_naive(since, timezone.utc), 'us')
+        if until is not None:
+            mask &= self['created'] < np.datetime64(timezone.make_naive(until, timezone.utc), 'us')
+        if min_latency is not None:
+            mask &= self['latency'] >= min_latency
+        return mask
+
+
+class AccessLogArchive:
+    def __init__(self, directory=None):
+        self.directory = directory or archive_directory()
+
+    def months(self, start=None, end=None):
+        """
+        Returns archived months in [start, end], both YYYY-MM and optional
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        months = sorted(
+            name for name in os.listdir(self.directory)
+            if len(name) == 7 and os.path.isfile(os.path.join(self.directory, name, META_FILE))
+        )
+        return [month for month in months if (start is None or month >= start) and (end is None or month <= end)]
+
+    def month(self, month):
+        return ArchivedMonth(os.path.join(self.directory, month))
+
+    def select(self, columns, start=None, end=None, **conditions):
+        """
+        Returns the given columns of the matching rows of archived months,
+        concatenated; string columns come back decoded as object arrays
+        """
+        parts = {name: [] for name in columns}
+        for month in self.months(start, end):
+            archived = self.month(month)
+            mask = archived.where(**conditions)
+            for name in columns:
+                values = archived[name][mask]
+                if name in STRING_COLUMNS:
+                    values = archived.strings(name).take(values)
+                parts[name].append(values)
+        return {
+            name: np.concatenate(values) if values else np.empty(0)
+            for name, values in parts.items()
+        }
+
+
+def latency_percentiles(archive, percentiles=(50, 90, 99), start=None, end=None, **conditions):
+    """
+    Returns {percentile: latency in ms} over archived months, rows weighted
+    by their sample weight
+    """
+    selected = archive.select(('latency', 'sample_weight'), start, end, **conditions)
+    known = selected['latency'] >= 0
+    values = weighted_percentiles(selected['latency'][known], selected['sample_weight'][known], percentiles)
+    return dict(zip(percentiles, values))
+
+
+def status_counts(archive, start=None, end=None, **conditions):
+    """
+    Returns {status code: estimated number of requests} over archived months
+    """
+    selected = archive.select(('status_code', 'sample_weight'), start, end, **conditions)
+    statuses, inverse = np.unique(selected['status_code'], return_inverse=True)
+    counts = np.bincount(inverse, weights=selected['sample_weight'])
+    return {int(status) or None: float(count) for status, count in zip(statuses, counts)}
+
+
+def counts_by(archive, column, start=None, end=None, **conditions):
+    """
+    Returns {value: estimated number of requests} of a string column over
+    archived months, most requested first
+    """
+    counts = {}
+    for month in archive.months(start, end):
+        archived = archive.month(month)
+        mask = archived.where(**conditions)
+        strings = archived.strings(column)
+        totals = np.bincount(archived[column][mask], weights=archived['sample_weight'][mask], minlength=len(strings))
+        for code in np.flatnonzero(totals):
+            counts[strings[code]] = counts.get(strings[code], 0.0) + float(totals[code])
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
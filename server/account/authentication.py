@@ -0,0 +1,13 @@
+from rest_framework_simplejwt import authentication
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    Reuses the token which account.conditional validated before authentication,
+    instead of decoding and verifying it again
+    """
+    def authenticate(self, request):
+        validated_token = getattr(request, 'validated_token', None)
+        if validated_token is None:
+            return super().authenticate(request)
+        return self.get_user(validated_token), validated_token
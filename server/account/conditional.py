@@ -0,0 +1,147 @@
+"""
+Conditional GET for responses derived from versioned data.
+
+Every piece of data a response is built from has a version counter in
+the shared cache, bumped on every change (see account.signals). A view's
+ETag is made of these counters only, so answering `If-None-Match` with
+304 costs a few cache reads. For JWT authenticated requests the user id
+is taken from the validated token before authentication loads the user,
+which lets the 304 path skip the database entirely. Authentication then
+reuses that token. Deactivating a user bumps its version like any other
+change, so its old tags are never answered with 304.
+
+Tags are weak: responses like `MeView`'s mint fresh tokens every time, so
+equal tags mean equal data, not identical bytes.
+"""
+import time
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+class VersionCounter:
+    """
+    Version number of some data, shared by all workers through the cache.
+
+    Counters start from the current time in milliseconds rather than 1, so
+    a counter lost to eviction or expiry never comes back with a version
+    handed out before.
+    """
+    def __init__(self, key, timeout=None):
+        self.key = key
+        self.timeout = timeout
+
+    def get(self):
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, int(time.time() * 1000), self.timeout)
+            version = cache.get(self.key)
+        return version
+
+    def bump(self):
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            # not set yet, or evicted
+            cache.set(self.key, int(time.time() * 1000), self.timeout)
+
+
+# users who did not change for a day start over with a new version
+USER_VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def user_version(pk):
+    return VersionCounter('account:user:{}:version'.format(pk), USER_VERSION_TIMEOUT)
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # weak comparison
+    tags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(header)]
+    return '*' in tags or etag in tags
+
+
+def token_user_id(request):
+    """
+    Returns the user id of a valid JWT sent with the request, without loading
+    the user. The token is kept as `request.validated_token`, which
+    account.authentication.JWTAuthentication reuses.
+    """
+    for authenticator in request.authenticators:
+        if not isinstance(authenticator, JWTAuthentication):
+            continue
+        header = authenticator.get_header(request)
+        raw_token = header and authenticator.get_raw_token(header)
+        if not raw_token:
+            continue
+        try:
+            validated_token = authenticator.get_validated_token(raw_token)
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except (InvalidToken, TokenError, KeyError):
+            return None
+        request.validated_token = validated_token
+        return user_id
+    return None
+
+
+class NotModified(Exception):
+    def __init__(self, etag):
+        super().__init__(etag)
+        self.etag = etag
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests whose If-None-Match matches `get_etag()` with 304
+    before the response is built, and adds the ETag to other responses.
+
+    `get_etag(request, user_id)` is called with the user id from the
+    token before authentication, and again with request.user's id after
+    it when the token did not give one. Views whose tag does not depend on
+    the user return it for any user id, including None.
+    """
+    def get_etag(self, request, user_id):
+        raise NotImplementedError
+
+    def check_not_modified(self, request, user_id):
+        if request.method not in ('GET', 'HEAD'):
+            return
+        etag = self.get_etag(request, user_id)
+        if etag is None:
+            return
+        etag = quote_etag(etag)
+        request.etag = etag
+        if etag_matches(request, etag):
+            raise NotModified(etag)
+
+    def perform_authentication(self, request):
+        user_id = token_user_id(request)
+        try:
+            self.check_not_modified(request, user_id)
+        except NotModified:
+            # request.user stays unset, the tracking middleware records the token's user instead
+            request._request.tracked_user_id = user_id
+            raise
+        super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if getattr(request, 'etag', None) is None and request.user.is_authenticated:
+            self.check_not_modified(request, request.user.pk)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=304, headers={'ETag': 'W/' + exc.etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(request, 'etag', None)
+        if etag is not None and response.status_code == 200 and not response.has_header('ETag'):
+            response['ETag'] = 'W/' + etag
+        return response
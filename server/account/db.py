@@ -0,0 +1,49 @@
+"""
+Database connection setup.
+
+SQLite connections get `settings.SQLITE_PRAGMAS` applied as soon as they
+are opened. WAL lets readers run alongside the single writer, and
+busy_timeout makes a blocked writer wait instead of failing with
+"database is locked".
+
+Persistent connections (`CONN_MAX_AGE`) are pinged at the start of a
+request, at most every `DB_HEALTH_CHECK_INTERVAL` seconds, and dropped
+when they are not usable anymore, so a request does not start on a
+connection the database server has closed.
+"""
+import time
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+
+
+def check_connections(**kwargs):
+    """
+    Closes persistent connections which fail a health check, at most every
+    DB_HEALTH_CHECK_INTERVAL seconds per connection
+    """
+    interval = getattr(settings, 'DB_HEALTH_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        checked = getattr(connection, 'health_checked_at', None)
+        if checked is not None and now - checked < interval:
+            continue
+        connection.health_checked_at = now
+        if not connection.is_usable():
+            connection.close()
+
+
+def install_connection_handlers():
+    connection_created.connect(configure_sqlite, dispatch_uid='account.db.configure_sqlite')
+    request_started.connect(check_connections, dispatch_uid='account.db.check_connections')
@@ -0,0 +1,156 @@
+"""
+Account deletion in bounded batches.
+
+`request_deletion()` is all the request path does: in one short
+transaction it deactivates the user, anonymizes its email and password
+and records an `AccountDeletion`. The run_account_deletions command then
+carries the job out with `run_deletion()`, step by step (`STEPS`), in
+batches of at most `batch_size` rows. Every batch is its own short
+transaction, and the job records the last pk it processed after each
+one, so an interrupted job resumes where it stopped. Batches are
+idempotent, so one done twice after a crash is harmless.
+
+Runs may overlap (e.g. from cron), so a job is claimed with a conditional
+UPDATE before it runs, and every save of its progress is conditional on
+the job being unchanged since this runner's last save. A running job is
+only claimed by another run once its progress has not been saved for
+`STALE_AFTER` seconds, i.e. its runner died.
+
+Access logs are kept, detached from the user and without its IP address.
+"""
+import time
+import traceback
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import AccessLog, AccountDeletion, UserRouteMap, UserDropoutReasonMap
+
+
+def anonymized_email(user_id):
+    return 'deleted-{}@deleted.invalid'.format(user_id)
+
+
+def request_deletion(user, by=''):
+    """
+    Deactivates the user and schedules the deletion of its account, returns the job
+    """
+    with transaction.atomic():
+        job, _ = AccountDeletion.objects.get_or_create(user_id=user.pk, defaults={'requested_by': by})
+        user.is_active = False
+        user.email = anonymized_email(user.pk)
+        user.set_unusable_password()
+        user.save(update_fields=['is_active', 'email', 'password'])
+    return job
+
+
+def detach_access_logs(user_id, cursor, batch_size):
+    using = router.db_for_write(AccessLog)
+    logs = AccessLog.objects.using(using).filter(user_id=user_id, pk__gt=cursor).order_by('pk')
+    with transaction.atomic(using=using):
+        pks = list(logs.values_list('pk', flat=True)[:batch_size])
+        if pks:
+            AccessLog.objects.using(using).filter(pk__in=pks).update(user=None, ip_addr=None)
+    return pks
+
+
+def batch_deleter(model):
+    def delete_batch(user_id, cursor, batch_size):
+        # soft-deleted rows included
+        rows = model.all_objects.filter(user_id=user_id, pk__gt=cursor).order_by('pk')
+        with transaction.atomic():
+            pks = list(rows.values_list('pk', flat=True)[:batch_size])
+            if pks:
+                model.all_objects.filter(pk__in=pks).delete()
+        return pks
+    return delete_batch
+
+
+def delete_user(user_id, cursor, batch_size):
+    # what is left to cascade into is small: sessions, admin log entries, group and permission links
+    with transaction.atomic():
+        deleted, _ = get_user_model().objects.filter(pk=user_id).delete()
+    return [user_id] if deleted else []
+
+
+STEPS = (
+    ('access_logs', detach_access_logs),
+    ('routes', batch_deleter(UserRouteMap)),
+    ('dropout_reasons', batch_deleter(UserDropoutReasonMap)),
+    ('user', delete_user),
+)
+
+
+# seconds without saved progress after which a running job counts as abandoned
+STALE_AFTER = 15 * 60
+
+
+class ClaimLost(Exception):
+    """
+    Another run has taken over the job
+    """
+
+
+def claim(job, states=(AccountDeletion.PENDING, AccountDeletion.RUNNING), stale_after=STALE_AFTER):
+    """
+    Claims the job for this run if it is in one of `states`, returns False
+    when it is not or another run has it
+    """
+    now = timezone.now()
+    claimable = Q(state__in=[state for state in states if state != AccountDeletion.RUNNING])
+    if AccountDeletion.RUNNING in states:
+        claimable |= Q(state=AccountDeletion.RUNNING, updated__lt=now - timedelta(seconds=stale_after))
+    claimed = AccountDeletion.objects.filter(claimable, pk=job.pk).update(
+        state=AccountDeletion.RUNNING, error='', updated=now,
+    )
+    if claimed:
+        job.state, job.error, job.updated = AccountDeletion.RUNNING, '', now
+    return bool(claimed)
+
+
+def save_progress(job, **changes):
+    """
+    Saves `changes` of a claimed job, raises ClaimLost when another run took it over
+    """
+    now = timezone.now()
+    saved = AccountDeletion.objects.filter(pk=job.pk, state=AccountDeletion.RUNNING, updated=job.updated).update(
+        **changes, updated=now,
+    )
+    if not saved:
+        raise ClaimLost(job.pk)
+    for name, value in changes.items():
+        setattr(job, name, value)
+    job.updated = now
+
+
+def run_deletion(job, batch_size=1000, pause=0, states=(AccountDeletion.PENDING, AccountDeletion.RUNNING)):
+    """
+    Carries out a deletion job from where it stopped, pausing `pause`
+    seconds between batches. Returns None when the job is not in one of
+    `states` or another run has it.
+    """
+    if not claim(job, states):
+        return None
+    job.refresh_from_db(fields=['step', 'cursor', 'processed'])
+
+    names = [name for name, _ in STEPS]
+    try:
+        for name, process in STEPS[names.index(job.step) if job.step else 0:]:
+            if job.step != name:
+                save_progress(job, step=name, cursor=0)
+            while True:
+                pks = process(job.user_id, job.cursor, batch_size)
+                if not pks:
+                    break
+                save_progress(job, cursor=max(pks), processed=job.processed + len(pks))
+                if pause:
+                    time.sleep(pause)
+    except ClaimLost:
+        raise
+    except Exception:
+        save_progress(job, state=AccountDeletion.FAILED, error=traceback.format_exc())
+        raise
+
+    save_progress(job, state=AccountDeletion.DONE, finished=timezone.now())
+    return job
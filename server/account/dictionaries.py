@@ -0,0 +1,74 @@
+"""
+String dictionaries for access logs, with an in-process LRU of string -> id
+"""
+from collections import OrderedDict
+from threading import Lock
+from django.db import IntegrityError, connections, router, transaction
+from .models import UserAgent, RequestedUri, Referer
+
+
+class StringDictionary:
+    def __init__(self, model, maxsize=4096):
+        self.model = model
+        self.maxsize = maxsize
+        self.max_length = model._meta.get_field('value').max_length
+        self._ids = OrderedDict()
+        self._lock = Lock()
+
+    def _remember(self, value, pk):
+        with self._lock:
+            self._ids[value] = pk
+            self._ids.move_to_end(value)
+            if len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def _lookup_or_create(self, value, using):
+        # looked up where it is written, a replica may not have it yet
+        objects = self.model.objects.using(using)
+        pk = objects.filter(value=value).values_list('pk', flat=True).first()
+        if pk is None:
+            try:
+                with transaction.atomic(using=using):
+                    pk = objects.create(value=value).pk
+            except IntegrityError:
+                # created concurrently by another worker
+                pk = objects.values_list('pk', flat=True).get(value=value)
+        return pk
+
+    def id_for(self, value):
+        """
+        Returns the id of `value`, or None for an empty string
+        """
+        value = value[:self.max_length]
+        if not value:
+            return None
+        with self._lock:
+            pk = self._ids.get(value)
+            if pk is not None:
+                self._ids.move_to_end(value)
+                return pk
+
+        using = router.db_for_write(self.model)
+        pk = self._lookup_or_create(value, using)
+        if connections[using].in_atomic_block:
+            # don't remember ids which may be rolled back
+            transaction.on_commit(lambda: self._remember(value, pk), using=using)
+        else:
+            self._remember(value, pk)
+        return pk
+
+    def values_for(self, ids):
+        """
+        Returns a dict of id -> string
+        """
+        ids = {pk for pk in ids if pk is not None}
+        return dict(self.model.objects.filter(pk__in=ids).values_list('pk', 'value'))
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
+user_agents = StringDictionary(UserAgent)
+requested_uris = StringDictionary(RequestedUri)
+referers = StringDictionary(Referer)
@@ -0,0 +1,19 @@
+import django_filters
+from django.db.models import Exists, OuterRef
+from .models import User, UserRouteMap
+
+
+class UserFilter(django_filters.FilterSet):
+    route = django_filters.NumberFilter(method='filter_route')
+    joined_after = django_filters.DateTimeFilter(field_name='date_joined', lookup_expr='gte')
+    joined_before = django_filters.DateTimeFilter(field_name='date_joined', lookup_expr='lt')
+    seen_after = django_filters.DateTimeFilter(field_name='last_seen', lookup_expr='gte')
+
+    class Meta:
+        model = User
+        fields = ('is_active', 'is_verified')
+
+    def filter_route(self, queryset, name, value):
+        # semi-join instead of JOIN + DISTINCT, so the keyset ordering still applies
+        routes = UserRouteMap.objects.filter(user=OuterRef('pk'), category_id=value)
+        return queryset.filter(Exists(routes))
@@ -0,0 +1,50 @@
+"""
+Background flushing of in-process buffers to the database
+"""
+import logging
+import threading
+import time
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlusher:
+    """
+    Calls `flush` every `interval` seconds from a daemon thread, started on
+    the first `start()` of the process.
+
+    A failing flush is logged and the thread carries on, so that one bad
+    flush does not stop all later ones. What a flush could not store is for
+    the flush itself to keep for the next one.
+    """
+    def __init__(self, flush, interval, name):
+        self.flush = flush
+        self.interval = interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def run_once(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('%s failed', self.name)
+        finally:
+            # the thread's own connections
+            connections.close_all()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.run_once()
@@ -0,0 +1,185 @@
+"""
+Asymmetric JWT signing with key ids (`kid`).
+
+Keys live in `settings.JWT_KEYS_DIR` as PEM files: `<kid>.key` holds a
+private key, `<kid>.pub` a public key. Tokens are signed with the newest
+private key and verified against the public key named by their `kid`
+header, so verifying nodes only need the `.pub` files. Dropping a new key
+into the directory rotates it without a restart; parsed keys are cached
+and the directory is re-read only when it changes.
+"""
+import json
+import os
+import time
+from threading import Lock
+import jwt
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from jwt import algorithms
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+
+
+PRIVATE_KEY_SUFFIX = '.key'
+PUBLIC_KEY_SUFFIX = '.pub'
+
+
+def key_algorithm(key):
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return 'RS256'
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return 'EdDSA'
+    raise TokenBackendError(_('Unsupported key type {}').format(type(key).__name__))
+
+
+def public_jwk(kid, algorithm, public_key):
+    if algorithm == 'EdDSA':
+        jwk = algorithms.OKPAlgorithm.to_jwk(public_key)
+    else:
+        jwk = algorithms.RSAAlgorithm.to_jwk(public_key)
+    if isinstance(jwk, str):
+        jwk = json.loads(jwk)
+    jwk.update({'kid': kid, 'alg': algorithm, 'use': 'sig'})
+    return jwk
+
+
+class KeyRing:
+    def __init__(self, directory, check_interval=30):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._lock = Lock()
+        self._directory_mtime = None
+        self._next_check = 0
+        self._next_forced_reload = 0
+        self._public_keys = {}  # kid -> (algorithm, public key)
+        self._signing_key = None  # (kid, algorithm, private key)
+
+    def _load_pem(self, path, private):
+        from cryptography.hazmat.primitives import serialization
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        if private:
+            return serialization.load_pem_private_key(data, password=None)
+        return serialization.load_pem_public_key(data)
+
+    def _scan(self):
+        public_keys = {}
+        signing_key, signing_mtime = None, None
+        for entry in sorted(os.scandir(self.directory), key=lambda entry: entry.name):
+            kid, suffix = os.path.splitext(entry.name)
+            if suffix == PRIVATE_KEY_SUFFIX:
+                private_key = self._load_pem(entry.path, private=True)
+                algorithm = key_algorithm(private_key)
+                public_keys[kid] = (algorithm, private_key.public_key())
+                mtime = entry.stat().st_mtime
+                if signing_mtime is None or mtime >= signing_mtime:
+                    signing_key, signing_mtime = (kid, algorithm, private_key), mtime
+            elif suffix == PUBLIC_KEY_SUFFIX and kid not in public_keys:
+                public_key = self._load_pem(entry.path, private=False)
+                public_keys[kid] = (key_algorithm(public_key), public_key)
+        return public_keys, signing_key
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        with self._lock:
+            mtime = os.stat(self.directory).st_mtime
+            if force or mtime != self._directory_mtime:
+                self._public_keys, self._signing_key = self._scan()
+                self._directory_mtime = mtime
+            self._next_check = now + self.check_interval
+
+    def signing_key(self):
+        self.refresh()
+        if self._signing_key is None:
+            raise TokenBackendError(_('No private key available for signing'))
+        return self._signing_key
+
+    def public_key(self, kid):
+        self.refresh()
+        key = self._public_keys.get(kid)
+        now = time.monotonic()
+        if key is None and now >= self._next_forced_reload:
+            # possibly a freshly rotated key, but don't let unknown kids trigger a rescan every time
+            self._next_forced_reload = now + 1
+            self.refresh(force=True)
+            key = self._public_keys.get(kid)
+        return key
+
+    def jwks(self):
+        self.refresh()
+        return {
+            'keys': [
+                public_jwk(kid, algorithm, public_key)
+                for kid, (algorithm, public_key) in sorted(self._public_keys.items())
+            ]
+        }
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    simplejwt token backend which signs and verifies with the keys of a `KeyRing`
+    """
+    def __init__(self, key_ring, audience=None, issuer=None):
+        self.key_ring = key_ring
+        self.algorithm = None
+        self.signing_key = None
+        self.verifying_key = None
+        self.audience = audience
+        self.issuer = issuer
+
+    def encode(self, payload):
+        kid, algorithm, private_key = self.key_ring.signing_key()
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        token = jwt.encode(jwt_payload, private_key, algorithm=algorithm, headers={'kid': kid})
+        if isinstance(token, bytes):
+            return token.decode('utf-8')
+        return token
+
+    def decode(self, token, verify=True):
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError:
+            raise TokenBackendError(_('Token is invalid or expired'))
+
+        key = self.key_ring.public_key(kid)
+        if key is None:
+            raise TokenBackendError(_('Token is invalid or expired'))
+        algorithm, public_key = key
+
+        try:
+            return jwt.decode(
+                token, public_key, algorithms=[algorithm],
+                audience=self.audience, issuer=self.issuer,
+                options={'verify_aud': self.audience is not None, 'verify_signature': verify},
+            )
+        except jwt.InvalidTokenError:
+            raise TokenBackendError(_('Token is invalid or expired'))
+
+
+key_ring = None
+
+
+def install_token_backend():
+    """
+    Replaces simplejwt's token backend when JWT_KEYS_DIR is configured
+    """
+    global key_ring
+
+    directory = getattr(settings, 'JWT_KEYS_DIR', None)
+    if not directory:
+        return
+    from rest_framework_simplejwt import state
+    from rest_framework_simplejwt.settings import api_settings
+
+    key_ring = KeyRing(directory, getattr(settings, 'JWT_KEYS_CHECK_INTERVAL', 30))
+    state.token_backend = KeyRingTokenBackend(key_ring, api_settings.AUDIENCE, api_settings.ISSUER)
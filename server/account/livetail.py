@@ -0,0 +1,254 @@
+"""
+Live tail of requests for the staff dashboard.
+
+TrackingMiddleware publishes a record of every request into this
+process's `RingBuffer`, a fixed-size array of slots written without
+locks, and sends it to the other workers of the host as one Unix
+datagram per worker which currently has live tail subscribers. Such a
+worker binds `<LIVE_TAIL_DIR>/<pid>.sock` and appends what it receives to
+its own buffer, so that its subscribers see the requests of all workers.
+
+Publishing never waits: datagrams to a worker whose socket queue is full
+are dropped, and subscribers which fall behind by more than the buffer
+size are disconnected (see views.analytics.AccessLogTailView) instead of
+slowing requests down.
+"""
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# seconds between listings of the socket directory
+PEER_CHECK_INTERVAL = 1
+# seconds without subscribers before a worker stops receiving
+IDLE_TIMEOUT = 60
+MAX_DATAGRAM_SIZE = 64 * 1024
+
+
+class RingBuffer:
+    """
+    The last `size` items, by sequence number.
+
+    Appends hold a lock only to number and store an item, so `last` never
+    goes backwards. Readers take no lock, they check the sequence number
+    stored in a slot to tell items which were overwritten meanwhile.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._slots = [None] * size
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.last = 0
+
+    def append(self, item):
+        with self._lock:
+            seq = next(self._counter)
+            self._slots[seq % self.size] = (seq, item)
+            self.last = seq
+        return seq
+
+    def read(self, after):
+        """
+        Returns ([(seq, item)] after the sequence number `after`, the new
+        cursor, whether items after `after` were lost to overwriting)
+        """
+        last = self.last
+        if after >= last:
+            return [], after, False
+        first = max(after + 1, last - self.size + 1)
+        lost = first > after + 1
+        items = []
+        cursor = first - 1
+        for seq in range(first, last + 1):
+            entry = self._slots[seq % self.size]
+            if entry is None or entry[0] < seq:
+                # taken but not written yet, read from here next time
+                break
+            if entry[0] > seq:
+                lost = True
+                break
+            items.append(entry)
+            cursor = seq
+        return items, cursor, lost
+
+
+class LiveTail:
+    def __init__(self, directory, size=4096):
+        self.directory = directory
+        self.buffer = RingBuffer(size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._sender = None
+        self._peers = []
+        self._peers_checked = 0
+        self._subscribers = 0
+        self._receiver = None
+        self._path = None
+
+    @property
+    def enabled(self):
+        return bool(self.directory) and hasattr(socket, 'AF_UNIX')
+
+    def _check_fork(self):
+        # sockets and threads are not inherited from gunicorn's master
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._sender = None
+            self._receiver = None
+            self._path = None
+            self._subscribers = 0
+
+    def peers(self):
+        now = time.monotonic()
+        if now - self._peers_checked >= PEER_CHECK_INTERVAL:
+            self._peers_checked = now
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                names = []
+            own = '{}.sock'.format(os.getpid())
+            self._peers = [os.path.join(self.directory, name) for name in names if name.endswith('.sock') and name != own]
+        return self._peers
+
+    def publish(self, record):
+        self.buffer.append(record)
+        if not self.enabled:
+            return
+        self._check_fork()
+        peers = self.peers()
+        if not peers:
+            return
+
+        payload = json.dumps(record, separators=(',', ':')).encode()
+        if self._sender is None:
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+        for path in peers:
+            try:
+                self._sender.sendto(payload, path)
+            except BlockingIOError:
+                # the peer does not keep up, drop rather than wait
+                continue
+            except (FileNotFoundError, ConnectionRefusedError):
+                # left behind by a worker which is gone
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                self._peers_checked = 0
+            except OSError:
+                continue
+
+    def subscribe(self, limit=None):
+        """
+        Returns False, without subscribing, when the process has `limit` subscribers already
+        """
+        self._check_fork()
+        with self._lock:
+            if limit is not None and self._subscribers >= limit:
+                return False
+            self._subscribers += 1
+            if self.enabled and self._receiver is None:
+                self._start_receiver()
+        return True
+
+    def unsubscribe(self):
+        with self._lock:
+            self._subscribers = max(self._subscribers - 1, 0)
+
+    def _start_receiver(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, '{}.sock'.format(os.getpid()))
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(path)
+        receiver.settimeout(1)
+        self._path = path
+        self._receiver = threading.Thread(
+            target=self._receive, args=(receiver, path), name='live-tail-receiver', daemon=True,
+        )
+        self._receiver.start()
+
+    def _receive(self, receiver, path):
+        idle_since = None
+        try:
+            while True:
+                try:
+                    payload = receiver.recv(MAX_DATAGRAM_SIZE)
+                except socket.timeout:
+                    payload = None
+                if payload:
+                    try:
+                        self.buffer.append(json.loads(payload))
+                    except ValueError:
+                        logger.warning('Dropped an invalid live tail record')
+
+                with self._lock:
+                    if self._subscribers:
+                        idle_since = None
+                    elif idle_since is None:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since > IDLE_TIMEOUT:
+                        self._release(receiver, path)
+                        return
+        finally:
+            with self._lock:
+                self._release(receiver, path)
+
+    def _release(self, receiver, path):
+        """
+        Closes a receiver's socket and, while the receiver is still the current one, unlinks its path.
+        Called with the lock held: a receiver started later binds the same path.
+        """
+        receiver.close()
+        if self._receiver is threading.current_thread():
+            self._receiver = None
+            self._path = None
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def close(self):
+        """
+        Stops other workers from sending to this one
+        """
+        path = self._path
+        if path and self._pid == os.getpid():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+live_tail = LiveTail(
+    getattr(settings, 'LIVE_TAIL_DIR', None),
+    getattr(settings, 'LIVE_TAIL_BUFFER_SIZE', 4096),
+)
+
+
+def matches(record, statuses=None, prefix=None, user=None, method=None):
+    """
+    Filters of the live tail, `statuses` as compiled by middleware.policy.compile_status
+    """
+    if statuses:
+        status_code = record.get('status')
+        if status_code is None or not any(low <= status_code < high for low, high in statuses):
+            return False
+    if prefix and not (record.get('uri') or '').startswith(prefix):
+        return False
+    if user is not None and record.get('user') != user:
+        return False
+    if method and record.get('method') != method:
+        return False
+    return True
@@ -0,0 +1,40 @@
+import json
+from datetime import date
+from django.core.management.base import BaseCommand
+from ...analytics import summarize
+
+
+class Command(BaseCommand):
+    help = 'Prints access log statistics of a period (see account.analytics)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='YYYY-MM-DD, defaults to 6 days before --until')
+        parser.add_argument('--until', type=date.fromisoformat, help='YYYY-MM-DD, defaults to today')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        stats = summarize(
+            since=options['since'], until=options['until'],
+            top=options['top'], chunk_size=options['chunk_size'],
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        self.stdout.write('{since} ~ {until}: {requests:.0f} requests, {error_rate:.2%} errors'.format(**stats))
+        self.stdout.write('latency (ms): {}'.format(self.format_latency(stats['latency'])))
+
+        self.stdout.write('\n{:<10} {:>12} {:>12} {:>12}'.format('date', 'requests', 'unique ips', 'unique users'))
+        for day in stats['days']:
+            self.stdout.write('{date:<10} {requests:>12.0f} {unique_ips:>12} {unique_users:>12}'.format(**day))
+
+        self.stdout.write('\n{:<50} {:>12} {:>8}  {}'.format('uri', 'requests', 'errors', 'latency (ms)'))
+        for uri in stats['uris']:
+            self.stdout.write('{:<50} {:>12.0f} {:>8.2%}  {}'.format(
+                uri['uri'], uri['requests'], uri['error_rate'], self.format_latency(uri['latency']),
+            ))
+
+    def format_latency(self, latency):
+        return ' '.join('{}={}'.format(label, value) for label, value in latency.items())
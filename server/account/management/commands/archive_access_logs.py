@@ -0,0 +1,62 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.utils import timezone
+from ...archive import AccessLogArchive, write_month
+from ...models import AccessLog
+
+
+class Command(BaseCommand):
+    help = 'Moves access logs of closed months into the columnar archive (see account.archive)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('months', nargs='*', help='YYYY-MM, defaults to every closed month')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help='archive without deleting from the database')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        current_month = timezone.localdate().isoformat()[:7]
+        months = options['months'] or sorted(
+            AccessLog.objects.filter(created_month__lt=current_month)
+            .order_by().values_list('created_month', flat=True).distinct()
+        )
+        for month in months:
+            if month >= current_month:
+                raise CommandError('{} is not closed yet'.format(month))
+
+        archive = AccessLogArchive()
+        os.makedirs(archive.directory, exist_ok=True)
+        archived_months = set(archive.months())
+        for month in months:
+            if options['dry_run']:
+                count = AccessLog.objects.filter(created_month=month).count()
+                self.stdout.write('{}: {} rows to archive'.format(month, count))
+                continue
+
+            if month in archived_months:
+                # an earlier run archived the month but did not finish deleting it
+                self.stdout.write('{}: already archived'.format(month))
+            else:
+                count = write_month(month, archive.directory, options['chunk_size'])
+                self.stdout.write('{}: {} rows archived'.format(month, count))
+
+            if not options['keep']:
+                self.delete_archived(archive, month, options['chunk_size'])
+
+    def delete_archived(self, archive, month, chunk_size):
+        """
+        Deletes rows of a month from the database, only those which are in the archive
+        """
+        ids = archive.month(month)['id']
+        deleted = 0
+        for start in range(0, len(ids), chunk_size):
+            with transaction.atomic(using=router.db_for_write(AccessLog)):
+                deleted += AccessLog.objects.filter(pk__in=ids[start:start + chunk_size].tolist()).delete()[0]
+        self.stdout.write('{}: {} rows deleted'.format(month, deleted))
+
+        remaining = AccessLog.objects.filter(created_month=month).count()
+        if remaining:
+            self.stderr.write('{}: {} rows were written after archiving and stay in the database'.format(
+                month, remaining,
+            ))
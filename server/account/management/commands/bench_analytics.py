@@ -0,0 +1,87 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from ...analytics import summarize
+from ...dictionaries import requested_uris
+from ...models import AccessLog
+
+
+def naive_summary(since, until):
+    """
+    The ORM loop account.analytics replaces: one Python pass over model
+    instances, exact percentiles from sorted lists and sets for distinct counts
+    """
+    uris, days = {}, {}
+    queryset = AccessLog.objects.filter(created_date__gte=since.isoformat(), created_date__lte=until.isoformat())
+    for log in queryset.select_related('requested_uri_ref').iterator():
+        uri = log.requested_uri_ref.value if log.requested_uri_ref_id else log.requested_uri
+        stats = uris.setdefault(uri, {'requests': 0, 'errors': 0, 'latencies': []})
+        stats['requests'] += log.sample_weight
+        if log.status_code is not None and log.status_code >= 500:
+            stats['errors'] += log.sample_weight
+        if log.latency is not None:
+            stats['latencies'].append(log.latency)
+        day = days.setdefault(log.created_date, {'requests': 0, 'ips': set(), 'users': set()})
+        day['requests'] += log.sample_weight
+        day['ips'].add(log.ip_addr)
+        if log.user_id:
+            day['users'].add(log.user_id)
+
+    for stats in uris.values():
+        latencies = sorted(stats.pop('latencies'))
+        stats['p50'] = latencies[len(latencies) // 2] if latencies else None
+    return uris, days
+
+
+class Command(BaseCommand):
+    help = 'Compares account.analytics with a naive ORM loop on generated access logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--uris', type=int, default=50)
+        parser.add_argument('--ips', type=int, default=5000)
+        parser.add_argument('--days', type=int, default=7)
+
+    def generate(self, options):
+        now = timezone.now()
+        uri_ids = [requested_uris.id_for('/bench/{}/'.format(i)) for i in range(options['uris'])]
+        rows = []
+        for _ in range(options['rows']):
+            # created is auto_now_add, the analytics only look at created_date
+            created = now - timedelta(days=random.randrange(options['days']), seconds=random.randrange(3600))
+            created_date = timezone.localdate(created).isoformat()
+            rows.append(AccessLog(
+                created=created, created_date=created_date, created_month=created_date[:7],
+                request_method='GET', requested_uri_ref_id=random.choice(uri_ids),
+                status_code=random.choice((200, 200, 200, 404, 500)), latency=int(random.expovariate(1 / 40)),
+                ip_addr='10.{}.{}.1'.format(*divmod(random.randrange(options['ips']), 256)),
+            ))
+        AccessLog.objects.bulk_create(rows, batch_size=5000)
+
+    def handle(self, *args, **options):
+        until = timezone.localdate()
+        since = until - timedelta(days=options['days'] - 1)
+        # generated rows are rolled back
+        with transaction.atomic():
+            self.generate(options)
+            started = time.perf_counter()
+            naive_uris, naive_days = naive_summary(since, until)
+            naive = time.perf_counter() - started
+
+            started = time.perf_counter()
+            stats = summarize(since=since, until=until, top=None)
+            vectorized = time.perf_counter() - started
+            transaction.set_rollback(True)
+
+        self.stdout.write('{} rows, {} URIs, {} days'.format(options['rows'], len(naive_uris), len(naive_days)))
+        self.stdout.write('{:<12} {:>10.3f} s'.format('ORM loop', naive))
+        self.stdout.write('{:<12} {:>10.3f} s  ({:.1f}x)'.format('analytics', vectorized, naive / vectorized))
+
+        for day in stats['days']:
+            exact = len(naive_days[day['date']]['ips'])
+            self.stdout.write('{}: unique ips {} (exact {}, {:+.2%})'.format(
+                day['date'], day['unique_ips'], exact, day['unique_ips'] / exact - 1,
+            ))
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import override_settings
+from ...models import AccessLog
+
+
+ALIAS = 'bench'
+
+MODES = (
+    # (name, SQLITE_PRAGMAS, persistent connection)
+    ('rollback journal', {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 0}, False),
+    ('rollback journal + busy_timeout', {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000}, False),
+    ('configured', None, True),
+)
+
+
+def write_logs(pragmas, persistent, inserts, results):
+    """
+    Worker process: inserts access logs one by one like requests do
+    """
+    connections[ALIAS].close()  # never reuse the parent's connection
+    inserted = failed = 0
+    started = time.perf_counter()
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        for i in range(inserts):
+            try:
+                AccessLog(request_method='GET', status_code=200, latency=i, ip_addr='10.0.0.1').save(using=ALIAS)
+                inserted += 1
+            except OperationalError:
+                failed += 1
+            if not persistent:
+                connections[ALIAS].close()
+    results.put((inserted, failed, time.perf_counter() - started))
+    connections[ALIAS].close()
+
+
+class Command(BaseCommand):
+    help = 'Measures concurrent access log inserts into SQLite from N worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--inserts', type=int, default=500, help='per worker')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('The benchmark only applies to SQLite')
+        workers, inserts = options['workers'], options['inserts']
+        context = multiprocessing.get_context('fork')
+        directory = tempfile.mkdtemp()
+        try:
+            self.stdout.write('{:<34} {:>10} {:>10} {:>10}'.format('mode', 'rows/s', 'failed', 'seconds'))
+            for index, (name, pragmas, persistent) in enumerate(MODES):
+                pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+                self.use_database(os.path.join(directory, '{}.sqlite3'.format(index)), pragmas)
+
+                results = context.Queue()
+                processes = [
+                    context.Process(target=write_logs, args=(pragmas, persistent, inserts, results))
+                    for _ in range(workers)
+                ]
+                started = time.perf_counter()
+                for process in processes:
+                    process.start()
+                outcomes = [results.get() for _ in processes]
+                for process in processes:
+                    process.join()
+                elapsed = time.perf_counter() - started
+
+                inserted = sum(outcome[0] for outcome in outcomes)
+                failed = sum(outcome[1] for outcome in outcomes)
+                self.stdout.write('{:<34} {:>10.0f} {:>10} {:>10.2f}'.format(name, inserted / elapsed, failed, elapsed))
+            self.stdout.write('{} workers x {} inserts, one transaction per insert'.format(workers, inserts))
+        finally:
+            if hasattr(connections._connections, ALIAS):
+                connections[ALIAS].close()
+            shutil.rmtree(directory)
+
+    def use_database(self, path, pragmas):
+        if hasattr(connections._connections, ALIAS):
+            # a fresh wrapper for the new settings
+            connections[ALIAS].close()
+            delattr(connections._connections, ALIAS)
+        connections.databases[ALIAS] = dict(connections.databases['default'], NAME=path, CONN_MAX_AGE=0)
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            call_command('migrate', database=ALIAS, verbosity=0)
+        connections[ALIAS].close()
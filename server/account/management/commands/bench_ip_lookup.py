@@ -0,0 +1,49 @@
+import ipaddress
+import random
+import time
+from django.core.management.base import BaseCommand
+from ...networks import PrefixTrie
+
+
+def random_networks(count):
+    networks = []
+    for _ in range(count):
+        if random.random() < 0.8:
+            address = ipaddress.IPv4Address(random.getrandbits(32))
+            networks.append(ipaddress.ip_network('{}/{}'.format(address, random.randint(8, 32)), strict=False))
+        else:
+            address = ipaddress.IPv6Address(random.getrandbits(128))
+            networks.append(ipaddress.ip_network('{}/{}'.format(address, random.randint(16, 64)), strict=False))
+    return networks
+
+
+class Command(BaseCommand):
+    help = 'Compares client IP lookups in a prefix trie with a scan over the network list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--networks', type=int, default=5000)
+        parser.add_argument('--lookups', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        networks = random_networks(options['networks'])
+        addresses = [
+            str(ipaddress.IPv4Address(random.getrandbits(32))) if i % 5 else str(ipaddress.IPv6Address(random.getrandbits(128)))
+            for i in range(options['lookups'])
+        ]
+
+        started = time.perf_counter()
+        trie = PrefixTrie(networks)
+        self.stdout.write('trie of {} networks built in {:.0f} ms'.format(len(trie), (time.perf_counter() - started) * 1000))
+
+        started = time.perf_counter()
+        scanned = [any(ipaddress.ip_address(address) in network for network in networks) for address in addresses]
+        scan = (time.perf_counter() - started) / len(addresses)
+
+        started = time.perf_counter()
+        looked_up = [address in trie for address in addresses]
+        lookup = (time.perf_counter() - started) / len(addresses)
+
+        if scanned != looked_up:
+            self.stderr.write('Lookups disagree with the scan')
+        self.stdout.write('{:<8} {:>12.2f} us/lookup'.format('scan', scan * 1e6))
+        self.stdout.write('{:<8} {:>12.2f} us/lookup  ({:.0f}x)'.format('trie', lookup * 1e6, scan / lookup))
@@ -0,0 +1,44 @@
+import tempfile
+import time
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.backends import TokenBackend
+from ...keys import KeyRing, KeyRingTokenBackend
+
+
+class Command(BaseCommand):
+    help = 'Compares JWT sign/verify throughput of HS256, RS256 and EdDSA'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def measure(self, fn, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return iterations / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        payload = {'token_type': 'access', 'user_id': 1, 'jti': 'f' * 32, 'exp': int(time.time()) + 3600}
+
+        backends = [('HS256', TokenBackend('HS256', settings.SECRET_KEY))]
+        directories = []
+        for algorithm in ('RS256', 'EdDSA'):
+            directory = tempfile.TemporaryDirectory()
+            directories.append(directory)
+            call_command('generate_jwt_key', algorithm=algorithm, kid=algorithm, directory=directory.name,
+                         stdout=StringIO())
+            backends.append((algorithm, KeyRingTokenBackend(KeyRing(directory.name))))
+
+        self.stdout.write('{:<8} {:>14} {:>14}'.format('alg', 'sign/s', 'verify/s'))
+        for algorithm, backend in backends:
+            token = backend.encode(payload)
+            signs = self.measure(lambda: backend.encode(payload), iterations)
+            verifies = self.measure(lambda: backend.decode(token), iterations)
+            self.stdout.write('{:<8} {:>14,.0f} {:>14,.0f}'.format(algorithm, signs, verifies))
+
+        for directory in directories:
+            directory.cleanup()
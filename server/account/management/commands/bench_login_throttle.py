@@ -0,0 +1,83 @@
+import random
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from rest_framework.exceptions import Throttled
+from ...serializers import LoginSerializer
+from ...throttling import login_throttle
+
+
+class Command(BaseCommand):
+    help = 'Measures login throughput under a credential stuffing mix, with and without throttling'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=400)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--attackers', type=int, default=1, help='attacking IP addresses')
+        parser.add_argument('--legitimate', type=float, default=0.1, help='share of legitimate logins')
+        parser.add_argument('--known', type=float, default=0.1, help='share of attacks on existing emails')
+
+    def make_attempts(self, options, emails):
+        """
+        (ip address, email, password, legitimate) tuples: attackers try leaked
+        emails, some of which exist, users log in from their own address
+        """
+        attempts = []
+        for i in range(options['attempts']):
+            if random.random() < options['legitimate']:
+                index = random.randrange(len(emails))
+                attempts.append(('10.1.0.{}'.format(index), emails[index], 'password', True))
+            else:
+                email = random.choice(emails) if random.random() < options['known'] else 'leaked{}@email.com'.format(i)
+                attempts.append(('10.2.0.{}'.format(i % options['attackers']), email, 'leaked', False))
+        return attempts
+
+    def run(self, attempts):
+        factory = RequestFactory()
+        outcomes = {'ok': 0, 'failed': 0, 'throttled': 0, 'legitimate ok': 0}
+        started = time.perf_counter()
+        for ip_addr, email, password, legitimate in attempts:
+            request = factory.post('/accounts/login/', REMOTE_ADDR=ip_addr)
+            serializer = LoginSerializer(data={'email': email, 'password': password}, context={'request': request})
+            try:
+                valid = serializer.is_valid()
+            except Throttled:
+                outcomes['throttled'] += 1
+                continue
+            outcomes['ok' if valid else 'failed'] += 1
+            if valid and legitimate:
+                outcomes['legitimate ok'] += 1
+        return outcomes, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        emails = ['bench{}@email.com'.format(i) for i in range(options['users'])]
+        attempts = self.make_attempts(options, emails)
+        legitimate = sum(1 for attempt in attempts if attempt[3])
+
+        prefix = login_throttle.key_prefix
+        # created users are rolled back
+        with transaction.atomic():
+            for email in emails:
+                get_user_model().objects.create_user(email=email, password='password')
+
+            self.stdout.write('{:<12} {:>10} {:>8} {:>8} {:>10} {:>14}'.format(
+                'throttling', 'attempts/s', 'ok', 'failed', 'throttled', 'legitimate ok',
+            ))
+            for name, rates in (('off', {}), ('on', None)):
+                login_throttle.key_prefix = 'account:bench-throttle:{}:'.format(uuid.uuid4().hex)
+                login_throttle.clear_local()
+                overrides = {} if rates is None else {'LOGIN_THROTTLE_RATES': rates}
+                try:
+                    with override_settings(**overrides):
+                        outcomes, elapsed = self.run(attempts)
+                finally:
+                    login_throttle.key_prefix = prefix
+                    login_throttle.clear_local()
+                self.stdout.write('{:<12} {:>10.1f} {:>8} {:>8} {:>10} {:>10}/{}'.format(
+                    name, len(attempts) / elapsed, outcomes['ok'], outcomes['failed'], outcomes['throttled'],
+                    outcomes['legitimate ok'], legitimate,
+                ))
+            transaction.set_rollback(True)
@@ -0,0 +1,52 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+
+ROUTER = 'account.middleware.RouteScopedMiddleware'
+
+
+class Command(BaseCommand):
+    help = 'Compares per-request middleware overhead of the flat and the route-scoped stacks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('paths', nargs='*', default=[
+            '/accounts/email-check/?email=user@example.com',
+            '/static/main.js',
+            '/admin/login/',
+        ])
+
+    def stacks(self):
+        outer = [path for path in settings.MIDDLEWARE if path != ROUTER]
+        return [
+            ('flat', {'MIDDLEWARE': outer + settings.SCOPED_MIDDLEWARE['']}),
+            ('scoped', {'MIDDLEWARE': settings.MIDDLEWARE}),
+        ]
+
+    def measure(self, path, count):
+        client = Client()
+        client.get(path)  # loads the middleware
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get(path)
+        return (time.perf_counter() - started) / count * 1e6
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        # access logs written while measuring are rolled back
+        with transaction.atomic():
+            results = {}
+            for name, overrides in self.stacks():
+                with override_settings(**overrides):
+                    for path in options['paths']:
+                        results[name, path] = self.measure(path, count)
+            transaction.set_rollback(True)
+
+        self.stdout.write('{:<50} {:>12} {:>12} {:>12}'.format('path', 'flat (us)', 'scoped (us)', 'saved (us)'))
+        for path in options['paths']:
+            flat, scoped = results['flat', path], results['scoped', path]
+            self.stdout.write('{:<50} {:>12.1f} {:>12.1f} {:>12.1f}'.format(path, flat, scoped, flat - scoped))
+        self.stdout.write('mean time per request, {} requests per path'.format(count))
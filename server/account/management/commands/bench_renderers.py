@@ -0,0 +1,60 @@
+import io
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework import parsers, renderers
+from ...parsers import JSONParser
+from ...renderers import JSONRenderer
+from ...serializers import UserListSerializer, UserSerializer
+
+
+def make_users(count):
+    """
+    Unsaved users, serializing them does not touch the database
+    """
+    now = timezone.now()
+    return [
+        get_user_model()(
+            id=i + 1, email='user{}@email.com'.format(i), is_active=True, is_verified=i % 2 == 0,
+            date_joined=now - timedelta(days=i, microseconds=i), last_login=now - timedelta(hours=i),
+        )
+        for i in range(count)
+    ]
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat
+
+
+class Command(BaseCommand):
+    help = 'Compares account.renderers/parsers with DRF\'s stdlib JSON renderer and parser'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='items of the bulk list payload')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        payloads = (
+            ('UserSerializer', UserSerializer(make_users(1)[0]).data, options['repeat'] * 500),
+            ('UserListSerializer x {}'.format(options['users']),
+             UserListSerializer(make_users(options['users']), many=True).data, options['repeat']),
+        )
+        pairs = (
+            ('stdlib json', renderers.JSONRenderer(), parsers.JSONParser()),
+            ('orjson', JSONRenderer(), JSONParser()),
+        )
+
+        self.stdout.write('{:<28} {:<12} {:>12} {:>12} {:>10}'.format('payload', 'library', 'render ms', 'parse ms', 'bytes'))
+        for name, data, repeat in payloads:
+            for library, renderer, parser in pairs:
+                content = renderer.render(data, 'application/json')
+                render = timed(lambda: renderer.render(data, 'application/json'), repeat)
+                parse = timed(lambda: parser.parse(io.BytesIO(content)), repeat)
+                self.stdout.write('{:<28} {:<12} {:>12.3f} {:>12.3f} {:>10}'.format(
+                    name, library, render * 1000, parse * 1000, len(content),
+                ))
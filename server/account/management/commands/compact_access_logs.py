@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.db.models import Q
+from ...dictionaries import requested_uris, referers, user_agents
+from ...models import AccessLog
+
+
+# legacy string column -> (dictionary foreign key, dictionary)
+COMPACTED_FIELDS = (
+    ('requested_uri', 'requested_uri_ref_id', requested_uris),
+    ('referer', 'referer_ref_id', referers),
+    ('user_agent', 'user_agent_ref_id', user_agents),
+)
+
+
+class Command(BaseCommand):
+    help = 'Moves requested_uri, referer and user_agent of access logs into dictionaries, in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--start-pk', type=int, default=0)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        legacy = Q()
+        for field, _, _ in COMPACTED_FIELDS:
+            legacy |= ~Q(**{field: ''})
+        queryset = AccessLog.objects.filter(legacy).order_by('pk')
+        fields = [field for field, _, _ in COMPACTED_FIELDS] + [ref for _, ref, _ in COMPACTED_FIELDS]
+
+        last_pk = options['start_pk']
+        converted = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).only('pk', *fields)[:chunk_size])
+            if not rows:
+                break
+            with transaction.atomic(using=router.db_for_write(AccessLog)):
+                for row in rows:
+                    for field, ref, dictionary in COMPACTED_FIELDS:
+                        value = getattr(row, field)
+                        if value:
+                            if getattr(row, ref) is None:
+                                setattr(row, ref, dictionary.id_for(value))
+                            setattr(row, field, '')
+                AccessLog.objects.bulk_update(rows, fields)
+            converted += len(rows)
+            last_pk = rows[-1].pk
+            self.stdout.write('{} rows converted, last pk {}'.format(converted, last_pk))
+
+        self.stdout.write('{} rows converted'.format(converted))
@@ -0,0 +1,45 @@
+import os
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Generates a JWT signing key pair into JWT_KEYS_DIR, which becomes the active signing key'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', choices=('RS256', 'EdDSA'), default='EdDSA')
+        parser.add_argument('--kid', default=None)
+        parser.add_argument('--directory', default=None)
+
+    def handle(self, *args, **options):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+        directory = options['directory'] or getattr(settings, 'JWT_KEYS_DIR', None)
+        if not directory:
+            raise CommandError('Set JWT_KEYS_DIR or pass --directory')
+        os.makedirs(directory, exist_ok=True)
+
+        kid = options['kid'] or time.strftime('%Y%m%d%H%M%S')
+        if options['algorithm'] == 'RS256':
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        else:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+
+        public_path = os.path.join(directory, kid + '.pub')
+        with open(public_path, 'wb') as f:
+            f.write(private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            ))
+        # the private key is written last: once it appears, it becomes the signing key
+        private_path = os.path.join(directory, kid + '.key')
+        fd = os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ))
+        self.stdout.write('Generated {} key {} in {}'.format(options['algorithm'], kid, directory))
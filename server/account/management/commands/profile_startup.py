@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# runs in a fresh interpreter, prints its timings as JSON on the last line of stdout
+STARTUP_SCRIPT = '''
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.core.servers.basehttp import get_internal_wsgi_application
+application = get_internal_wsgi_application()
+loaded = time.perf_counter()
+
+from django.db import transaction
+from django.test import Client
+client = Client()
+with transaction.atomic():
+    client.get({path!r})
+    first = time.perf_counter()
+    client.get({path!r})
+    second = time.perf_counter()
+    transaction.set_rollback(True)
+print(json.dumps({{
+    'setup': setup - started,
+    'wsgi': loaded - setup,
+    'first_request': first - loaded,
+    'second_request': second - first,
+}}))
+'''
+
+
+def parse_importtime(output):
+    """
+    Returns {top-level package: self time in seconds} of `-X importtime` output
+    """
+    packages = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1e6
+    return packages
+
+
+class Command(BaseCommand):
+    help = 'Reports import times and time to first request of a fresh process, with and without warm-up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/accounts/email-check/?email=user@example.com')
+        parser.add_argument('--top', type=int, default=20)
+
+    def run(self, path, warm_up):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'scaffold.settings'))
+        env['{}_WARM_UP'.format(settings.ENVVAR_PREFIX)] = '1' if warm_up else '0'
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT.format(path=path)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr[-2000:])
+        return json.loads(process.stdout.strip().splitlines()[-1]), parse_importtime(process.stderr)
+
+    def handle(self, *args, **options):
+        cold, _ = self.run(options['path'], warm_up=False)
+        warm, packages = self.run(options['path'], warm_up=True)
+
+        self.stdout.write('{:<40} {:>12}'.format('package', 'import (ms)'))
+        ranked = sorted(packages.items(), key=lambda item: -item[1])
+        for package, seconds in ranked[:options['top']]:
+            self.stdout.write('{:<40} {:>12.1f}'.format(package, seconds * 1000))
+        self.stdout.write('{:<40} {:>12.1f}'.format('total', sum(packages.values()) * 1000))
+
+        self.stdout.write('\n{:<40} {:>12} {:>12}'.format('phase (ms)', 'no warm-up', 'warm-up'))
+        for phase in ('setup', 'wsgi', 'first_request', 'second_request'):
+            self.stdout.write('{:<40} {:>12.1f} {:>12.1f}'.format(phase, cold[phase] * 1000, warm[phase] * 1000))
+        self.stdout.write('{:<40} {:>12.1f} {:>12.1f}'.format(
+            'time to first response',
+            sum(cold[phase] for phase in ('setup', 'wsgi', 'first_request')) * 1000,
+            sum(warm[phase] for phase in ('setup', 'wsgi', 'first_request')) * 1000,
+        ))
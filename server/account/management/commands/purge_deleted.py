@@ -0,0 +1,52 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from ...models import (
+    SignupRouteCategory,
+    UserRouteMap,
+    DropoutReasonCategory,
+    UserDropoutReasonMap,
+)
+
+
+# maps first, so that categories are no longer referenced by purged tombstones
+PURGE_TARGETS = (
+    (UserRouteMap, None),
+    (UserDropoutReasonMap, None),
+    (SignupRouteCategory, 'userroutemap'),
+    (DropoutReasonCategory, 'userdropoutreasonmap'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Hard-deletes soft-deleted rows older than given days, in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        chunk_size = options['chunk_size']
+
+        for model, referenced_by in PURGE_TARGETS:
+            queryset = model.all_objects.filter(deleted__lt=cutoff)
+            if referenced_by:
+                # never cascade into rows which are still referenced
+                queryset = queryset.filter(**{'{}__isnull'.format(referenced_by): True})
+
+            if options['dry_run']:
+                self.stdout.write('{}: {} rows to purge'.format(model.__name__, queryset.count()))
+                continue
+
+            purged = 0
+            while True:
+                pks = list(queryset.order_by('deleted').values_list('pk', flat=True)[:chunk_size])
+                if not pks:
+                    break
+                with transaction.atomic():
+                    model.all_objects.filter(pk__in=pks).delete()
+                purged += len(pks)
+            self.stdout.write('{}: {} rows purged'.format(model.__name__, purged))
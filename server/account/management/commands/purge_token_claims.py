@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ...models import RefreshTokenClaim
+
+
+class Command(BaseCommand):
+    help = 'Deletes claims of refresh tokens which have expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = RefreshTokenClaim.objects.filter(expires__lt=timezone.now())
+        purged = 0
+        while True:
+            pks = list(queryset.order_by('expires').values_list('pk', flat=True)[:options['chunk_size']])
+            if not pks:
+                break
+            RefreshTokenClaim.objects.filter(pk__in=pks).delete()
+            purged += len(pks)
+        self.stdout.write('{} expired claims purged'.format(purged))
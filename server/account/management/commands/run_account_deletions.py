@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from ...deletion import ClaimLost, run_deletion
+from ...models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = 'Carries out requested account deletions in batches, resuming interrupted ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0, help='seconds between batches')
+        parser.add_argument('--retry-failed', action='store_true')
+
+    def handle(self, *args, **options):
+        states = [AccountDeletion.PENDING, AccountDeletion.RUNNING]
+        if options['retry_failed']:
+            states.append(AccountDeletion.FAILED)
+
+        failed = 0
+        for job in AccountDeletion.objects.filter(state__in=states).order_by('requested'):
+            try:
+                if run_deletion(job, options['batch_size'], options['pause'], states) is None:
+                    # done or being run by an overlapping run
+                    continue
+            except ClaimLost:
+                self.stderr.write('Deletion of user {} was taken over by another run'.format(job.user_id))
+                continue
+            except Exception as exc:
+                failed += 1
+                self.stderr.write('Deletion of user {} failed at {}: {}'.format(job.user_id, job.step, exc))
+                continue
+            self.stdout.write('User {} deleted, {} rows processed'.format(job.user_id, job.processed))
+        if failed:
+            self.stderr.write('{} deletions failed, see their error and rerun with --retry-failed'.format(failed))
@@ -0,0 +1,28 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ...visitors import rebuild_rollups, unique_visitors
+
+
+class Command(BaseCommand):
+    help = 'Prints estimated distinct visitors of a period (see account.visitors)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='YYYY-MM-DD, defaults to the first of the month')
+        parser.add_argument('--until', type=date.fromisoformat, help='YYYY-MM-DD, defaults to today')
+        parser.add_argument('--rebuild', action='store_true', help='rebuild the sketches from access logs first')
+
+    def handle(self, *args, **options):
+        until = options['until'] or timezone.localdate()
+        since = options['since'] or until.replace(day=1)
+        if options['rebuild']:
+            self.stdout.write('{} days rebuilt'.format(rebuild_rollups(since, until)))
+
+        visitors = unique_visitors(since, until)
+
+        self.stdout.write('{:<10} {:>12} {:>12}'.format('date', 'ip addrs', 'users'))
+        for day in visitors['days']:
+            self.stdout.write('{date:<10} {ip_addr:>12} {user:>12}'.format(**day))
+        self.stdout.write('{:<10} {ip_addr:>12} {user:>12}'.format(
+            '{since} ~ {until}'.format(**visitors), **visitors['total']
+        ))
@@ -1 +1,3 @@
-from .tracking import TrackingMiddleware
\ No newline at end of file
+from .access import IPAccessMiddleware
+from .routing import RouteScopedMiddleware
+from .tracking import TrackingMiddleware
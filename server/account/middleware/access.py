@@ -0,0 +1,18 @@
+from django.http import HttpResponseForbidden
+from ..networks import get_resolver
+
+
+class IPAccessMiddleware:
+    """
+    Resolves the client address of every request into `request.ip_addr`,
+    and refuses clients outside IP_ALLOW_LIST (when set) or in IP_DENY_LIST
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        resolver = get_resolver()
+        request.ip_addr = resolver.client_address(request.META)
+        if not resolver.allows(request.ip_addr):
+            return HttpResponseForbidden()
+        return self.get_response(request)
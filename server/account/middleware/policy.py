@@ -0,0 +1,121 @@
+"""
+Declarative access logging policy.
+
+A policy is a list of rules, the first matching rule decides what happens
+to a request. Every key of a rule except `action` and `rate` is a condition:
+
+    url_name     resolved URL name, e.g. 'account:token_verify'
+    prefix       path prefix, e.g. '/accounts/token/'
+    method       request method, e.g. 'GET'
+    status       status code (404) or class ('5xx'), or a list of these
+    min_latency  latency in milliseconds, inclusive
+
+`action` is one of 'log', 'sample' (log with probability `rate`, the row
+carries 1 / rate as its sample weight) or 'count' (only count the request,
+see account.accesscounts).
+Requests matching no rule are logged.
+"""
+import random
+from django.core.exceptions import ImproperlyConfigured
+
+
+LOG = 'log'
+SAMPLE = 'sample'
+COUNT = 'count'
+
+ACTIONS = (LOG, SAMPLE, COUNT)
+CONDITIONS = ('url_name', 'prefix', 'method', 'status', 'min_latency')
+
+
+def compile_status(status):
+    """
+    Returns a list of [low, high) status ranges
+    """
+    statuses = status if isinstance(status, (list, tuple)) else [status]
+    ranges = []
+    for status in statuses:
+        if isinstance(status, str) and len(status) == 3 and status[1:].lower() == 'xx':
+            low = int(status[0]) * 100
+            ranges.append((low, low + 100))
+        else:
+            ranges.append((int(status), int(status) + 1))
+    return ranges
+
+
+class Rule:
+    def __init__(self, index, url_name=None, prefix=None, method=None, status=None, min_latency=None,
+                 action=LOG, rate=1.0):
+        if action not in ACTIONS:
+            raise ImproperlyConfigured('Unknown access log action {!r}'.format(action))
+        if action == SAMPLE and not 0 < rate <= 1:
+            raise ImproperlyConfigured('Access log sample rate must be in (0, 1]')
+        self.index = index
+        self.url_name = url_name
+        self.action = action
+        self.rate = rate
+        self.weight = 1 / rate if action == SAMPLE else 1.0
+
+        # only the configured conditions are checked, cheapest first
+        checks = []
+        if method is not None:
+            method = method.upper()
+            checks.append(lambda path, status_code, latency, request_method: request_method == method)
+        if prefix is not None:
+            checks.append(lambda path, status_code, latency, request_method: path.startswith(prefix))
+        if status is not None:
+            ranges = compile_status(status)
+            checks.append(lambda path, status_code, latency, request_method: status_code is not None and any(
+                low <= status_code < high for low, high in ranges
+            ))
+        if min_latency is not None:
+            checks.append(lambda path, status_code, latency, request_method: latency >= min_latency)
+        self.checks = tuple(checks)
+
+    def matches(self, path, status_code, latency, method):
+        for check in self.checks:
+            if not check(path, status_code, latency, method):
+                return False
+        return True
+
+
+class Decision:
+    def __init__(self, action, weight=1.0):
+        self.action = action
+        self.weight = weight
+
+
+LOG_DECISION = Decision(LOG)
+COUNT_DECISION = Decision(COUNT)
+
+
+class AccessLogPolicy:
+    def __init__(self, rules):
+        compiled = []
+        for index, rule in enumerate(rules or ()):
+            unknown = set(rule) - set(CONDITIONS) - {'action', 'rate'}
+            if unknown:
+                raise ImproperlyConfigured('Unknown access log rule keys {}'.format(sorted(unknown)))
+            compiled.append(Rule(index, **rule))
+        self.rules = compiled
+        # rules which can apply to a URL name, memoized per name
+        self._rules_by_url_name = {}
+
+    def rules_for(self, url_name):
+        try:
+            return self._rules_by_url_name[url_name]
+        except KeyError:
+            rules = tuple(rule for rule in self.rules if rule.url_name is None or rule.url_name == url_name)
+            self._rules_by_url_name[url_name] = rules
+            return rules
+
+    def decide(self, url_name, path, status_code, latency, method):
+        for rule in self.rules_for(url_name):
+            if rule.matches(path, status_code, latency, method):
+                if rule.action == LOG:
+                    return LOG_DECISION
+                if rule.action == COUNT:
+                    return COUNT_DECISION
+                if random.random() < rule.rate:
+                    return Decision(LOG, rule.weight)
+                return COUNT_DECISION
+        return LOG_DECISION
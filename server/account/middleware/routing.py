@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class MiddlewareChain:
+    """
+    Middleware stack built once, the same way Django builds `MIDDLEWARE`
+    """
+    def __init__(self, prefix, middleware_paths, get_response):
+        self.prefix = prefix
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+
+        handler = convert_exception_to_response(get_response)
+        for middleware_path in reversed(middleware_paths):
+            middleware = import_string(middleware_path)
+            try:
+                mw_instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+
+            if hasattr(mw_instance, 'process_view'):
+                self.view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, 'process_template_response'):
+                self.template_response_middleware.append(mw_instance.process_template_response)
+            if hasattr(mw_instance, 'process_exception'):
+                self.exception_middleware.append(mw_instance.process_exception)
+
+            handler = convert_exception_to_response(mw_instance)
+        self.handler = handler
+
+
+class RouteScopedMiddleware:
+    """
+    Runs a different middleware chain per path prefix (settings.SCOPED_MIDDLEWARE),
+    so e.g. JWT-only API requests skip session, CSRF and message handling.
+    The longest matching prefix wins.
+
+    Chains are not part of MIDDLEWARE, so their process_view, process_exception
+    and process_template_response hooks are called from here.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.chains = [
+            MiddlewareChain(prefix, middleware_paths, get_response)
+            for prefix, middleware_paths in sorted(
+                settings.SCOPED_MIDDLEWARE.items(), key=lambda item: len(item[0]), reverse=True,
+            )
+        ]
+
+    def get_chain(self, path):
+        for chain in self.chains:
+            if path.startswith(chain.prefix):
+                return chain
+        return None
+
+    def __call__(self, request):
+        chain = self.get_chain(request.path_info)
+        request.middleware_chain = chain
+        if chain is None:
+            return self.get_response(request)
+        return chain.handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        chain = getattr(request, 'middleware_chain', None)
+        if chain is None:
+            return None
+        for process_view in chain.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        chain = getattr(request, 'middleware_chain', None)
+        if chain is None:
+            return None
+        for process_exception in chain.exception_middleware:
+            response = process_exception(request, exception)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        chain = getattr(request, 'middleware_chain', None)
+        if chain is None:
+            return response
+        for process_template_response in chain.template_response_middleware:
+            response = process_template_response(request, response)
+        return response
@@ -1,41 +1,78 @@
+import time
 from urllib.parse import unquote_plus, urlparse, parse_qs
+from django.conf import settings
 from django.utils import timezone
+from ..accesscounts import access_counter
+from ..activity import activity_tracker
+from ..dictionaries import requested_uris, referers, user_agents
+from ..livetail import live_tail
 from ..models import AccessLog
+from ..networks import client_address
+from ..visitors import visitor_counter
+from .policy import AccessLogPolicy, COUNT
 
 
 def make_ip_address_aware_request(request):
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        request.ip_addr = x_forwarded_for.split(',')[0]
-    else:
-        request.ip_addr = request.META.get('REMOTE_ADDR')
+    # X-Forwarded-For is only followed through trusted proxies (settings.TRUSTED_PROXIES)
+    if getattr(request, 'ip_addr', None) is None:
+        request.ip_addr = client_address(request.META)
     return request
 
     
-def get_loggedin_user(request):
-    if request.user.is_authenticated and not request.user.is_anonymous:
-        return request.user 
-    return None
+def get_loggedin_user_id(request):
+    # request.user is only set by AuthenticationMiddleware or DRF authentication,
+    # 304s of account.conditional skip authentication and leave the token's user id
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and not user.is_anonymous:
+        return user.pk
+    return getattr(request, 'tracked_user_id', None)
+
+
+def get_url_name(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match else None
 
 
 class TrackingMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.policy = AccessLogPolicy(getattr(settings, 'ACCESS_LOG_POLICY', None))
 
     def __call__(self, request):
         request = make_ip_address_aware_request(request)
         return self.get_response_with_writing_access_log(request)
 
     def get_response_with_writing_access_log(self, request):
-        starts_at = timezone.now()
+        starts_at = time.perf_counter()
         response = self.get_response(request)
-        latency = (timezone.now() - starts_at).microseconds / 1000
+        latency = int((time.perf_counter() - starts_at) * 1000)
 
         try:
             status_code = getattr(response, 'status_code')
         except (AttributeError, ValueError, AssertionError):
             status_code = None
 
+        user_id = get_loggedin_user_id(request)
+        # every request is a visit, whatever the policy decides
+        visitor_counter.observe(timezone.localdate().isoformat(), request.ip_addr, user_id)
+        if user_id is not None:
+            activity_tracker.seen(user_id)
+        live_tail.publish({
+            'time': round(time.time(), 3),
+            'method': request.method,
+            'uri': request.path,
+            'status': status_code,
+            'latency': latency,
+            'user': user_id,
+            'ip': request.ip_addr,
+        })
+
+        url_name = get_url_name(request)
+        decision = self.policy.decide(url_name, request.path_info, status_code, latency, request.method)
+        if decision.action == COUNT:
+            access_counter.count(timezone.localdate().isoformat(), url_name)
+            return response
+
         try:
             comment = getattr(response, 'data').get('detail', '')
         except (AttributeError, ValueError, AssertionError):
@@ -46,14 +83,15 @@ class TrackingMiddleware:
         access_log_data = {
             'ip_addr': request.ip_addr,
             'request_method': request.method,
-            'requested_uri': unquote_plus(requested_uri.split('?', 1)[0]),
+            'requested_uri_ref_id': requested_uris.id_for(unquote_plus(requested_uri.split('?', 1)[0])),
             'query_string': unquote_plus(urlparse(requested_uri).query),
             'status_code': status_code,
-            'referer': request.META.get('HTTP_REFERER', ''),
-            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-            'user': get_loggedin_user(request),
+            'referer_ref_id': referers.id_for(request.META.get('HTTP_REFERER', '')),
+            'user_agent_ref_id': user_agents.id_for(request.META.get('HTTP_USER_AGENT', '')),
+            'user_id': user_id,
             'comment': comment,
-            'latency': latency
+            'latency': latency,
+            'sample_weight': decision.weight,
         }
         AccessLog(**access_log_data).save()
 
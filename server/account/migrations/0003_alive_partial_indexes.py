@@ -0,0 +1,53 @@
+# Generated by Django 3.1.3 on 2026-10-19 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_auto_20201209_0253'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dropoutreasoncategory',
+            index=models.Index(condition=models.Q(deleted__isnull=True), fields=['name'], name='account_drc_alive_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dropoutreasoncategory',
+            index=models.Index(condition=models.Q(deleted__isnull=False), fields=['deleted'], name='account_drc_tombstone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signuproutecategory',
+            index=models.Index(condition=models.Q(deleted__isnull=True), fields=['name'], name='account_src_alive_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signuproutecategory',
+            index=models.Index(condition=models.Q(deleted__isnull=False), fields=['deleted'], name='account_src_tombstone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userdropoutreasonmap',
+            index=models.Index(condition=models.Q(deleted__isnull=True), fields=['user', 'category'], name='account_udrm_alive_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userdropoutreasonmap',
+            index=models.Index(condition=models.Q(deleted__isnull=True), fields=['category'], name='account_udrm_alive_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userdropoutreasonmap',
+            index=models.Index(condition=models.Q(deleted__isnull=False), fields=['deleted'], name='account_udrm_tombstone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userroutemap',
+            index=models.Index(condition=models.Q(deleted__isnull=True), fields=['user', 'category'], name='account_urm_alive_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userroutemap',
+            index=models.Index(condition=models.Q(deleted__isnull=True), fields=['category'], name='account_urm_alive_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userroutemap',
+            index=models.Index(condition=models.Q(deleted__isnull=False), fields=['deleted'], name='account_urm_tombstone_idx'),
+        ),
+    ]
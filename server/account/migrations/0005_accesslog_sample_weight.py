@@ -0,0 +1,18 @@
+# Generated by Django 3.1.3 on 2026-10-19 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_user_joined_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accesslog',
+            name='sample_weight',
+            field=models.FloatField(default=1),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.1.3 on 2026-10-19 11:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_accesslog_sample_weight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Referer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=500, unique=True)),
+            ],
+            options={
+                'db_table': 'account_referers',
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestedUri',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=500, unique=True)),
+            ],
+            options={
+                'db_table': 'account_requested_uris',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=500, unique=True)),
+            ],
+            options={
+                'db_table': 'account_user_agents',
+            },
+        ),
+        migrations.AddField(
+            model_name='accesslog',
+            name='referer_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='account.referer'),
+        ),
+        migrations.AddField(
+            model_name='accesslog',
+            name='requested_uri_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='account.requesteduri'),
+        ),
+        migrations.AddField(
+            model_name='accesslog',
+            name='user_agent_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='account.useragent'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.1.3 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_accesslog_dictionaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.CharField(max_length=10)),
+                ('dimension', models.CharField(choices=[('ip_addr', 'IP address'), ('user', 'user')], max_length=10)),
+                ('registers', models.BinaryField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'account_visitor_sketches',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(fields=('date', 'dimension'), name='account_visitor_sketch_uniq'),
+        ),
+    ]
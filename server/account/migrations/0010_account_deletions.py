@@ -0,0 +1,36 @@
+# Generated by Django 3.1.3 on 2026-10-19 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_user_last_seen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField(unique=True)),
+                ('requested', models.DateTimeField(auto_now_add=True)),
+                ('requested_by', models.CharField(blank=True, max_length=200)),
+                ('state', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=10)),
+                ('step', models.CharField(blank=True, max_length=30)),
+                ('cursor', models.BigIntegerField(default=0)),
+                ('processed', models.BigIntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'account_deletions',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='accountdeletion',
+            index=models.Index(condition=models.Q(state__in=('pending', 'running')), fields=['requested'], name='account_deletions_open_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.1.3 on 2026-10-19 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_account_deletions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccessCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.CharField(max_length=10)),
+                ('name', models.CharField(max_length=200)),
+                ('count', models.BigIntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'account_access_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='accesscount',
+            constraint=models.UniqueConstraint(fields=('date', 'name'), name='account_access_count_uniq'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.3 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0012_accesslog_user_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshTokenClaim',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('expires', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'account_refresh_token_claims',
+            },
+        ),
+    ]
@@ -1,4 +1,6 @@
-from .accesslog import AccessLog
+from .accesslog import AccessLog, UserAgent, RequestedUri, Referer, VisitorSketch, AccessCount
+from .deletion import AccountDeletion
+from .token import RefreshTokenClaim
 from .user import (
     User,
     SignupRouteCategory,
@@ -1,17 +1,36 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+class AccessLogString(models.Model):
+    """
+    Dictionary entry for a string repeated across access logs
+    """
+    value = models.CharField(max_length=500, unique=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.value
+
+
+class UserAgent(AccessLogString):
+    class Meta:
+        db_table = 'account_user_agents'
+
+
+class RequestedUri(AccessLogString):
+    class Meta:
+        db_table = 'account_requested_uris'
+
+
+class Referer(AccessLogString):
+    class Meta:
+        db_table = 'account_referers'
 
 
-class AccessLogManager(models.Manager):
-    def create(self, **kwargs):
-        instance = super().create(**kwargs)
-        created_date = instance.created.isoformat()  # YYYY-MM-DD
-        instance.created_date = created_date
-        instance.created_month = created_date[:-3]  # YYYY-MM
-        instance.save()
-        return instance
-        
-        
 class AccessLog(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     created_date = models.CharField(max_length=10, blank=True)
@@ -22,12 +41,18 @@ class AccessLog(models.Model):
     status_code = models.IntegerField(null=True)
     referer = models.URLField(blank=True)
     user_agent = models.CharField(max_length=500, blank=True)
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+    # logs may live in another database than users (see account.routers), so
+    # there is no constraint; deleting a user detaches its logs through account.signals
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, null=True, db_constraint=False)
     ip_addr = models.GenericIPAddressField(null=True)
     latency = models.IntegerField(null=True)
     comment = models.TextField(blank=True)
-
-    objects = AccessLogManager
+    # dictionary encoded strings, which replace requested_uri, referer and user_agent
+    requested_uri_ref = models.ForeignKey(RequestedUri, on_delete=models.PROTECT, null=True, related_name='+')
+    referer_ref = models.ForeignKey(Referer, on_delete=models.PROTECT, null=True, related_name='+')
+    user_agent_ref = models.ForeignKey(UserAgent, on_delete=models.PROTECT, null=True, related_name='+')
+    # number of requests this row stands for, when logged by sampling
+    sample_weight = models.FloatField(default=1)
 
     class Meta:
         db_table = 'account_access_logs'
@@ -35,3 +60,52 @@ class AccessLog(models.Model):
             models.Index(fields=['-created_month']),
             models.Index(fields=['-created_date']),
         ]
+
+    def save(self, *args, **kwargs):
+        if not self.created_date:
+            created_date = timezone.localdate(self.created or timezone.now()).isoformat()  # YYYY-MM-DD
+            self.created_date = created_date
+            self.created_month = created_date[:-3]  # YYYY-MM
+        super().save(*args, **kwargs)
+
+
+class VisitorSketch(models.Model):
+    """
+    HyperLogLog sketch of the distinct visitors of a day (see account.visitors)
+    """
+    IP_ADDR = 'ip_addr'
+    USER = 'user'
+    DIMENSION_CHOICES = (
+        (IP_ADDR, 'IP address'),
+        (USER, 'user'),
+    )
+
+    date = models.CharField(max_length=10)  # YYYY-MM-DD, like AccessLog.created_date
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    registers = models.BinaryField()
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'account_visitor_sketches'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'dimension'], name='account_visitor_sketch_uniq'),
+        ]
+
+
+class AccessCount(models.Model):
+    """
+    Requests of a day which the access log policy only counted, by URL name (see account.accesscounts)
+    """
+    # requests whose path resolves to no URL name, e.g. 404 scans
+    UNRESOLVED = '<unresolved>'
+
+    date = models.CharField(max_length=10)  # YYYY-MM-DD, like AccessLog.created_date
+    name = models.CharField(max_length=200)
+    count = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'account_access_counts'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'name'], name='account_access_count_uniq'),
+        ]
@@ -1,4 +1,55 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+
+# sent by `BaseModelQuerySet.soft_delete()` with the pks of the rows, as update() sends no signals
+soft_deleted = Signal()
+
+
+class BaseModelQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(deleted__isnull=True)
+
+    def dead(self):
+        return self.filter(deleted__isnull=False)
+
+    def soft_delete(self, by=''):
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            pks = list(self.using(using).values_list('pk', flat=True))
+            if not pks:
+                return 0
+            count = self.model._base_manager.using(using).filter(pk__in=pks).update(
+                deleted=timezone.now(), deleted_by=by,
+            )
+            soft_deleted.send(sender=self.model, pks=pks, using=using)
+        return count
+
+
+class AliveManager(models.Manager.from_queryset(BaseModelQuerySet)):
+    """
+    Default manager which hides soft-deleted rows
+    """
+    def get_queryset(self):
+        return super().get_queryset().alive()
+
+
+AllObjectsManager = models.Manager.from_queryset(BaseModelQuerySet)
+
+
+def alive_index(fields, name):
+    """
+    Partial index only covering rows which are not soft-deleted
+    """
+    return models.Index(fields=fields, name=name, condition=models.Q(deleted__isnull=True))
+
+
+def tombstone_index(name):
+    """
+    Partial index over soft-deleted rows, used when purging old tombstones
+    """
+    return models.Index(fields=['deleted'], name=name, condition=models.Q(deleted__isnull=False))
 
 
 class BaseModel(models.Model):
@@ -9,5 +60,13 @@ class BaseModel(models.Model):
     updated_by = models.CharField(max_length=200, blank=True)
     deleted_by = models.CharField(max_length=200, blank=True)
 
+    objects = AliveManager()
+    all_objects = AllObjectsManager()
+
     class Meta:
         abstract = True
+
+    def soft_delete(self, by=''):
+        self.deleted = timezone.now()
+        self.deleted_by = by
+        self.save(update_fields=['deleted', 'deleted_by', 'updated'])
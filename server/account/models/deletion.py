@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class AccountDeletion(models.Model):
+    """
+    Deletion of a user account, carried out in batches by account.deletion.
+
+    Only the user id is kept, the user row itself is anonymized when the
+    deletion is requested and deleted last.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATES = (
+        (PENDING, _('pending')),
+        (RUNNING, _('running')),
+        (DONE, _('done')),
+        (FAILED, _('failed')),
+    )
+
+    user_id = models.IntegerField(unique=True)
+    requested = models.DateTimeField(auto_now_add=True)
+    requested_by = models.CharField(max_length=200, blank=True)
+    state = models.CharField(max_length=10, choices=STATES, default=PENDING)
+    # current step of account.deletion.STEPS, and the last pk it processed
+    step = models.CharField(max_length=30, blank=True)
+    cursor = models.BigIntegerField(default=0)
+    processed = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'account_deletions'
+        indexes = [
+            # unfinished jobs
+            models.Index(
+                fields=['requested'], name='account_deletions_open_idx',
+                condition=models.Q(state__in=('pending', 'running')),
+            ),
+        ]
+
+    def __str__(self):
+        return 'user {} ({})'.format(self.user_id, self.state)
@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class RefreshTokenClaim(models.Model):
+    """
+    Refresh token which was used for a rotation, kept until it expires (see account.revocation)
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'account_refresh_token_claims'
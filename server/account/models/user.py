@@ -1,12 +1,29 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.db import models, router, transaction
+from django.dispatch import Signal
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.tokens import RefreshToken
-from .base import BaseModel
+from .base import BaseModel, alive_index, tombstone_index
 
 
-class UserManager(BaseUserManager):
+# sent by `UserQuerySet.update()` with the pks of users whose is_active it set, as update() sends no signals
+activation_changed = Signal()
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        if 'is_active' not in kwargs:
+            return super().update(**kwargs)
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            pks = list(self.using(using).values_list('pk', flat=True))
+            count = super().update(**kwargs)
+            activation_changed.send(sender=self.model, pks=pks, using=using)
+        return count
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         """
         Creates and saves new user
@@ -28,6 +45,18 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def profile_lookups(self):
+        """
+        Prefetches for routes and dropout reasons along with their categories
+        """
+        return (
+            models.Prefetch('routes', queryset=UserRouteMap.objects.select_related('category')),
+            models.Prefetch('dropout_reasons', queryset=UserDropoutReasonMap.objects.select_related('category')),
+        )
+
+    def with_profile(self):
+        return self.get_queryset().prefetch_related(*self.profile_lookups())
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(
@@ -57,6 +86,8 @@ class User(AbstractBaseUser, PermissionsMixin):
         ),
     )
     date_joined = models.DateTimeField(_('date joined'), default=timezone.now)
+    # coalesced, up to a few minutes behind (see account.activity)
+    last_seen = models.DateTimeField(_('last seen'), blank=True, null=True)
 
     EMAIL_FIELD = 'email'
     USERNAME_FIELD = 'email'
@@ -65,6 +96,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = 'account_users'
+        indexes = [
+            # keyset pagination of user listing
+            models.Index(fields=['-date_joined', '-id'], name='account_users_joined_idx'),
+        ]
         
     @property
     def tokens(self):
@@ -83,6 +118,10 @@ class SignupRouteCategory(BaseModel):
 
     class Meta:
         db_table = 'account_signup_route_category'
+        indexes = [
+            alive_index(['name'], 'account_src_alive_name_idx'),
+            tombstone_index('account_src_tombstone_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -101,6 +140,11 @@ class UserRouteMap(BaseModel):
 
     class Meta:
         db_table = 'account_user_route_map'
+        indexes = [
+            alive_index(['user', 'category'], 'account_urm_alive_user_idx'),
+            alive_index(['category'], 'account_urm_alive_cat_idx'),
+            tombstone_index('account_urm_tombstone_idx'),
+        ]
 
 
 class DropoutReasonCategory(BaseModel):
@@ -111,6 +155,10 @@ class DropoutReasonCategory(BaseModel):
 
     class Meta:
         db_table = 'account_dropout_reason_category'
+        indexes = [
+            alive_index(['name'], 'account_drc_alive_name_idx'),
+            tombstone_index('account_drc_tombstone_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -129,3 +177,8 @@ class UserDropoutReasonMap(BaseModel):
 
     class Meta:
         db_table = 'account_user_dropout_reason_map'
+        indexes = [
+            alive_index(['user', 'category'], 'account_udrm_alive_user_idx'),
+            alive_index(['category'], 'account_udrm_alive_cat_idx'),
+            tombstone_index('account_udrm_tombstone_idx'),
+        ]
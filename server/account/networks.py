@@ -0,0 +1,179 @@
+"""
+Client IP address resolution and IP allow/deny lists.
+
+Networks are compiled into `PrefixTrie`s, multibit tries with one level
+per address byte. Lookups cost one dict access per byte of the address
+(4 for IPv4, 16 for IPv6), however many networks there are.
+
+`X-Forwarded-For` is only believed as far as it was written by trusted
+proxies (`settings.TRUSTED_PROXIES`): starting from the peer address, hops
+are walked from the right while the current hop is a trusted proxy, and
+the first untrusted hop is the client.
+
+The tries are compiled from settings on first use, or at startup with
+`warm_up`, and again when the settings change.
+"""
+import ipaddress
+from threading import Lock
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+STRIDE = 8
+
+
+def parse_address(value):
+    """
+    Returns the ipaddress address of a string, IPv4-mapped IPv6 addresses
+    as IPv4, or None when it is not an address
+    """
+    try:
+        address = ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+
+class PrefixTrie:
+    """
+    Longest prefix match over IPv4 and IPv6 networks.
+
+    Each node maps the next address byte to the value of the longest
+    network ending within that byte, and to the child node. Networks
+    whose length is not a multiple of 8 are expanded over all the byte
+    values they cover.
+    """
+    def __init__(self, networks=()):
+        # by IP version: (default value, root node), a node is (values, children)
+        self._roots = {4: [None, ({}, {})], 6: [None, ({}, {})]}
+        # (prefix length, value) of expanded entries, longer networks win
+        self._lengths = {}
+        self._size = 0
+        for network in networks:
+            if isinstance(network, tuple):
+                self.add(*network)
+            else:
+                self.add(network)
+
+    def add(self, network, value=True):
+        network = ipaddress.ip_network(network.strip() if isinstance(network, str) else network, strict=False)
+        root = self._roots[network.version]
+        self._size += 1
+        length = network.prefixlen
+        if length == 0:
+            root[0] = value
+            return
+
+        packed = network.network_address.packed
+        node = root[1]
+        full, rest = divmod(length, STRIDE)
+        if rest == 0:
+            full, rest = full - 1, STRIDE
+        for byte in packed[:full]:
+            node = node[1].setdefault(byte, ({}, {}))
+
+        first = packed[full]
+        for byte in range(first, first + (1 << (STRIDE - rest))):
+            key = (id(node), byte)
+            if self._lengths.get(key, -1) <= length:
+                self._lengths[key] = length
+                node[0][byte] = value
+
+    def lookup(self, address, default=None):
+        """
+        Returns the value of the longest network containing the address
+        """
+        if isinstance(address, str):
+            address = parse_address(address)
+            if address is None:
+                return default
+        value, node = self._roots[address.version]
+        for byte in address.packed:
+            values, children = node
+            if byte in values:
+                value = values[byte]
+            node = children.get(byte)
+            if node is None:
+                break
+        return default if value is None else value
+
+    def __contains__(self, address):
+        return self.lookup(address) is not None
+
+    def __len__(self):
+        return self._size
+
+
+class ClientAddressResolver:
+    def __init__(self, trusted_proxies=(), allow=(), deny=()):
+        self.trusted_proxies = PrefixTrie(trusted_proxies)
+        self.allow = PrefixTrie(allow)
+        self.deny = PrefixTrie(deny)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            getattr(settings, 'TRUSTED_PROXIES', ()),
+            getattr(settings, 'IP_ALLOW_LIST', ()),
+            getattr(settings, 'IP_DENY_LIST', ()),
+        )
+
+    def client_address(self, meta):
+        """
+        Returns the client address of a request, by its META
+        """
+        remote_addr = meta.get('REMOTE_ADDR') or ''
+        address = parse_address(remote_addr)
+        if address is None:
+            return remote_addr or None
+
+        forwarded_for = meta.get('HTTP_X_FORWARDED_FOR')
+        if not forwarded_for or address not in self.trusted_proxies:
+            return str(address)
+
+        for hop in reversed(forwarded_for.split(',')):
+            hop = parse_address(hop)
+            if hop is None:
+                # not written by a proxy we trust, the last known hop is the client
+                break
+            address = hop
+            if address not in self.trusted_proxies:
+                break
+        return str(address)
+
+    def allows(self, address):
+        address = parse_address(address) if isinstance(address, str) else address
+        if address is None:
+            return not len(self.allow)
+        if len(self.allow) and address not in self.allow:
+            return False
+        return address not in self.deny
+
+
+_lock = Lock()
+_resolver = None
+
+
+def get_resolver():
+    global _resolver
+    resolver = _resolver
+    if resolver is None:
+        with _lock:
+            if _resolver is None:
+                _resolver = ClientAddressResolver.from_settings()
+            resolver = _resolver
+    return resolver
+
+
+@receiver(setting_changed)
+def reset_resolver(setting, **kwargs):
+    global _resolver
+    if setting in ('TRUSTED_PROXIES', 'IP_ALLOW_LIST', 'IP_DENY_LIST'):
+        _resolver = None
+
+
+def client_address(meta):
+    return get_resolver().client_address(meta)
@@ -0,0 +1,86 @@
+"""
+Process-wide in-memory registries for small lookup tables
+"""
+import time
+from threading import Lock
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS as PRIMARY
+from .conditional import VersionCounter
+from .models import SignupRouteCategory, DropoutReasonCategory
+
+
+class CategoryRegistry:
+    """
+    Lazily loaded snapshot of a category table, keyed by pk.
+
+    Snapshots are shared between requests, so the returned instances must be
+    treated as read-only. Other workers learn about changes through a version
+    number kept in the shared cache, which is bumped on every save/delete.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.version = VersionCounter('account:registry:{}:version'.format(model._meta.label_lower))
+        self._lock = Lock()
+        self._version = None
+        # (entries by pk, alive categories), replaced as a whole
+        self._snapshot = None
+        self._next_check = 0
+
+    def __deepcopy__(self, memo):
+        # shared singleton, e.g. when serializer fields are copied
+        return self
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'CATEGORY_REGISTRY_CHECK_INTERVAL', 1)
+
+    def _load(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+
+        with self._lock:
+            version = self.version.get()
+            if self._snapshot is None or version != self._version:
+                # from the primary, a lagging replica would be cached until the next change
+                entries = {
+                    category.pk: category
+                    for category in self.model.all_objects.using(PRIMARY).order_by('pk')
+                }
+                alive = [category for category in entries.values() if category.deleted is None]
+                self._snapshot = (entries, alive)
+                self._version = version
+            self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+
+    def get(self, pk, include_deleted=False):
+        entries, _ = self._load()
+        category = entries.get(pk)
+        if category is None or (category.deleted is not None and not include_deleted):
+            return None
+        return category
+
+    def all(self):
+        _, alive = self._load()
+        return list(alive)
+
+    def loaded_version(self):
+        """
+        Version of the snapshot `get()` and `all()` currently answer from
+        """
+        self._load()
+        return self._version
+
+    def invalidate(self):
+        self.version.bump()
+        with self._lock:
+            self._snapshot = None
+
+
+signup_route_categories = CategoryRegistry(SignupRouteCategory)
+dropout_reason_categories = CategoryRegistry(DropoutReasonCategory)
+
+registries = {
+    SignupRouteCategory: signup_route_categories,
+    DropoutReasonCategory: dropout_reason_categories,
+}
@@ -0,0 +1,61 @@
+"""
+JSON renderer backed by orjson, with DRF's stdlib based renderer as fallback.
+
+orjson serializes datetimes, dates, times and UUIDs itself. Everything else
+it does not know (Decimals, lazy strings, querysets, ...) goes through DRF's
+JSONEncoder.default, so the output matches DRF's except that datetimes keep
+their microseconds. The stdlib renderer is used when orjson is not installed
+and when an indent other than 2 is asked for.
+"""
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# DRF escapes these for embedding JSON into <script> tags
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        option = ORJSON_OPTIONS
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent:
+            if indent != 2:
+                return super().render(data, accepted_media_type, renderer_context)
+            option |= orjson.OPT_INDENT_2
+
+        content = orjson.dumps(data, default=encoder.default, option=option)
+        if LINE_SEPARATOR in content or PARAGRAPH_SEPARATOR in content:
+            content = content.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return content
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """
+    Lets views answer `Accept: text/event-stream` (EventSource); responses
+    which are not streamed, e.g. errors, are sent as a single 'error' event
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b'event: error\ndata: ' + JSONRenderer().render(data) + b'\n\n'
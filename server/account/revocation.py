@@ -0,0 +1,127 @@
+"""
+Revocation of JWTs by their id (jti), without a blacklist table.
+
+Only the claim of a refresh token for a rotation goes through the database:
+it has to be atomic, which `cache.add` is not on every backend (the file
+based cache checks, then writes).
+"""
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from .models import RefreshTokenClaim
+
+
+class RevokedTokenSet:
+    """
+    Set of revoked token ids, each kept only until the token itself expires.
+
+    Revocations are written to the shared cache under the jti, with the
+    remaining token lifetime as timeout, so every worker sees them and the
+    cache drops them on its own. Each process additionally remembers the
+    revocations it has seen in buckets by expiry time: repeated checks of a
+    revoked token stay in memory, and compaction drops whole buckets once all
+    of their tokens have expired.
+    """
+    key_prefix = 'account:revoked-jti:'
+    bucket_seconds = 300
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = Lock()
+        self._next_compaction = 0
+
+    def _bucket(self, exp):
+        return int(exp) // self.bucket_seconds
+
+    def _remember(self, jti, exp):
+        with self._lock:
+            self._buckets.setdefault(self._bucket(exp), set()).add(jti)
+
+    def _maybe_compact(self, now):
+        if now >= self._next_compaction:
+            self.compact(now)
+
+    def add(self, jti, exp):
+        """
+        Revokes the token, returns False if it was revoked already (or expired)
+        """
+        now = time.time()
+        timeout = int(exp - now) + 1
+        if timeout <= 0:
+            return False
+        bucket = self._buckets.get(self._bucket(exp))
+        if bucket is not None and jti in bucket:
+            return False
+        added = cache.add(self.key_prefix + jti, 1, timeout)
+        self._remember(jti, exp)
+        self._maybe_compact(now)
+        return added
+
+    def contains(self, jti, exp):
+        now = time.time()
+        if exp <= now:
+            # expired tokens are rejected anyway, and may already be compacted
+            return False
+        self._maybe_compact(now)
+
+        bucket = self._buckets.get(self._bucket(exp))
+        if bucket is not None and jti in bucket:
+            return True
+        if cache.get(self.key_prefix + jti) is not None:
+            self._remember(jti, exp)
+            return True
+        return False
+
+    def compact(self, now=None):
+        """
+        Drops buckets whose tokens have all expired, returns the number of dropped ids
+        """
+        now = time.time() if now is None else now
+        current = self._bucket(now)
+        dropped = 0
+        with self._lock:
+            for bucket in [bucket for bucket in self._buckets if bucket < current]:
+                dropped += len(self._buckets.pop(bucket))
+            self._next_compaction = (current + 1) * self.bucket_seconds
+        return dropped
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+
+revoked_tokens = RevokedTokenSet()
+
+
+def revoke_token(token):
+    """
+    Returns False if the token was revoked already
+    """
+    return revoked_tokens.add(token['jti'], token['exp'])
+
+
+def is_token_revoked(token):
+    return revoked_tokens.contains(token['jti'], token['exp'])
+
+
+def claim_token(token):
+    """
+    Claims a refresh token for a single rotation and revokes it, returns
+    False if it was claimed or revoked already.
+
+    The claim is a unique insert, so of concurrent requests using the same
+    token only one gets True.
+    """
+    if is_token_revoked(token):
+        return False
+    try:
+        with transaction.atomic():
+            RefreshTokenClaim.objects.create(
+                jti=token['jti'], expires=datetime.fromtimestamp(token['exp'], timezone.utc),
+            )
+    except IntegrityError:
+        return False
+    # later checks of the token need no query
+    revoke_token(token)
+    return True
@@ -0,0 +1,99 @@
+"""
+Database routing between the primary, its read replicas and the access log database.
+
+Reads of users and categories go to one of `settings.DATABASE_REPLICAS`,
+writes go to 'default'. Once a request (or any other unit of work, see
+`unpin()`) has written to the primary, its later reads stay on the
+primary so that it reads its own writes; reads inside a transaction on the
+primary stay there as well.
+
+Access logs, their string dictionaries, visitor sketches and access counts live in
+`settings.ACCESS_LOG_DATABASE`, reads and writes alike. While that is
+'default', their reads are sent to the replicas like any other.
+"""
+import random
+import threading
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+# models of the account app, by model_name
+LOG_MODELS = {'accesslog', 'useragent', 'requesteduri', 'referer', 'visitorsketch', 'accesscount'}
+REPLICATED_MODELS = {
+    'user',
+    'signuproutecategory',
+    'userroutemap',
+    'dropoutreasoncategory',
+    'userdropoutreasonmap',
+}
+
+_state = threading.local()
+
+
+def pin_primary():
+    _state.pinned = True
+
+
+def unpin():
+    """
+    Starts a new unit of work, whose reads may go to replicas again
+    """
+    _state.pinned = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def log_database():
+    return getattr(settings, 'ACCESS_LOG_DATABASE', PRIMARY)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def is_log_model(model):
+    return model._meta.app_label == 'account' and model._meta.model_name in LOG_MODELS
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if is_log_model(model) and log_database() != PRIMARY:
+            return log_database()
+        if model._meta.app_label != 'account':
+            return None
+        if model._meta.model_name not in REPLICATED_MODELS and not is_log_model(model):
+            return None
+
+        available = replicas()
+        if not available or is_pinned() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return random.choice(available)
+
+    def db_for_write(self, model, **hints):
+        if is_log_model(model):
+            return log_database()
+        pin_primary()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # access logs in their own database only refer to users by id
+        if log_database() != PRIMARY and is_log_model(obj1) != is_log_model(obj2):
+            return False
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            # replicated from the primary
+            return False
+        if log_database() == PRIMARY:
+            return None
+        if db == log_database():
+            return app_label == 'account' and model_name in LOG_MODELS
+        if app_label == 'account' and model_name in LOG_MODELS:
+            return False
+        return None
@@ -1,5 +1,21 @@
+from .analytics import (
+    PeriodQuerySerializer,
+    AccessLogStatsQuerySerializer,
+    AccessLogTailQuerySerializer,
+)
 from .user import (
     UserSerializer,
+    UserListSerializer,
     UpdateUserPasswordSerializer,
     LoginSerializer,
+    SignupRouteCategorySerializer,
+    DropoutReasonCategorySerializer,
+    UserRouteMapSerializer,
+    UserDropoutReasonMapSerializer,
+    UserProfileSerializer,
+)
+from .token import (
+    RotatingTokenRefreshSerializer,
+    RevocationAwareTokenVerifySerializer,
+    TokenRevokeSerializer,
 )
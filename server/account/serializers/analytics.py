@@ -0,0 +1,35 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+
+class PeriodQuerySerializer(serializers.Serializer):
+    # periods are scanned within the request, longer ones are for the
+    # access_log_stats and unique_visitors commands
+    max_days = 92
+
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        since, until = attrs.get('since'), attrs.get('until')
+        if since and until and since > until:
+            raise serializers.ValidationError('since must not be after until')
+        if since and ((until or timezone.localdate()) - since).days >= self.max_days:
+            raise serializers.ValidationError(
+                'periods are limited to {} days, use the management commands for longer ones'.format(self.max_days)
+            )
+        return attrs
+
+
+class AccessLogStatsQuerySerializer(PeriodQuerySerializer):
+    top = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class AccessLogTailQuerySerializer(serializers.Serializer):
+    status = serializers.RegexField(r'^([1-5]\d\d|[1-5]xx)$', required=False)
+    uri = serializers.CharField(required=False)
+    user = serializers.IntegerField(required=False)
+    method = serializers.CharField(required=False)
+
+    def validate_method(self, value):
+        return value.upper()
@@ -0,0 +1,48 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from ..revocation import claim_token, is_token_revoked, revoke_token
+
+
+def check_not_revoked(token):
+    if is_token_revoked(token):
+        raise TokenError(_('Token is revoked'))
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            # concurrent refreshes with the same token cannot both pass
+            if not claim_token(refresh):
+                raise TokenError(_('Token is revoked'))
+        else:
+            check_not_revoked(refresh)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+class RevocationAwareTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        check_not_revoked(UntypedToken(attrs['token']))
+        return {}
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        revoke_token(refresh)
+        return {}
@@ -1,8 +1,17 @@
 from django.contrib.auth import authenticate, get_user_model
 from django.db import transaction
 from django.utils.translation import ugettext_lazy as _
-from rest_framework import serializers
-from ..models import User
+from rest_framework import exceptions, serializers
+from ..models import (
+    User,
+    SignupRouteCategory,
+    UserRouteMap,
+    DropoutReasonCategory,
+    UserDropoutReasonMap,
+)
+from ..registry import signup_route_categories, dropout_reason_categories
+from ..throttling import login_attempt, login_throttle
+from .base import BaseModelSerializer
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -37,6 +46,16 @@ class UserSerializer(serializers.ModelSerializer):
         return norm_email
 
 
+class UserListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = (
+            'id', 'email', 'date_joined', 'last_login', 'last_seen',
+            'is_active', 'is_verified', 'is_staff',
+        )
+        read_only_fields = fields
+
+
 class UpdateUserPasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField()
     
@@ -51,9 +70,16 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
+        request = self.context.get('request')
+
+        # before authenticate, rejected attempts do not cost a password hash
+        attempt = login_attempt(request, email)
+        wait, counted = login_throttle.count(attempt)
+        if wait:
+            raise exceptions.Throttled(wait)
 
         user = authenticate(
-            request=self.context.get('request'),
+            request=request,
             username=email,
             password=password,
         )
@@ -61,5 +87,81 @@ class LoginSerializer(serializers.Serializer):
         if not user:
             msg = _('Unable to authenticate with provided credentials.')
             raise serializers.ValidationError(msg, code='login')
+        login_throttle.refund(counted)
         attrs['user'] = user
         return attrs
+
+
+class CategoryField(serializers.Field):
+    """
+    Category relation resolved from an in-memory registry instead of the database
+    """
+    default_error_messages = {
+        'does_not_exist': _('Invalid pk "{pk_value}" - object does not exist.'),
+        'incorrect_type': _('Incorrect type. Expected pk value, received {data_type}.'),
+    }
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        field = instance._meta.get_field(self.source)
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+        return self.registry.get(getattr(instance, field.attname), include_deleted=True)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        category = self.registry.get(pk)
+        if category is None:
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+    def to_representation(self, value):
+        return {'id': value.pk, 'name': value.name}
+
+
+class SignupRouteCategorySerializer(BaseModelSerializer):
+    class Meta:
+        model = SignupRouteCategory
+        fields = ('id', 'name', 'created', 'updated')
+
+
+class DropoutReasonCategorySerializer(BaseModelSerializer):
+    class Meta:
+        model = DropoutReasonCategory
+        fields = ('id', 'name', 'created', 'updated')
+
+
+class UserRouteMapSerializer(BaseModelSerializer):
+    category = CategoryField(signup_route_categories)
+
+    class Meta:
+        model = UserRouteMap
+        fields = ('id', 'category', 'description', 'created', 'updated')
+
+
+class UserDropoutReasonMapSerializer(BaseModelSerializer):
+    category = CategoryField(dropout_reason_categories)
+
+    class Meta:
+        model = UserDropoutReasonMap
+        fields = ('id', 'category', 'description', 'created', 'updated')
+
+
+class UserProfileSerializer(serializers.ModelSerializer):
+    routes = UserRouteMapSerializer(many=True, read_only=True)
+    dropout_reasons = UserDropoutReasonMapSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = User
+        # no last_seen, its updates do not change the ETag of /me/profile/
+        fields = (
+            'id', 'email', 'date_joined', 'last_login', 'is_superuser',
+            'is_active', 'is_staff', 'is_verified', 'routes', 'dropout_reasons',
+        )
+        read_only_fields = fields
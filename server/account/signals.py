@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .conditional import user_version
+from .models.base import soft_deleted
+from .models.user import activation_changed
+from .models import (
+    AccessLog,
+    SignupRouteCategory,
+    DropoutReasonCategory,
+    UserRouteMap,
+    UserDropoutReasonMap,
+)
+from .registry import registries
+from .routers import unpin
+
+
+@receiver(post_save, sender=SignupRouteCategory)
+@receiver(post_save, sender=DropoutReasonCategory)
+@receiver(post_delete, sender=SignupRouteCategory)
+@receiver(post_delete, sender=DropoutReasonCategory)
+@receiver(soft_deleted, sender=SignupRouteCategory)
+@receiver(soft_deleted, sender=DropoutReasonCategory)
+def invalidate_category_registry(sender, **kwargs):
+    # after commit, so that no worker caches the old rows under the new version
+    transaction.on_commit(registries[sender].invalidate)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def bump_user_version(sender, instance, **kwargs):
+    # after commit, so that nothing reads the old row under the new version
+    transaction.on_commit(user_version(instance.pk).bump)
+
+
+@receiver(activation_changed, sender=get_user_model())
+def bump_user_versions(sender, pks, using, **kwargs):
+    # deactivated users must not be answered 304 from their old tags
+    for pk in pks:
+        transaction.on_commit(user_version(pk).bump, using=using)
+
+
+@receiver(post_delete, sender=get_user_model())
+def detach_access_logs(sender, instance, **kwargs):
+    # the relation has no constraint and may cross databases, see AccessLog.user
+    AccessLog.objects.filter(user_id=instance.pk).update(user=None)
+
+
+@receiver(post_save, sender=UserRouteMap)
+@receiver(post_save, sender=UserDropoutReasonMap)
+@receiver(post_delete, sender=UserRouteMap)
+@receiver(post_delete, sender=UserDropoutReasonMap)
+def bump_owner_version(sender, instance, **kwargs):
+    # part of the owner's profile
+    transaction.on_commit(user_version(instance.user_id).bump)
+
+
+@receiver(soft_deleted, sender=UserRouteMap)
+@receiver(soft_deleted, sender=UserDropoutReasonMap)
+def bump_owner_versions(sender, pks, using, **kwargs):
+    user_ids = set(sender.all_objects.using(using).filter(pk__in=pks).values_list('user_id', flat=True))
+    for user_id in user_ids:
+        transaction.on_commit(user_version(user_id).bump, using=using)
+
+
+@receiver(request_started)
+def start_unpinned(sender, **kwargs):
+    # reads may go to replicas until the request writes to the primary
+    unpin()
@@ -0,0 +1,78 @@
+"""
+Work done once per process before the first request.
+
+`warm_up()` runs from the WSGI entry point (scaffold/wsgi.py) when
+`ACCOUNT_WARM_UP` is set, so management commands and tests skip it. It
+imports the URLconf and everything it references, fills the URL
+resolver's reverse lookups, instantiates template engines and loaders,
+imports DRF's configured classes and compiles the IP network tries, so
+the first request of a worker does not pay for them. Nothing here touches
+the database, so with gunicorn's `preload_app` (see gunicorn.conf.py) it
+runs once in the master and the workers share the result copy-on-write.
+"""
+import logging
+import time
+from django.template import TemplateDoesNotExist, engines
+from django.urls import get_resolver
+
+
+logger = logging.getLogger(__name__)
+
+# compiled ahead when the template engine caches compiled templates
+WARM_UP_TEMPLATES = (
+    'user/email_verification.html',
+    'admin/login.html',
+    'admin/index.html',
+)
+
+DRF_SETTINGS = (
+    'DEFAULT_RENDERER_CLASSES',
+    'DEFAULT_PARSER_CLASSES',
+    'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES',
+    'DEFAULT_FILTER_BACKENDS',
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+)
+
+
+def warm_url_resolver():
+    resolver = get_resolver()
+    resolvers = [resolver]
+    while resolvers:
+        resolver = resolvers.pop()
+        resolver.reverse_dict  # populates the resolver
+        resolvers.extend(sub_resolver for _, sub_resolver in resolver.namespace_dict.values())
+
+
+def warm_templates():
+    for engine in engines.all():
+        for name in WARM_UP_TEMPLATES:
+            try:
+                engine.get_template(name)
+            except TemplateDoesNotExist:
+                pass
+
+
+def warm_rest_framework():
+    from rest_framework.settings import api_settings
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    for name in DRF_SETTINGS:
+        getattr(api_settings, name)
+    jwt_settings.AUTH_TOKEN_CLASSES
+
+
+def warm_networks():
+    from .networks import get_resolver
+
+    # compiles the trusted proxy and allow/deny list tries
+    get_resolver()
+
+
+def warm_up():
+    started = time.perf_counter()
+    warm_url_resolver()
+    warm_templates()
+    warm_rest_framework()
+    warm_networks()
+    logger.debug('Warmed up in %.1f ms', (time.perf_counter() - started) * 1000)
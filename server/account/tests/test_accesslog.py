@@ -1,8 +1,15 @@
-from django.test import TestCase, Client
+from io import StringIO
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
-from ..models import AccessLog
+from ..accesscounts import AccessCounter, access_counter
+from ..dictionaries import StringDictionary
+from ..middleware.policy import AccessLogPolicy
+from ..models import AccessLog, AccessCount, UserAgent
 
 
 REGISTER_USER_API = reverse('account:register')
@@ -18,6 +25,13 @@ class AccessLogTests(TestCase):
             password='password',
         )
 
+    def test_deleted_user_detached(self):
+        log = AccessLog.objects.create(request_method='GET', requested_uri='/accounts/me/', user=self.user)
+        # deleting a user however it happens detaches its logs
+        get_user_model().objects.filter(pk=self.user.pk).delete()
+        log.refresh_from_db()
+        self.assertIsNone(log.user_id)
+
     def test_register_user_logged(self):
         self.client.post(REGISTER_USER_API, { 'email': 'user1@nav.com', 'password': 'testuser1' })
         self.assertEqual(1, AccessLog.objects.all().count())
@@ -40,3 +54,137 @@ class AccessLogTests(TestCase):
     def test_verify_token_logged(self):
         res = self.client.post(VERIFY_TOKEN_API, { 'token': 'token' })
         self.assertEqual(1, AccessLog.objects.all().count())
+
+    def test_strings_are_deduplicated(self):
+        for _ in range(3):
+            self.client.post(VERIFY_TOKEN_API, { 'token': 'token' }, HTTP_USER_AGENT='agent/1.0')
+        self.assertEqual(3, AccessLog.objects.count())
+        self.assertEqual(1, UserAgent.objects.count())
+        log = AccessLog.objects.select_related('requested_uri_ref', 'user_agent_ref').first()
+        self.assertEqual(VERIFY_TOKEN_API, log.requested_uri_ref.value)
+        self.assertEqual('agent/1.0', log.user_agent_ref.value)
+        self.assertIsNone(log.referer_ref_id)
+        self.assertEqual('', log.user_agent)
+
+    def test_compact_access_logs(self):
+        for i in range(3):
+            AccessLog.objects.create(
+                request_method='GET', requested_uri='/accounts/me/', user_agent='agent/{}'.format(i % 2),
+            )
+        call_command('compact_access_logs', chunk_size=2, stdout=StringIO())
+
+        logs = AccessLog.objects.select_related('requested_uri_ref', 'user_agent_ref').order_by('pk')
+        self.assertEqual(['agent/0', 'agent/1', 'agent/0'], [log.user_agent_ref.value for log in logs])
+        self.assertEqual({'/accounts/me/'}, {log.requested_uri_ref.value for log in logs})
+        self.assertFalse(AccessLog.objects.exclude(requested_uri='', user_agent='').exists())
+        self.assertEqual(2, UserAgent.objects.count())
+
+
+class StringDictionaryTests(TransactionTestCase):
+    def setUp(self):
+        self.dictionary = StringDictionary(UserAgent, maxsize=2)
+
+    def test_ids_are_cached(self):
+        pk = self.dictionary.id_for('agent/1.0')
+        with self.assertNumQueries(0):
+            self.assertEqual(pk, self.dictionary.id_for('agent/1.0'))
+        self.assertIsNone(self.dictionary.id_for(''))
+
+    def test_least_recently_used_is_evicted(self):
+        first = self.dictionary.id_for('a')
+        self.dictionary.id_for('b')
+        self.dictionary.id_for('a')
+        self.dictionary.id_for('c')  # evicts 'b'
+        with self.assertNumQueries(0):
+            self.assertEqual(first, self.dictionary.id_for('a'))
+        with self.assertNumQueries(1):
+            self.dictionary.id_for('b')
+
+    def test_rolled_back_ids_are_not_cached(self):
+        try:
+            with transaction.atomic():
+                self.dictionary.id_for('agent/1.0')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(UserAgent.objects.exists())
+        pk = self.dictionary.id_for('agent/1.0')
+        self.assertTrue(UserAgent.objects.filter(pk=pk).exists())
+
+    def test_values_for(self):
+        a, b = self.dictionary.id_for('a'), self.dictionary.id_for('b')
+        self.assertEqual({a: 'a', b: 'b'}, self.dictionary.values_for([a, b, None]))
+
+
+class AccessLogPolicyTests(TestCase):
+    def decide(self, policy, url_name='account:token_verify', path='/accounts/token/verify/',
+               status_code=200, latency=10, method='POST'):
+        return policy.decide(url_name, path, status_code, latency, method)
+
+    def test_first_matching_rule_wins(self):
+        policy = AccessLogPolicy([
+            {'status': '5xx', 'action': 'log'},
+            {'min_latency': 500, 'action': 'log'},
+            {'prefix': '/accounts/token/', 'action': 'count'},
+        ])
+        self.assertEqual('count', self.decide(policy).action)
+        self.assertEqual('log', self.decide(policy, status_code=503).action)
+        self.assertEqual('log', self.decide(policy, latency=500).action)
+        self.assertEqual('log', self.decide(policy, path='/accounts/me/', url_name='account:me').action)
+
+    def test_sample_weight(self):
+        policy = AccessLogPolicy([
+            {'url_name': 'account:token_verify', 'status': ['2xx', 304], 'action': 'sample', 'rate': 0.25},
+        ])
+        decisions = [self.decide(policy) for _ in range(400)]
+        logged = [decision for decision in decisions if decision.action == 'log']
+        self.assertTrue(0 < len(logged) < 400)
+        self.assertEqual({4.0}, {decision.weight for decision in logged})
+        self.assertEqual('log', self.decide(policy, url_name='account:me').action)
+
+    def test_invalid_rule(self):
+        with self.assertRaises(ImproperlyConfigured):
+            AccessLogPolicy([{'status': '5xx', 'action': 'drop'}])
+        with self.assertRaises(ImproperlyConfigured):
+            AccessLogPolicy([{'path': '/', 'action': 'log'}])
+
+    @override_settings(ACCESS_LOG_POLICY=[
+        {'url_name': 'account:token_verify', 'action': 'count'},
+        {'url_name': 'account:login', 'action': 'sample', 'rate': 1},
+    ])
+    def test_middleware_applies_policy(self):
+        client = Client()
+        access_counter.take()
+        client.post(VERIFY_TOKEN_API, { 'token': 'token' })
+        self.assertEqual(0, AccessLog.objects.count())
+        self.assertEqual([1], list(access_counter.take().values()))
+
+        client.post(LOGIN_USER_API, { 'email': 'a@nav.com', 'password': 'testuser1' })
+        self.assertEqual(1.0, AccessLog.objects.get().sample_weight)
+
+
+class AccessCounterTests(TestCase):
+    def test_counts_are_flushed(self):
+        counter = AccessCounter()
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                counter.count('2020-01-01', 'account:token_verify')
+            counter.count('2020-01-01', None)
+        self.assertEqual(2, counter.flush())
+
+        # another worker
+        other = AccessCounter()
+        other.count('2020-01-01', 'account:token_verify')
+        other.flush()
+        self.assertEqual(
+            {'account:token_verify': 4, AccessCount.UNRESOLVED: 1},
+            dict(AccessCount.objects.filter(date='2020-01-01').values_list('name', 'count')),
+        )
+        self.assertEqual(0, counter.flush())
+
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_unresolved_paths_share_a_counter(self):
+        access_counter.take()
+        for i in range(3):
+            Client().get('/scan-{}/'.format(i))
+        self.assertEqual({AccessCount.UNRESOLVED: 3}, {name: count for (_, name), count in access_counter.take().items()})
@@ -0,0 +1,153 @@
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..activity import ActivityTracker, activity_tracker, write_last_seen
+from ..models import AccessLog
+
+
+USER_LIST_API = reverse('account:user-list')
+USER_INFO_API = reverse('account:me')
+USER_PROFILE_API = reverse('account:me-profile')
+
+
+def tracker(**kwargs):
+    tracker = ActivityTracker(**kwargs)
+    # claims made by requests of other tests are still in the cache
+    tracker.key_prefix = 'account:test-last-seen:{}:'.format(uuid.uuid4().hex)
+    return tracker
+
+
+def timestamp(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc).timestamp()
+
+
+class ActivityTrackerTests(TestCase):
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(email='user{}@email.com'.format(i), password='password')
+            for i in range(3)
+        ]
+
+    def last_seen(self):
+        return list(get_user_model().objects.order_by('pk').values_list('last_seen', flat=True))
+
+    def test_one_update_per_batch(self):
+        times = {user.pk: timestamp(2020, 1, 1, 0, i) for i, user in enumerate(self.users)}
+        with self.assertNumQueries(1):
+            self.assertEqual(3, write_last_seen(times))
+        self.assertEqual([datetime(2020, 1, 1, 0, i, tzinfo=dt_timezone.utc) for i in range(3)], self.last_seen())
+
+        with mock.patch('account.activity.BATCH_SIZE', 2), self.assertNumQueries(2):
+            write_last_seen(times)
+
+    def test_seen_is_coalesced(self):
+        activity = tracker()
+        with self.assertNumQueries(0):
+            for minute in range(10):
+                activity.seen(self.users[0].pk, timestamp(2020, 1, 1, 0, minute))
+            activity.seen(self.users[0].pk, timestamp(2020, 1, 1, 0, 5))
+        self.assertEqual(1, len(activity))
+        self.assertEqual(1, activity.flush())
+        self.assertEqual(datetime(2020, 1, 1, 0, 9, tzinfo=dt_timezone.utc), self.last_seen()[0])
+        self.assertEqual(0, len(activity))
+
+    def test_written_once_per_interval(self):
+        activity = tracker()
+        activity.seen(self.users[0].pk, timestamp(2020, 1, 1, 0, 0))
+        activity.flush()
+
+        # another worker within the write interval
+        other = tracker()
+        other.key_prefix = activity.key_prefix
+        other.seen(self.users[0].pk, timestamp(2020, 1, 1, 0, 1))
+        other.seen(self.users[1].pk, timestamp(2020, 1, 1, 0, 1))
+        self.assertEqual(1, other.flush())
+        self.assertEqual(datetime(2020, 1, 1, 0, 0, tzinfo=dt_timezone.utc), self.last_seen()[0])
+        # kept until the claim expires
+        self.assertEqual(1, len(other))
+
+        without_interval = tracker(write_interval=0)
+        without_interval.seen(self.users[0].pk, timestamp(2020, 1, 1, 0, 2))
+        self.assertEqual(1, without_interval.flush())
+
+    def test_never_goes_backwards(self):
+        write_last_seen({self.users[0].pk: timestamp(2020, 1, 1, 0, 5)})
+        # a worker which kept an older time until its claim
+        write_last_seen({self.users[0].pk: timestamp(2020, 1, 1, 0, 1), self.users[1].pk: timestamp(2020, 1, 1)})
+        self.assertEqual(
+            [datetime(2020, 1, 1, 0, 5, tzinfo=dt_timezone.utc), datetime(2020, 1, 1, tzinfo=dt_timezone.utc), None],
+            self.last_seen(),
+        )
+
+    def test_failed_claim_is_retried(self):
+        activity = tracker()
+        activity.seen(self.users[0].pk, timestamp(2020, 1, 1))
+        with mock.patch('account.activity.cache.add', side_effect=OSError), \
+                self.assertLogs('account.activity', 'ERROR'):
+            self.assertEqual(0, activity.flush())
+        self.assertEqual(1, len(activity))
+        self.assertEqual(1, activity.flush())
+
+    def test_failed_flush_is_retried(self):
+        activity = tracker()
+        activity.seen(self.users[0].pk, timestamp(2020, 1, 1))
+        with mock.patch('account.activity.write_last_seen', side_effect=DatabaseError), \
+                self.assertLogs('account.activity', 'ERROR'):
+            self.assertEqual(0, activity.flush())
+        self.assertEqual(1, len(activity))
+        self.assertEqual(1, activity.flush())
+        self.assertIsNotNone(self.last_seen()[0])
+
+
+class LastSeenApiTests(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@email.com',
+            password='password',
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.admin_user.tokens['access'])
+
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_requests_are_tracked(self):
+        with mock.patch.object(activity_tracker, 'seen') as seen:
+            self.client.get(USER_INFO_API)
+            APIClient().get(USER_INFO_API)
+        seen.assert_called_once_with(self.admin_user.pk)
+
+    def test_not_modified_is_tracked(self):
+        etag = self.client.get(USER_INFO_API)['ETag']
+        AccessLog.objects.all().delete()
+        activity = tracker()
+        with mock.patch('account.middleware.tracking.activity_tracker', activity):
+            # authentication is skipped
+            res = self.client.get(USER_INFO_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(1, activity.flush())
+        self.admin_user.refresh_from_db()
+        self.assertIsNotNone(self.admin_user.last_seen)
+        self.assertEqual([(304, self.admin_user.pk)], list(AccessLog.objects.values_list('status_code', 'user_id')))
+
+    def test_user_list(self):
+        write_last_seen({self.admin_user.pk: timestamp(2020, 1, 1)})
+        res = self.client.get(USER_LIST_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual('2020-01-01T09:00:00+09:00', res.data['results'][0]['last_seen'])
+
+        res = self.client.get(USER_LIST_API, {'seen_after': '2020-01-02T00:00:00Z'})
+        self.assertEqual([], res.data['results'])
+
+    def test_not_in_conditional_profile(self):
+        # its writes do not change the ETag, so a 304 would serve it stale
+        res = self.client.get(USER_PROFILE_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('last_seen', res.data)
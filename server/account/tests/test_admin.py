@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..admin import EstimatedCountPaginator
+from ..models import AccessLog
+
+
+ACCESS_LOG_CHANGELIST = reverse('admin:account_accesslog_changelist')
+USER_CHANGELIST = reverse('admin:account_user_changelist')
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@email.com',
+            password='password',
+        )
+        self.client.force_login(self.admin_user)
+        for _ in range(3):
+            AccessLog.objects.create(request_method='GET', requested_uri='/', user=self.admin_user)
+
+    def test_access_log_changelist(self):
+        res = self.client.get(ACCESS_LOG_CHANGELIST)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(3, res.context['cl'].result_count)
+
+    def test_access_log_changelist_date_bucket(self):
+        created_month = AccessLog.objects.first().created_month
+        res = self.client.get(ACCESS_LOG_CHANGELIST, {'created_month': created_month})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(3, res.context['cl'].result_count)
+
+    def test_user_changelist(self):
+        res = self.client.get(USER_CHANGELIST)
+        self.assertEqual(res.status_code, 200)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for _ in range(5):
+            AccessLog.objects.create(request_method='GET')
+
+    def test_estimate_above_threshold(self):
+        AccessLog.objects.filter(pk=AccessLog.objects.first().pk).delete()
+        paginator = EstimatedCountPaginator(AccessLog.objects.order_by('-id'), 2)
+        paginator.estimate_threshold = 1
+        # from the highest pk, so deleted rows are still counted
+        self.assertEqual(AccessLog.objects.order_by('-id')[0].pk, paginator.count)
+
+    def test_filtered_count_is_capped(self):
+        paginator = EstimatedCountPaginator(AccessLog.objects.filter(request_method='GET'), 2)
+        paginator.count_limit = 3
+        self.assertEqual(3, paginator.count)
+
+    def test_unordered_pages_newest_first(self):
+        paginator = EstimatedCountPaginator(AccessLog.objects.all(), 2)
+        self.assertEqual(
+            list(AccessLog.objects.order_by('-pk')[:2]), list(paginator.page(1).object_list),
+        )
@@ -0,0 +1,124 @@
+from datetime import date
+from io import StringIO
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..analytics import grouped_percentiles, summarize
+from ..dictionaries import requested_uris
+from ..models import AccessLog
+from ..sketches import HyperLogLog, hash_strings
+
+
+ACCESS_LOG_STATS_API = reverse('account:access-log-stats')
+
+
+def add_log(created_date, uri, status_code=200, latency=10, ip_addr='10.0.0.1', **kwargs):
+    AccessLog.objects.create(
+        created_date=created_date, created_month=created_date[:7], request_method='GET',
+        requested_uri_ref_id=requested_uris.id_for(uri), status_code=status_code,
+        latency=latency, ip_addr=ip_addr, **kwargs
+    )
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='user1@email.com', password='password')
+        for latency in range(1, 101):
+            add_log('2020-01-01', '/accounts/me/', latency=latency, ip_addr='10.0.0.{}'.format(latency % 10))
+        add_log('2020-01-01', '/accounts/login/', status_code=500, latency=None, user=self.user)
+        add_log('2020-01-02', '/accounts/login/', sample_weight=10, user=self.user)
+        AccessLog.objects.create(
+            created_date='2020-01-02', created_month='2020-01', request_method='GET',
+            requested_uri='/legacy/', latency=30,
+        )
+        add_log('2020-01-03', '/accounts/me/')
+
+    def summarize(self, **kwargs):
+        return summarize(since=date(2020, 1, 1), until=date(2020, 1, 2), chunk_size=7, **kwargs)
+
+    def test_summary(self):
+        stats = self.summarize()
+        self.assertEqual(112.0, stats['requests'])
+        self.assertAlmostEqual(1 / 112, stats['error_rate'])
+        self.assertEqual({'p50': 45, 'p90': 89, 'p99': 99}, stats['latency'])
+
+        me, login, legacy = stats['uris']
+        self.assertEqual(('/accounts/me/', 100.0, 0.0), (me['uri'], me['requests'], me['error_rate']))
+        self.assertEqual({'p50': 50, 'p90': 90, 'p99': 99}, me['latency'])
+        self.assertEqual(('/accounts/login/', 11.0), (login['uri'], login['requests']))
+        self.assertAlmostEqual(1 / 11, login['error_rate'])
+        self.assertEqual('/legacy/', legacy['uri'])
+
+        first, second = stats['days']
+        self.assertEqual(('2020-01-01', 101.0, 10, 1), (
+            first['date'], first['requests'], first['unique_ips'], first['unique_users'],
+        ))
+        self.assertEqual(('2020-01-02', 11.0, 2, 1), (
+            second['date'], second['requests'], second['unique_ips'], second['unique_users'],
+        ))
+
+    def test_top(self):
+        self.assertEqual(['/accounts/me/'], [uri['uri'] for uri in self.summarize(top=1)['uris']])
+
+    def test_empty_period(self):
+        stats = summarize(since=date(2019, 1, 1), until=date(2019, 1, 2))
+        self.assertEqual((0.0, [], []), (stats['requests'], stats['uris'], stats['days']))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('access_log_stats', '--since', '2020-01-01', '--until', '2020-01-02', stdout=out)
+        self.assertIn('/accounts/login/', out.getvalue())
+
+    def test_api_requires_staff(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.user.tokens['access'])
+        res = client.get(ACCESS_LOG_STATS_API)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin_user = get_user_model().objects.create_superuser(email='admin@email.com', password='password')
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + admin_user.tokens['access'])
+        res = client.get(ACCESS_LOG_STATS_API, {'since': '2020-01-01', 'until': '2020-01-02', 'top': 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(2, len(res.data['uris']))
+
+        res = client.get(ACCESS_LOG_STATS_API, {'since': '2020-01-02', 'until': '2020-01-01'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # longer periods are for access_log_stats
+        res = client.get(ACCESS_LOG_STATS_API, {'since': '2020-01-01', 'until': '2020-04-02'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = client.get(ACCESS_LOG_STATS_API, {'since': '2020-01-01'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = client.get(ACCESS_LOG_STATS_API, {'since': '2020-01-01', 'until': '2020-04-01'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class SketchTests(TestCase):
+    def test_grouped_percentiles(self):
+        groups = np.array([1, 0, 1, 1, 0])
+        values = np.array([30, 5, 10, 20, 7])
+        result = grouped_percentiles(groups, values, np.ones(5), (0, 50, 100), 3)
+        self.assertEqual([5, 5, 7], result[0].tolist())
+        self.assertEqual([10, 20, 30], result[1].tolist())
+        self.assertTrue(np.isnan(result[2]).all())
+
+    def test_hyperloglog(self):
+        sketch = HyperLogLog()
+        for start in range(0, 100000, 10000):
+            sketch.add_integers(np.arange(start, start + 10000))
+        self.assertAlmostEqual(100000, sketch.count(), delta=3000)
+
+        other = HyperLogLog()
+        other.add_integers(np.arange(50000, 150000))
+        merged = HyperLogLog.from_bytes(sketch.to_bytes()).merge(other)
+        self.assertAlmostEqual(150000, merged.count(), delta=4500)
+
+    def test_string_hashes_ignore_chunk_width(self):
+        self.assertEqual(hash_strings(['abc'])[0], hash_strings(['abc', 'a much longer value'])[0])
+        self.assertNotEqual(hash_strings(['abc'])[0], hash_strings(['abd'])[0])
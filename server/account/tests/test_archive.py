@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..analytics import weighted_percentiles
+from ..archive import AccessLogArchive, latency_percentiles, status_counts, counts_by
+from ..dictionaries import requested_uris
+from ..models import AccessLog
+
+
+def add_log(created, status_code=200, latency=10, uri='/accounts/me/', **kwargs):
+    log = AccessLog(
+        request_method='GET', requested_uri_ref_id=requested_uris.id_for(uri),
+        status_code=status_code, latency=latency, **kwargs
+    )
+    log.save()
+    # created is auto_now_add
+    AccessLog.objects.filter(pk=log.pk).update(
+        created=created,
+        created_date=timezone.localdate(created).isoformat(),
+        created_month=timezone.localdate(created).isoformat()[:7],
+    )
+    return log
+
+
+class AccessLogArchiveTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(ACCESS_LOG_ARCHIVE_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = get_user_model().objects.create_user(email='user1@email.com', password='password')
+        self.january = timezone.make_aware(datetime(2020, 1, 15, 12))
+        for latency in range(1, 101):
+            add_log(self.january, latency=latency, user=self.user if latency % 2 else None)
+        add_log(self.january, status_code=500, latency=900, uri='/accounts/login/')
+        add_log(self.january, status_code=None, latency=None, requested_uri='/legacy/', user_agent='agent/1.0')
+        self.today = add_log(timezone.now())
+
+    def archive(self, *args):
+        call_command('archive_access_logs', *args, chunk_size=7, stdout=StringIO(), stderr=StringIO())
+
+    def test_closed_months_are_moved(self):
+        self.archive()
+        self.assertEqual(['2020-01'], AccessLogArchive().months())
+        self.assertEqual([self.today.pk], list(AccessLog.objects.values_list('pk', flat=True)))
+
+        month = AccessLogArchive().month('2020-01')
+        self.assertEqual(102, len(month))
+        self.assertEqual(15, month['day'][0])
+        self.assertEqual(50, (month['user_id'] == self.user.pk).sum())
+        self.assertIn('/legacy/', month.strings('requested_uri'))
+        self.assertEqual('agent/1.0', month.strings('user_agent')[month['user_agent'][-1]])
+
+    def test_string_tables(self):
+        self.archive()
+        month = AccessLogArchive().month('2020-01')
+        self.assertEqual('uint8', month['requested_uri'].dtype)
+        table = month.strings('requested_uri')
+        self.assertEqual(['/accounts/me/', '/accounts/login/', '/legacy/'], list(table))
+        self.assertEqual(1, table.code('/accounts/login/'))
+        self.assertIsNone(table.code('/unknown/'))
+        self.assertEqual(
+            ['/legacy/', '/accounts/me/', '/legacy/'], list(table.take(month['requested_uri'][[-1, 0, -1]])),
+        )
+        # empty strings only
+        self.assertEqual([''], list(month.strings('comment')))
+        self.assertEqual(0, month.where(uri='/unknown/').sum())
+
+    def test_queries(self):
+        self.archive()
+        archive = AccessLogArchive()
+        self.assertEqual({200: 100.0, 500: 1.0, None: 1.0}, status_counts(archive))
+        self.assertEqual({50: 50, 99: 99}, latency_percentiles(archive, (50, 99), uri='/accounts/me/'))
+        self.assertEqual({50: 900}, latency_percentiles(archive, (50,), status='5xx'))
+        self.assertEqual({}, status_counts(archive, start='2020-02'))
+        self.assertEqual(
+            {'/accounts/me/': 100.0, '/accounts/login/': 1.0, '/legacy/': 1.0},
+            counts_by(archive, 'requested_uri'),
+        )
+        selected = archive.select(('requested_uri', 'latency'), min_latency=500)
+        self.assertEqual(['/accounts/login/'], list(selected['requested_uri']))
+
+    def test_keep(self):
+        self.archive('2020-01', '--keep')
+        self.assertEqual(['2020-01'], AccessLogArchive().months())
+        self.assertEqual(103, AccessLog.objects.count())
+
+        # finishing an interrupted run only deletes what was archived
+        self.archive('2020-01')
+        self.assertEqual(1, AccessLog.objects.count())
+
+    def test_open_month_is_refused(self):
+        with self.assertRaises(CommandError):
+            self.archive(timezone.localdate().isoformat()[:7])
+
+    def test_weighted_percentiles(self):
+        import numpy as np
+
+        values = np.array([10, 20, 30])
+        self.assertEqual([10, 20, 30], weighted_percentiles(values, np.ones(3), (33, 66, 100)))
+        self.assertEqual([30, 30], weighted_percentiles(values, np.array([1, 1, 8]), (50, 90)))
+        self.assertEqual([None], weighted_percentiles(values[:0], values[:0], (50,)))
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..models import SignupRouteCategory, UserRouteMap
+from ..registry import signup_route_categories
+
+
+SIGNUP_ROUTE_CATEGORY_LIST_API = reverse('account:signuproutecategory-list')
+USER_ROUTE_LIST_API = reverse('account:route-list')
+
+
+class CategoryRegistryTests(TestCase):
+    def setUp(self):
+        signup_route_categories.invalidate()
+        self.category = SignupRouteCategory.objects.create(name='search')
+
+    def test_get_without_queries(self):
+        signup_route_categories.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.category, signup_route_categories.get(self.category.pk))
+            self.assertEqual([self.category], signup_route_categories.all())
+
+    def test_not_invalidated_before_commit(self):
+        signup_route_categories.all()
+        self.category.name = 'ad'
+        self.category.save()
+        # TestCase never commits, other workers must not see the new version yet
+        self.assertEqual('search', signup_route_categories.get(self.category.pk).name)
+
+    def test_deleted_hidden(self):
+        self.category.soft_delete()
+        self.assertIsNone(signup_route_categories.get(self.category.pk))
+        self.assertEqual(self.category, signup_route_categories.get(self.category.pk, include_deleted=True))
+        self.assertEqual([], signup_route_categories.all())
+
+    def test_version_bumped_by_other_worker(self):
+        signup_route_categories.all()
+        SignupRouteCategory.objects.filter(pk=self.category.pk).update(name='ad')
+        signup_route_categories.invalidate()
+        self.assertEqual('ad', signup_route_categories.get(self.category.pk).name)
+
+
+class CategoryRegistryCommitTests(TransactionTestCase):
+    def setUp(self):
+        signup_route_categories.invalidate()
+        self.category = SignupRouteCategory.objects.create(name='search')
+
+    def test_invalidated_on_save(self):
+        signup_route_categories.all()
+        self.category.name = 'ad'
+        self.category.save()
+        self.assertEqual('ad', signup_route_categories.get(self.category.pk).name)
+
+    def test_invalidated_on_queryset_soft_delete(self):
+        client = APIClient()
+        res = client.get(SIGNUP_ROUTE_CATEGORY_LIST_API)
+        self.assertEqual(['search'], [category['name'] for category in res.data])
+
+        self.assertEqual(1, SignupRouteCategory.objects.filter(pk=self.category.pk).soft_delete())
+        res = client.get(SIGNUP_ROUTE_CATEGORY_LIST_API, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([], res.data)
+
+
+class CategoryApiTests(TestCase):
+    def setUp(self):
+        signup_route_categories.invalidate()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+        self.category = SignupRouteCategory.objects.create(name='search')
+
+    def test_list_categories(self):
+        res = self.client.get(SIGNUP_ROUTE_CATEGORY_LIST_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(['search'], [category['name'] for category in res.data])
+
+    def test_create_category_requires_staff(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.post(SIGNUP_ROUTE_CATEGORY_LIST_API, {'name': 'ad'})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_create_route_resolves_category_from_registry(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.post(USER_ROUTE_LIST_API, {'category': self.category.pk, 'description': 'google'})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual({'id': self.category.pk, 'name': 'search'}, res.data['category'])
+        self.assertEqual(1, UserRouteMap.objects.filter(user=self.user).count())
+
+    def test_create_route_with_deleted_category_fails(self):
+        self.category.soft_delete()
+        self.client.force_authenticate(self.user)
+        res = self.client.post(USER_ROUTE_LIST_API, {'category': self.category.pk, 'description': 'google'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
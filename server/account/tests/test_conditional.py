@@ -0,0 +1,168 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..authentication import JWTAuthentication
+from ..conditional import VersionCounter, user_version
+from ..models import SignupRouteCategory, UserRouteMap
+from ..registry import signup_route_categories
+
+
+ME_API = reverse('account:me')
+USER_PROFILE_API = reverse('account:me-profile')
+SIGNUP_ROUTE_CATEGORY_LIST_API = reverse('account:signuproutecategory-list')
+
+
+class VersionCounterTests(TestCase):
+    def test_bump(self):
+        counter = VersionCounter('account:test:version')
+        counter.bump()
+        version = counter.get()
+        counter.bump()
+        self.assertEqual(version + 1, counter.get())
+
+    def test_starts_after_versions_handed_out(self):
+        counter = VersionCounter('account:test:evicted')
+        version = counter.get()
+        for _ in range(3):
+            counter.bump()
+        # lost to eviction
+        VersionCounter('account:test:evicted', timeout=-1).bump()
+        self.assertGreater(counter.get(), version + 3)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.user.tokens['access'])
+
+    def test_weak_etag(self):
+        res = self.client.get(ME_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'].startswith('W/"me-{}-'.format(self.user.pk)))
+
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_not_modified_without_queries(self):
+        etag = self.client.get(ME_API)['ETag']
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+    def test_other_tags_get_the_payload(self):
+        etag = self.client.get(ME_API)['ETag']
+        res = self.client.get(ME_API, HTTP_IF_NONE_MATCH='W/"me-0-1"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('tokens', res.data)
+
+        # another user's tag
+        other = get_user_model().objects.create_user(email='user2@email.com', password='password')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + other.tokens['access'])
+        res = self.client.get(ME_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], 'user2@email.com')
+
+    def test_invalid_token_is_not_answered(self):
+        etag = self.client.get(ME_API)['ETag']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        res = self.client.get(ME_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_forced_authentication(self):
+        # no token, the tag is checked after authentication
+        client = APIClient()
+        client.force_authenticate(self.user)
+        etag = client.get(ME_API)['ETag']
+        res = client.get(ME_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_token_validated_once(self):
+        etag = self.client.get(ME_API)['ETag']
+        with mock.patch.object(
+            JWTAuthentication, 'get_validated_token', autospec=True, side_effect=JWTAuthentication.get_validated_token,
+        ) as get_validated_token:
+            res = self.client.get(ME_API, HTTP_IF_NONE_MATCH=etag + 'x')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(1, get_validated_token.call_count)
+
+    def test_user_change_changes_tag(self):
+        etag = self.client.get(ME_API)['ETag']
+        user_version(self.user.pk).bump()
+        res = self.client.get(ME_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+
+@override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+class VersionBumpTests(TransactionTestCase):
+    # versions are bumped on commit
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.user.tokens['access'])
+
+    def assertTagChanged(self, url, change):
+        etag = self.client.get(url)['ETag']
+        change()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_user_saved(self):
+        def change():
+            self.user.is_verified = True
+            self.user.save()
+        self.assertTagChanged(ME_API, change)
+
+    def test_user_deactivated(self):
+        etag = self.client.get(ME_API)['ETag']
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        res = self.client.get(ME_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_updated_through_api(self):
+        self.assertTagChanged(ME_API, lambda: self.client.put(ME_API, {'email': 'user3@email.com'}))
+
+    def test_profile_mappings(self):
+        signup_route_categories.invalidate()
+        category = SignupRouteCategory.objects.create(name='search')
+        self.assertTagChanged(
+            USER_PROFILE_API, lambda: UserRouteMap.objects.create(user=self.user, category=category),
+        )
+        self.assertTagChanged(USER_PROFILE_API, lambda: category.soft_delete())
+
+    def test_profile_mappings_soft_deleted_in_bulk(self):
+        signup_route_categories.invalidate()
+        category = SignupRouteCategory.objects.create(name='search')
+        UserRouteMap.objects.create(user=self.user, category=category)
+        self.assertTagChanged(
+            USER_PROFILE_API, lambda: UserRouteMap.objects.filter(user=self.user).soft_delete(),
+        )
+
+    def test_categories(self):
+        signup_route_categories.invalidate()
+        SignupRouteCategory.objects.create(name='search')
+        etag = self.client.get(SIGNUP_ROUTE_CATEGORY_LIST_API)['ETag']
+
+        anonymous = APIClient()
+        with self.assertNumQueries(0):
+            res = anonymous.get(SIGNUP_ROUTE_CATEGORY_LIST_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        SignupRouteCategory.objects.create(name='ad')
+        res = anonymous.get(SIGNUP_ROUTE_CATEGORY_LIST_API, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(2, len(res.data))
@@ -0,0 +1,52 @@
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from ..db import check_connections, configure_sqlite
+
+
+class FakeConnection:
+    def __init__(self, usable=True, in_atomic_block=False):
+        self.connection = object()
+        self.in_atomic_block = in_atomic_block
+        self.usable = usable
+        self.pings = 0
+
+    def is_usable(self):
+        self.pings += 1
+        return self.usable
+
+    def close(self):
+        self.connection = None
+
+
+class ConnectionSetupTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA {}'.format(name))
+            return cursor.fetchone()[0]
+
+    def test_sqlite_pragmas(self):
+        self.assertEqual(5000, self.pragma('busy_timeout'))
+        self.assertEqual(1, self.pragma('synchronous'))  # NORMAL
+
+        with override_settings(SQLITE_PRAGMAS={'busy_timeout': 100}):
+            configure_sqlite(sender=None, connection=connection)
+        self.assertEqual(100, self.pragma('busy_timeout'))
+
+    @override_settings(DB_HEALTH_CHECK_INTERVAL=30)
+    def test_unusable_connections_are_closed(self):
+        usable, broken, busy = FakeConnection(), FakeConnection(usable=False), FakeConnection(in_atomic_block=True)
+        with mock.patch('account.db.connections') as connections, \
+                mock.patch('account.db.time.monotonic', side_effect=[100, 110, 131]):
+            connections.all.return_value = [usable, broken, busy]
+            check_connections()
+            self.assertIsNotNone(usable.connection)
+            self.assertIsNone(broken.connection)
+            self.assertEqual(0, busy.pings)
+
+            # throttled
+            check_connections()
+            self.assertEqual(1, usable.pings)
+            check_connections()
+            self.assertEqual(2, usable.pings)
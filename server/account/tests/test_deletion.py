@@ -0,0 +1,156 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from .. import deletion
+from ..deletion import request_deletion, run_deletion
+from ..models import AccessLog, AccountDeletion, SignupRouteCategory, UserRouteMap
+
+
+USER_INFO_API = reverse('account:me')
+LOGIN_USER_API = reverse('account:login')
+
+
+def add_logs(user, count):
+    AccessLog.objects.bulk_create(
+        AccessLog(request_method='GET', status_code=200, user=user, ip_addr='10.0.0.1') for _ in range(count)
+    )
+
+
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='user1@email.com', password='password')
+        self.other = get_user_model().objects.create_user(email='user2@email.com', password='password')
+        add_logs(self.user, 25)
+        add_logs(self.other, 3)
+        category = SignupRouteCategory.objects.create(name='search')
+        for user in (self.user, self.other):
+            UserRouteMap.objects.create(user=user, category=category)
+        UserRouteMap.objects.create(user=self.user, category=category).soft_delete()
+
+    def test_request_deactivates_and_anonymizes(self):
+        with CaptureQueriesContext(connection) as queries:
+            job = request_deletion(self.user, by='admin@email.com')
+        # related rows are left to the job
+        self.assertFalse([query for query in queries if 'access_logs' in query['sql'] or 'route_map' in query['sql']])
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(self.user.has_usable_password())
+        self.assertEqual('deleted-{}@deleted.invalid'.format(self.user.pk), self.user.email)
+        self.assertEqual((self.user.pk, AccountDeletion.PENDING), (job.user_id, job.state))
+        self.assertEqual(25, AccessLog.objects.filter(user=self.user).count())
+
+        # requested again
+        self.assertEqual(job, request_deletion(self.user))
+
+    def test_run_in_batches(self):
+        job = request_deletion(self.user)
+        run_deletion(job, batch_size=10)
+
+        job.refresh_from_db()
+        self.assertEqual(AccountDeletion.DONE, job.state)
+        self.assertIsNotNone(job.finished)
+        # 25 logs, 2 routes and the user
+        self.assertEqual(28, job.processed)
+        self.assertFalse(get_user_model().objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(25, AccessLog.objects.filter(user__isnull=True, ip_addr__isnull=True).count())
+        self.assertEqual(3, AccessLog.objects.filter(user=self.other, ip_addr='10.0.0.1').count())
+        self.assertEqual([self.other.pk], list(UserRouteMap.all_objects.values_list('user_id', flat=True)))
+
+    def test_batches_are_bounded(self):
+        job = request_deletion(self.user)
+        with mock.patch.object(deletion, 'STEPS', deletion.STEPS[:1]):
+            with CaptureQueriesContext(connection) as queries:
+                run_deletion(job, batch_size=10)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "account_access_logs"')]
+        self.assertEqual(3, len(updates))
+        self.assertEqual(3, len([query for query in queries if query['sql'].startswith('UPDATE "account_deletions" SET "cursor"')]))
+
+    def test_failed_job_resumes(self):
+        def fail(user_id, cursor, batch_size):
+            raise DatabaseError('disk full')
+
+        job = request_deletion(self.user)
+        steps = deletion.STEPS[:1] + (('routes', fail),) + deletion.STEPS[2:]
+        with mock.patch.object(deletion, 'STEPS', steps), self.assertRaises(DatabaseError):
+            run_deletion(job, batch_size=10)
+        job.refresh_from_db()
+        self.assertEqual((AccountDeletion.FAILED, 'routes'), (job.state, job.step))
+        self.assertIn('disk full', job.error)
+
+        out, err = StringIO(), StringIO()
+        call_command('run_account_deletions', stdout=out, stderr=err)
+        self.assertEqual('', out.getvalue())
+
+        with mock.patch('account.deletion.detach_access_logs') as detach:
+            call_command('run_account_deletions', '--retry-failed', stdout=out, stderr=err)
+            # logs were done before the failure
+            detach.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(AccountDeletion.DONE, job.state)
+        self.assertEqual('', job.error)
+        self.assertIn('User {} deleted'.format(self.user.pk), out.getvalue())
+
+    def test_running_job_is_not_run_twice(self):
+        job = request_deletion(self.user)
+        self.assertTrue(deletion.claim(job))
+        # an overlapping run
+        other = AccountDeletion.objects.get(pk=job.pk)
+        self.assertIsNone(run_deletion(other, batch_size=10))
+        self.assertTrue(get_user_model().objects.filter(pk=self.user.pk).exists())
+
+        # until its runner stops saving progress
+        AccountDeletion.objects.filter(pk=job.pk).update(updated=timezone.now() - timedelta(hours=1))
+        other = AccountDeletion.objects.get(pk=job.pk)
+        run_deletion(other, batch_size=10)
+        self.assertEqual(28, AccountDeletion.objects.get(pk=job.pk).processed)
+
+        # the first runner finds out on its next save
+        with self.assertRaises(deletion.ClaimLost):
+            deletion.save_progress(job, cursor=1)
+        self.assertEqual(AccountDeletion.DONE, AccountDeletion.objects.get(pk=job.pk).state)
+
+    def test_lost_claim_stops_the_run(self):
+        job = request_deletion(self.user)
+
+        def taken_over(user_id, cursor, batch_size):
+            AccountDeletion.objects.filter(pk=job.pk).update(updated=timezone.now())
+            return deletion.detach_access_logs(user_id, cursor, batch_size)
+
+        with mock.patch.object(deletion, 'STEPS', (('access_logs', taken_over),) + deletion.STEPS[1:]), \
+                self.assertRaises(deletion.ClaimLost):
+            run_deletion(job, batch_size=10)
+        job.refresh_from_db()
+        # neither counted nor marked failed by the stopped run
+        self.assertEqual((AccountDeletion.RUNNING, 0), (job.state, job.processed))
+
+
+@override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}], LOGIN_THROTTLE_RATES={})
+class AccountDeletionApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='user1@email.com', password='password')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.user.tokens['access'])
+
+    def test_delete_me(self):
+        res = self.client.delete(USER_INFO_API)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(AccountDeletion.PENDING, res.data['state'])
+
+        res = self.client.get(USER_INFO_API)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = APIClient().post(LOGIN_USER_API, {'email': 'user1@email.com', 'password': 'password'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        # the email can be registered again
+        self.assertFalse(get_user_model().objects.filter(email='user1@email.com').exists())
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt import state
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import keys
+
+try:
+    import cryptography
+except ImportError:
+    cryptography = None
+
+
+VERIFY_TOKEN_API = reverse('account:token_verify')
+USER_INFO_API = reverse('account:me')
+JWKS_API = reverse('account:jwks')
+
+
+@skipIf(cryptography is None, 'cryptography is not installed')
+class KeyRingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.mtime = 1000000000
+        self.generate_key('EdDSA', 'k1')
+
+        key_ring = keys.KeyRing(self.directory, check_interval=0)
+        patchers = [
+            mock.patch.object(keys, 'key_ring', key_ring),
+            mock.patch.object(state, 'token_backend', keys.KeyRingTokenBackend(key_ring)),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+
+    def generate_key(self, algorithm, kid):
+        call_command('generate_jwt_key', algorithm=algorithm, kid=kid, directory=self.directory, stdout=StringIO())
+        # make sure the newest key is picked regardless of filesystem timestamp resolution
+        self.mtime += 1
+        os.utime(os.path.join(self.directory, kid + '.key'), (self.mtime, self.mtime))
+        os.utime(self.directory, (self.mtime, self.mtime))
+
+    def test_token_signed_with_kid(self):
+        access_token = self.user.tokens['access']
+        self.assertEqual('k1', keys.jwt.get_unverified_header(access_token)['kid'])
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        res = self.client.get(USER_INFO_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_rotated_key_used_and_old_tokens_still_valid(self):
+        old_token = self.user.tokens['access']
+        self.generate_key('RS256', 'k2')
+
+        new_token = self.user.tokens['access']
+        self.assertEqual('k2', keys.jwt.get_unverified_header(new_token)['kid'])
+        for token in (old_token, new_token):
+            res = self.client.post(VERIFY_TOKEN_API, {'token': token})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_verify_with_public_key_only(self):
+        access_token = self.user.tokens['access']
+        os.remove(os.path.join(self.directory, 'k1.key'))
+        verifier = keys.KeyRingTokenBackend(keys.KeyRing(self.directory))
+        self.assertEqual(self.user.pk, verifier.decode(access_token)['user_id'])
+
+    def test_unknown_kid_rejected(self):
+        access_token = str(AccessToken.for_user(self.user))
+        shutil.rmtree(self.directory)
+        os.mkdir(self.directory)
+        self.generate_key('EdDSA', 'k3')
+        res = self.client.post(VERIFY_TOKEN_API, {'token': access_token})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_jwks(self):
+        self.generate_key('RS256', 'k2')
+        res = self.client.get(JWKS_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [('k1', 'EdDSA', 'OKP'), ('k2', 'RS256', 'RSA')],
+            [(key['kid'], key['alg'], key['kty']) for key in res.data['keys']],
+        )
@@ -0,0 +1,244 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..livetail import LiveTail, RingBuffer, matches
+from ..middleware.policy import compile_status
+
+
+ACCESS_LOG_TAIL_API = reverse('account:access-log-tail')
+THREADED = {'wsgi.multithread': True}
+
+
+def record(uri='/tail-test/', status_code=200, user=None, method='GET'):
+    return {'time': 0, 'method': method, 'uri': uri, 'status': status_code, 'latency': 1, 'user': user, 'ip': None}
+
+
+class RingBufferTests(TestCase):
+    def test_read(self):
+        buffer = RingBuffer(4)
+        self.assertEqual(([], 0, False), buffer.read(0))
+        for item in 'abc':
+            buffer.append(item)
+        self.assertEqual(([(2, 'b'), (3, 'c')], 3, False), buffer.read(1))
+        self.assertEqual(([], 3, False), buffer.read(3))
+
+    def test_overwritten(self):
+        buffer = RingBuffer(4)
+        for item in 'abcdef':
+            buffer.append(item)
+        items, cursor, lost = buffer.read(1)
+        self.assertEqual([(3, 'c'), (4, 'd'), (5, 'e'), (6, 'f')], items)
+        self.assertEqual((6, True), (cursor, lost))
+        self.assertEqual(([(6, 'f')], 6, False), buffer.read(5))
+
+    def test_concurrent_appends(self):
+        buffer = RingBuffer(64)
+        threads = [threading.Thread(target=lambda: [buffer.append(i) for i in range(1000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(4000, buffer.last)
+        self.assertEqual(list(range(3937, 4001)), [seq for seq, _ in buffer.read(0)[0]])
+
+    def test_slot_not_written_yet(self):
+        buffer = RingBuffer(4)
+        buffer.append('a')
+        # a concurrent append took sequence 2 but did not write its slot yet
+        next(buffer._counter)
+        buffer.append('c')
+        self.assertEqual(([], 1, False), buffer.read(1))
+        buffer._slots[2] = (2, 'b')
+        self.assertEqual(([(2, 'b'), (3, 'c')], 3, False), buffer.read(1))
+
+
+class MatchesTests(TestCase):
+    def test_filters(self):
+        self.assertTrue(matches(record()))
+        self.assertTrue(matches(record(status_code=503), statuses=compile_status('5xx')))
+        self.assertFalse(matches(record(), statuses=compile_status('5xx')))
+        self.assertFalse(matches(record(status_code=None), statuses=compile_status(200)))
+        self.assertTrue(matches(record(uri='/accounts/me/'), prefix='/accounts/'))
+        self.assertFalse(matches(record(), prefix='/accounts/'))
+        self.assertTrue(matches(record(user=1), user=1))
+        self.assertFalse(matches(record(), user=1))
+        self.assertFalse(matches(record(), method='POST'))
+
+
+class FanOutTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_publish_to_peers(self):
+        peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(peer.close)
+        peer.bind(os.path.join(self.directory, '1.sock'))
+        peer.settimeout(1)
+
+        tail = LiveTail(self.directory, size=8)
+        tail.publish(record())
+        self.assertEqual(record(), json.loads(peer.recv(65536)))
+        self.assertEqual(1, tail.buffer.last)
+
+    def test_stale_peer_is_removed(self):
+        path = os.path.join(self.directory, '1.sock')
+        peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        peer.bind(path)
+        peer.close()
+
+        LiveTail(self.directory, size=8).publish(record())
+        self.assertFalse(os.path.exists(path))
+
+    def test_full_peer_does_not_block(self):
+        peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(peer.close)
+        peer.bind(os.path.join(self.directory, '1.sock'))
+
+        tail = LiveTail(self.directory, size=8)
+        # never read, the peer's queue fills up and later records are dropped
+        for _ in range(5000):
+            tail.publish(record())
+        self.assertEqual(5000, tail.buffer.last)
+
+    def test_subscriber_receives(self):
+        tail = LiveTail(self.directory, size=8)
+        tail.subscribe()
+        self.addCleanup(tail.close)
+        self.addCleanup(tail.unsubscribe)
+        path = os.path.join(self.directory, '{}.sock'.format(os.getpid()))
+        self.assertTrue(os.path.exists(path))
+
+        # what another worker does
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(sender.close)
+        sender.sendto(json.dumps(record(uri='/other-worker/')).encode(), path)
+        for _ in range(100):
+            if tail.buffer.last:
+                break
+            tail._receiver.join(0.01)
+        self.assertEqual([(1, record(uri='/other-worker/'))], tail.buffer.read(0)[0])
+
+    def test_idle_receiver_stops(self):
+        tail = LiveTail(self.directory, size=8)
+        self.addCleanup(tail.close)
+        tail.subscribe()
+        receiver = tail._receiver
+        path = os.path.join(self.directory, '{}.sock'.format(os.getpid()))
+        tail.unsubscribe()
+
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(sender.close)
+        with mock.patch('account.livetail.IDLE_TIMEOUT', -1):
+            while receiver.is_alive():
+                # wakes the receiver up
+                try:
+                    sender.sendto(b'{}', path)
+                except OSError:
+                    pass
+                receiver.join(0.01)
+        self.assertIsNone(tail._receiver)
+        self.assertFalse(os.path.exists(path))
+
+        # a new receiver binds the same path, a late cleanup of the old one leaves it alone
+        tail.subscribe()
+        self.addCleanup(tail.unsubscribe)
+        with tail._lock:
+            tail._release(socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM), path)
+        self.assertTrue(os.path.exists(path))
+        self.assertIsNotNone(tail._receiver)
+
+
+@override_settings(LIVE_TAIL_MAX_SECONDS=0.3)
+class AccessLogTailViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(email='staff@email.com', password='password', is_staff=True)
+        self.tail = LiveTail(None, size=16)
+        patcher = mock.patch('account.views.analytics.live_tail', self.tail)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def events(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return [event for event in content.split('\n\n') if event.startswith('id:') or event.startswith('event:')]
+
+    def test_staff_only(self):
+        user = get_user_model().objects.create_user(email='user@email.com', password='password')
+        self.client.force_authenticate(user)
+        response = self.client.get(ACCESS_LOG_TAIL_API)
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+        response = self.client.get(ACCESS_LOG_TAIL_API, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+        self.assertTrue(response.content.startswith(b'event: error\ndata: {'))
+
+    def test_invalid_filter(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(ACCESS_LOG_TAIL_API, {'status': '6xx'}, **THREADED)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_stream(self):
+        self.client.force_authenticate(self.staff)
+        self.tail.publish(record(uri='/before/'))
+        response = self.client.get(
+            ACCESS_LOG_TAIL_API, {'status': '5xx', 'uri': '/tail-test/'},
+            HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='{}:1'.format(os.getpid()), **THREADED
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertEqual('no-cache', response['Cache-Control'])
+
+        self.tail.publish(record(status_code=500))
+        self.tail.publish(record(status_code=200))
+        self.tail.publish(record(uri='/elsewhere/', status_code=500))
+        self.assertEqual(
+            ['id: {}:2\ndata: {}'.format(os.getpid(), json.dumps(record(status_code=500)))],
+            self.events(response),
+        )
+
+    def test_last_event_id_of_another_worker(self):
+        self.client.force_authenticate(self.staff)
+        self.tail.publish(record())
+        response = self.client.get(ACCESS_LOG_TAIL_API, HTTP_LAST_EVENT_ID='{}:0'.format(os.getpid() + 1), **THREADED)
+        self.assertEqual([], self.events(response))
+
+    def test_slow_consumer_is_dropped(self):
+        self.client.force_authenticate(self.staff)
+        self.tail.publish(record())
+        response = self.client.get(ACCESS_LOG_TAIL_API, HTTP_LAST_EVENT_ID='{}:1'.format(os.getpid()), **THREADED)
+        for _ in range(20):
+            self.tail.publish(record())
+        self.assertEqual(['event: dropped\ndata: {}'], self.events(response))
+
+    def test_needs_threaded_server(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(ACCESS_LOG_TAIL_API)
+        self.assertEqual(status.HTTP_503_SERVICE_UNAVAILABLE, response.status_code)
+        self.assertEqual(0, self.tail._subscribers)
+
+    @override_settings(LIVE_TAIL_MAX_SUBSCRIBERS=1)
+    def test_subscribers_per_worker(self):
+        self.client.force_authenticate(self.staff)
+        first = self.client.get(ACCESS_LOG_TAIL_API, **THREADED)
+        self.assertEqual(status.HTTP_200_OK, first.status_code)
+        response = self.client.get(ACCESS_LOG_TAIL_API, **THREADED)
+        self.assertEqual(status.HTTP_503_SERVICE_UNAVAILABLE, response.status_code)
+        self.assertIn('Retry-After', response)
+
+        # closed without being read, e.g. the client went away
+        first.close()
+        self.assertEqual(0, self.tail._subscribers)
+        self.assertEqual(status.HTTP_200_OK, self.client.get(ACCESS_LOG_TAIL_API, **THREADED).status_code)
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import AccessLog
+
+
+EMAIL_CHECK_API = reverse('account:email-check')
+ADMIN_LOGIN = reverse('admin:login')
+
+
+class RouteScopedMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_api_route_skips_session_middleware(self):
+        res = self.client.get(EMAIL_CHECK_API, {'email': 'user1@nav.com'})
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(hasattr(res.wsgi_request, 'session'))
+        self.assertNotIn('X-Frame-Options', res)
+        self.assertEqual(1, AccessLog.objects.count())
+
+    def test_static_route_not_tracked(self):
+        self.client.get('/static/main.js')
+        self.assertEqual(0, AccessLog.objects.count())
+
+    def test_default_route_runs_full_chain(self):
+        res = self.client.get(ADMIN_LOGIN)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(hasattr(res.wsgi_request, 'session'))
+        self.assertEqual('DENY', res['X-Frame-Options'])
+        self.assertEqual(1, AccessLog.objects.count())
+
+    def test_view_middleware_of_chain_called(self):
+        # CsrfViewMiddleware only acts in process_view
+        client = Client(enforce_csrf_checks=True)
+        res = client.post(ADMIN_LOGIN, {'username': 'a', 'password': 'b'})
+        self.assertEqual(res.status_code, 403)
+
+    def test_admin_session_login(self):
+        admin_user = get_user_model().objects.create_superuser(
+            email='admin@email.com',
+            password='password',
+        )
+        self.client.force_login(admin_user)
+        res = self.client.get(reverse('admin:index'))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(admin_user, AccessLog.objects.get().user)
@@ -0,0 +1,110 @@
+import ipaddress
+
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from ..networks import ClientAddressResolver, PrefixTrie, client_address
+
+
+EMAIL_CHECK_API = reverse('account:email-check')
+
+
+class PrefixTrieTests(SimpleTestCase):
+    def setUp(self):
+        self.trie = PrefixTrie([
+            ('10.0.0.0/8', '/8'),
+            ('10.1.0.0/16', '/16'),
+            ('10.1.2.0/23', '/23'),
+            ('10.1.2.3/32', '/32'),
+            ('2001:db8::/32', 'v6'),
+        ])
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual('/8', self.trie.lookup('10.2.3.4'))
+        self.assertEqual('/16', self.trie.lookup('10.1.9.9'))
+        self.assertEqual('/23', self.trie.lookup('10.1.3.7'))
+        self.assertEqual('/32', self.trie.lookup('10.1.2.3'))
+        self.assertIsNone(self.trie.lookup('11.0.0.1'))
+
+    def test_order_does_not_matter(self):
+        trie = PrefixTrie([('10.1.2.0/23', '/23'), ('10.0.0.0/9', '/9'), ('10.0.0.0/8', '/8')])
+        self.assertEqual('/23', trie.lookup('10.1.3.7'))
+        self.assertEqual('/9', trie.lookup('10.127.0.1'))
+        self.assertEqual('/8', trie.lookup('10.128.0.1'))
+
+    def test_ipv6(self):
+        self.assertEqual('v6', self.trie.lookup('2001:db8::1'))
+        self.assertIsNone(self.trie.lookup('2001:db9::1'))
+        # IPv4-mapped addresses match IPv4 networks
+        self.assertEqual('/32', self.trie.lookup('::ffff:10.1.2.3'))
+
+    def test_default_route(self):
+        trie = PrefixTrie(['0.0.0.0/0'])
+        self.assertIn('192.0.2.1', trie)
+        self.assertNotIn('2001:db8::1', trie)
+
+    def test_invalid_addresses(self):
+        self.assertIsNone(self.trie.lookup('unknown'))
+        self.assertNotIn('', self.trie)
+
+    def test_matches_ipaddress(self):
+        networks = [ipaddress.ip_network('10.{}.{}.0/{}'.format(i, i * 7 % 256, 12 + i % 13), strict=False)
+                    for i in range(200)]
+        trie = PrefixTrie(networks)
+        for i in range(0, 2 ** 24, 9973):
+            address = ipaddress.ip_address('10.0.0.0') + i
+            self.assertEqual(any(address in network for network in networks), address in trie)
+
+
+class ClientAddressTests(SimpleTestCase):
+    def setUp(self):
+        self.resolver = ClientAddressResolver(trusted_proxies=['127.0.0.1/32', '10.0.0.0/8'])
+
+    def test_untrusted_peer(self):
+        meta = {'REMOTE_ADDR': '198.51.100.7', 'HTTP_X_FORWARDED_FOR': '1.2.3.4'}
+        self.assertEqual('198.51.100.7', self.resolver.client_address(meta))
+
+    def test_trusted_chain(self):
+        meta = {'REMOTE_ADDR': '127.0.0.1', 'HTTP_X_FORWARDED_FOR': '1.2.3.4, 198.51.100.7, 10.0.0.2'}
+        # 1.2.3.4 was sent by the client, only 198.51.100.7 was seen by a trusted proxy
+        self.assertEqual('198.51.100.7', self.resolver.client_address(meta))
+
+    def test_all_hops_trusted(self):
+        meta = {'REMOTE_ADDR': '127.0.0.1', 'HTTP_X_FORWARDED_FOR': '10.0.0.3, 10.0.0.2'}
+        self.assertEqual('10.0.0.3', self.resolver.client_address(meta))
+
+    def test_invalid_hop(self):
+        meta = {'REMOTE_ADDR': '127.0.0.1', 'HTTP_X_FORWARDED_FOR': '198.51.100.7, garbage, 10.0.0.2'}
+        self.assertEqual('10.0.0.2', self.resolver.client_address(meta))
+
+    def test_no_forwarded_for(self):
+        self.assertEqual('127.0.0.1', self.resolver.client_address({'REMOTE_ADDR': '127.0.0.1'}))
+        self.assertIsNone(self.resolver.client_address({}))
+
+    def test_allow_and_deny(self):
+        resolver = ClientAddressResolver(allow=['10.0.0.0/8'], deny=['10.6.6.0/24'])
+        self.assertTrue(resolver.allows('10.1.1.1'))
+        self.assertFalse(resolver.allows('10.6.6.6'))
+        self.assertFalse(resolver.allows('198.51.100.7'))
+        self.assertTrue(ClientAddressResolver().allows('198.51.100.7'))
+
+    @override_settings(TRUSTED_PROXIES=['192.0.2.0/24'])
+    def test_rebuilt_when_settings_change(self):
+        meta = {'REMOTE_ADDR': '192.0.2.1', 'HTTP_X_FORWARDED_FOR': '198.51.100.7'}
+        self.assertEqual('198.51.100.7', client_address(meta))
+
+
+class IPAccessMiddlewareTests(TestCase):
+    @override_settings(IP_DENY_LIST=['198.51.100.0/24'], TRUSTED_PROXIES=['127.0.0.1/32'])
+    def test_denied(self):
+        res = Client(REMOTE_ADDR='198.51.100.7').get(EMAIL_CHECK_API, {'email': 'user@email.com'})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        # behind a trusted proxy
+        res = Client(HTTP_X_FORWARDED_FOR='198.51.100.7').get(EMAIL_CHECK_API, {'email': 'user@email.com'})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = Client(REMOTE_ADDR='192.0.2.1').get(EMAIL_CHECK_API, {'email': 'user@email.com'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..models import (
+    SignupRouteCategory,
+    UserRouteMap,
+    DropoutReasonCategory,
+    UserDropoutReasonMap,
+)
+
+
+USER_PROFILE_API = reverse('account:me-profile')
+
+
+def user_detail_url(pk):
+    return reverse('account:user-detail', args=[pk])
+
+
+def add_mappings(user, count):
+    for i in range(count):
+        route = SignupRouteCategory.objects.create(name='route {}'.format(i))
+        UserRouteMap.objects.create(user=user, category=route, description='route')
+        reason = DropoutReasonCategory.objects.create(name='reason {}'.format(i))
+        UserDropoutReasonMap.objects.create(user=user, category=reason, description='reason')
+
+
+class UserProfileTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@email.com',
+            password='password',
+        )
+        access_token = self.user.tokens['access']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+
+    def test_profile_includes_mappings(self):
+        add_mappings(self.user, 2)
+        res = self.client.get(USER_PROFILE_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(2, len(res.data['routes']))
+        self.assertEqual(2, len(res.data['dropout_reasons']))
+        self.assertEqual('route 0', res.data['routes'][0]['category']['name'])
+
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_profile_query_count_is_fixed(self):
+        # user (authentication), routes, dropout reasons
+        add_mappings(self.user, 1)
+        with self.assertNumQueries(3):
+            self.client.get(USER_PROFILE_API)
+
+        add_mappings(self.user, 10)
+        with self.assertNumQueries(3):
+            res = self.client.get(USER_PROFILE_API)
+        self.assertEqual(11, len(res.data['routes']))
+
+    def test_user_detail_requires_staff(self):
+        res = self.client.get(user_detail_url(self.user.pk))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_user_detail_query_count_is_fixed(self):
+        add_mappings(self.user, 5)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.admin_user.tokens['access'])
+        # admin (authentication), user, routes, dropout reasons
+        with self.assertNumQueries(4):
+            res = self.client.get(user_detail_url(self.user.pk))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(5, len(res.data['dropout_reasons']))
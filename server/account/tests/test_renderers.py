@@ -0,0 +1,102 @@
+import io
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..models import SignupRouteCategory, UserRouteMap
+from ..registry import signup_route_categories
+from ..parsers import JSONParser
+from ..renderers import JSONRenderer
+
+
+ROUTES_API = reverse('account:route-list')
+
+
+class JSONRendererTests(TestCase):
+    def test_native_types(self):
+        pk = uuid.uuid4()
+        data = {
+            'when': datetime(2020, 11, 20, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'id': pk,
+            'price': Decimal('1.50'),
+            'label': gettext_lazy('not translated'),
+            1: 'non str key',
+        }
+        rendered = json.loads(JSONRenderer().render(data, 'application/json'))
+        self.assertEqual(rendered, {
+            'when': '2020-11-20T09:30:15.123456Z',
+            'id': str(pk),
+            'price': 1.5,
+            'label': 'not translated',
+            '1': 'non str key',
+        })
+
+    def test_escapes_line_separators(self):
+        content = JSONRenderer().render({'text': 'a\u2028b\u2029c'}, 'application/json')
+        self.assertIn(b'\\u2028', content)
+        self.assertIn(b'\\u2029', content)
+        self.assertEqual(json.loads(content), {'text': 'a\u2028b\u2029c'})
+
+    def test_none_renders_empty(self):
+        self.assertEqual(JSONRenderer().render(None), b'')
+
+    def test_indent(self):
+        content = JSONRenderer().render({'a': [1]}, 'application/json; indent=2')
+        self.assertEqual(content, b'{\n  "a": [\n    1\n  ]\n}')
+        # other indents fall back to the stdlib renderer
+        content = JSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        self.assertEqual(content, b'{\n    "a": 1\n}')
+
+
+class JSONParserTests(TestCase):
+    def test_parse(self):
+        data = JSONParser().parse(io.BytesIO('{"email": "user@email.com", "name": "홍길동"}'.encode()))
+        self.assertEqual(data, {'email': 'user@email.com', 'name': '홍길동'})
+
+    def test_other_encoding(self):
+        stream = io.BytesIO('{"name": "홍길동"}'.encode('utf-16'))
+        data = JSONParser().parse(stream, parser_context={'encoding': 'utf-16'})
+        self.assertEqual(data, {'name': '홍길동'})
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            JSONParser().parse(io.BytesIO(b'{"email": '))
+
+
+class JSONApiTests(TestCase):
+    def setUp(self):
+        signup_route_categories.invalidate()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email='user@email.com', password='password')
+        self.client.force_authenticate(self.user)
+        UserRouteMap.objects.bulk_create(
+            UserRouteMap(user=self.user, category=SignupRouteCategory.objects.create(name='route {}'.format(i)))
+            for i in range(5)
+        )
+
+    def test_list(self):
+        res = self.client.get(ROUTES_API)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(
+            set(UserRouteMap.objects.values_list('category_id', flat=True)),
+            {route['category']['id'] for route in json.loads(res.content)},
+        )
+
+    def test_json_body(self):
+        category = SignupRouteCategory.objects.create(name='new route')
+        res = self.client.post(ROUTES_API, json.dumps({'category': category.pk, 'description': 'google'}), content_type='application/json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(ROUTES_API, '{"category": ', content_type='application/json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
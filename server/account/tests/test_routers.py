@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import connections, router, transaction
+from django.test import TransactionTestCase, Client, override_settings
+from django.urls import reverse
+
+from ..models import AccessLog, SignupRouteCategory, VisitorSketch
+from ..routers import PrimaryReplicaRouter, unpin
+
+
+EMAIL_CHECK_API = reverse('account:email-check')
+
+
+class RouterTests(TransactionTestCase):
+    """
+    SQLite files stand in for a replica and a log database. The replica is
+    never written to, so rows read from it show which database a query went to.
+    """
+    aliases = ('replica', 'logs')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # added after the test case guarded its databases, so they can be queried
+        cls.directory = tempfile.mkdtemp()
+        for alias in cls.aliases:
+            connections.databases[alias] = dict(
+                connections.databases['default'], NAME=os.path.join(cls.directory, alias + '.sqlite3'),
+            )
+        with override_settings(ACCESS_LOG_DATABASE='logs'):
+            for alias in cls.aliases:
+                call_command('migrate', database=alias, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in cls.aliases:
+            connections[alias].close()
+            del connections.databases[alias]
+            delattr(connections._connections, alias)
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def setUp(self):
+        override = override_settings(DATABASE_REPLICAS=['replica'], ACCESS_LOG_DATABASE='logs')
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = get_user_model().objects.create_user(email='user1@email.com', password='password')
+        AccessLog.objects.using('logs').all().delete()
+        unpin()
+
+    def users(self):
+        return get_user_model().objects.filter(email='user1@email.com').exists()
+
+    def test_reads_go_to_replicas(self):
+        self.assertEqual('replica', router.db_for_read(get_user_model()))
+        self.assertEqual('replica', router.db_for_read(SignupRouteCategory))
+        self.assertFalse(self.users())
+
+    def test_reads_after_writes_stay_on_primary(self):
+        SignupRouteCategory.objects.create(name='route')
+        self.assertTrue(self.users())
+
+        # the next request starts unpinned
+        request_started.send(sender=None)
+        self.assertFalse(self.users())
+
+    def test_reads_in_transactions_stay_on_primary(self):
+        with transaction.atomic():
+            self.assertTrue(self.users())
+
+    def test_access_logs_go_to_log_database(self):
+        res = Client().get(EMAIL_CHECK_API, {'email': 'user1@email.com'})
+        # the lookup went to the replica, which does not have the user yet
+        self.assertTrue(res.data['available'])
+        self.assertEqual(1, AccessLog.objects.count())
+        self.assertEqual(1, AccessLog.objects.using('logs').count())
+        self.assertEqual(0, AccessLog.objects.using('default').count())
+        self.assertEqual('logs', router.db_for_read(VisitorSketch))
+
+    def test_allow_relation(self):
+        allow_relation = PrimaryReplicaRouter().allow_relation
+        log = AccessLog.objects.create(request_method='GET', user_id=self.user.pk)
+        self.assertEqual('logs', log._state.db)
+        self.assertFalse(allow_relation(self.user, log))
+
+        replica_user = get_user_model()(pk=self.user.pk)
+        replica_user._state.db = 'replica'
+        self.assertTrue(allow_relation(self.user, replica_user))
+
+    def test_deleted_user_detached_in_log_database(self):
+        log = AccessLog.objects.create(request_method='GET', user_id=self.user.pk)
+        self.user.delete()
+        self.assertIsNone(AccessLog.objects.get(pk=log.pk).user_id)
+
+
+        allow_migrate = PrimaryReplicaRouter().allow_migrate
+        self.assertFalse(allow_migrate('replica', 'account', 'user'))
+        self.assertFalse(allow_migrate('logs', 'account', 'user'))
+        self.assertFalse(allow_migrate('logs', 'auth', 'permission'))
+        self.assertTrue(allow_migrate('logs', 'account', 'accesslog'))
+        self.assertFalse(allow_migrate('default', 'account', 'accesslog'))
+        self.assertIsNone(allow_migrate('default', 'account', 'user'))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import SignupRouteCategory, UserRouteMap
+
+
+class SoftDeleteManagerTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+        self.alive = SignupRouteCategory.objects.create(name='search')
+        self.deleted = SignupRouteCategory.objects.create(name='friend')
+        self.deleted.soft_delete(by='admin@email.com')
+
+    def test_default_manager_hides_deleted(self):
+        self.assertEqual([self.alive], list(SignupRouteCategory.objects.all()))
+        self.assertEqual(2, SignupRouteCategory.all_objects.count())
+        self.assertEqual([self.deleted], list(SignupRouteCategory.all_objects.dead()))
+
+    def test_related_manager_hides_deleted(self):
+        route = UserRouteMap.objects.create(user=self.user, category=self.alive, description='a')
+        UserRouteMap.objects.create(user=self.user, category=self.alive, description='b').soft_delete()
+        self.assertEqual([route], list(self.user.routes.all()))
+
+    def test_soft_deleted_fk_still_resolves(self):
+        route = UserRouteMap.objects.create(user=self.user, category=self.deleted, description='a')
+        route = UserRouteMap.objects.get(pk=route.pk)
+        self.assertEqual(self.deleted, route.category)
+
+
+class PurgeDeletedCommandTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+        self.old = timezone.now() - timedelta(days=60)
+
+    def purge(self, **options):
+        call_command('purge_deleted', days=30, chunk_size=2, stdout=StringIO(), **options)
+
+    def test_old_tombstones_purged(self):
+        for i in range(5):
+            SignupRouteCategory.objects.create(name=str(i))
+        SignupRouteCategory.objects.filter(name__in=['0', '1', '2']).update(deleted=self.old)
+        SignupRouteCategory.objects.filter(name='3').soft_delete()
+
+        self.purge()
+        self.assertEqual(['3', '4'], sorted(SignupRouteCategory.all_objects.values_list('name', flat=True)))
+
+    def test_referenced_category_kept(self):
+        category = SignupRouteCategory.objects.create(name='search')
+        UserRouteMap.objects.create(user=self.user, category=category, description='a')
+        SignupRouteCategory.objects.filter(pk=category.pk).update(deleted=self.old)
+
+        self.purge()
+        self.assertTrue(SignupRouteCategory.all_objects.filter(pk=category.pk).exists())
+        self.assertEqual(1, UserRouteMap.objects.count())
+
+    def test_dry_run_keeps_rows(self):
+        SignupRouteCategory.objects.create(name='search', deleted=self.old)
+        self.purge(dry_run=True)
+        self.assertEqual(1, SignupRouteCategory.all_objects.count())
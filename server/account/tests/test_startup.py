@@ -0,0 +1,23 @@
+from django.test import TestCase
+from django.urls import get_resolver
+
+from ..management.commands.profile_startup import parse_importtime
+from ..startup import warm_up
+
+
+class StartupTests(TestCase):
+    def test_warm_up_makes_no_queries(self):
+        # safe to run in a preloading master, before workers are forked
+        with self.assertNumQueries(0):
+            warm_up()
+        self.assertIn('account', get_resolver().namespace_dict)
+
+    def test_parse_importtime(self):
+        output = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 |     numpy.core',
+            'import time:       250 |        350 |   numpy',
+            'import time:      1000 |       1000 | django',
+            'some other output',
+        ])
+        self.assertEqual({'numpy': 0.00035, 'django': 0.001}, parse_importtime(output))
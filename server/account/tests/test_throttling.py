@@ -0,0 +1,120 @@
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..throttling import LoginThrottle, login_attempt, login_throttle
+
+
+LOGIN_USER_API = reverse('account:login')
+
+
+@override_settings(LOGIN_THROTTLE_RATES={'email': (3, 60), 'ip': (5, 60)})
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        self.throttle = LoginThrottle(key_prefix='account:test-throttle:{}:'.format(uuid.uuid4().hex))
+        # the start of a window
+        self.now = 1000 * 60.0
+
+    def at(self, seconds):
+        return mock.patch('account.throttling.time.time', return_value=self.now + seconds)
+
+    def wait(self, attempt):
+        # counted as failed unless refunded
+        return self.throttle.count(attempt)[0]
+
+    def test_limit_per_scope(self):
+        attempt = {'email': 'user@email.com', 'ip': '10.0.0.1'}
+        with self.at(0):
+            for _ in range(3):
+                self.assertEqual(0, self.wait(attempt))
+            self.assertEqual(60, self.wait(attempt))
+            # other emails from the same IP are still allowed
+            self.assertEqual(0, self.wait({'email': 'other@email.com', 'ip': '10.0.0.1'}))
+
+    def test_sliding_window(self):
+        attempt = {'email': 'user@email.com'}
+        with self.at(30):
+            for _ in range(3):
+                self.wait(attempt)
+        # three failures half a window ago still count as 1.5
+        with self.at(90):
+            self.assertEqual(0, self.wait(attempt))
+            self.assertEqual(0, self.wait(attempt))
+            # 1.5 + 2, below the limit again once the previous window weighs less than 1
+            self.assertAlmostEqual(10, self.wait(attempt))
+        with self.at(101):
+            self.assertEqual(0, self.wait(attempt))
+
+    def test_local_block(self):
+        attempt = {'email': 'user@email.com'}
+        with self.at(0):
+            for _ in range(4):
+                self.wait(attempt)
+        with self.at(10), mock.patch('account.throttling.cache.get_many') as get_many:
+            self.assertEqual(50, self.wait(attempt))
+            get_many.assert_not_called()
+
+    def test_concurrent_attempts_count_each_other(self):
+        attempt = {'email': 'user@email.com'}
+        with self.at(0):
+            # none of them has finished authenticating yet
+            counted = [self.throttle.count(attempt) for _ in range(4)]
+        self.assertEqual([0, 0, 0], [wait for wait, _ in counted[:3]])
+        self.assertEqual((60, []), counted[3])
+
+    def test_refund(self):
+        attempt = {'email': 'user@email.com'}
+        with self.at(0):
+            for _ in range(5):
+                wait, counted = self.throttle.count(attempt)
+                self.assertEqual(0, wait)
+                # succeeded
+                self.throttle.refund(counted)
+
+    def test_attempt_keys(self):
+        request = RequestFactory().post(LOGIN_USER_API, HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.9')
+        self.assertEqual({'email': 'user@email.com', 'ip': '10.0.0.9'}, login_attempt(request, ' User@Email.com'))
+        self.assertEqual({'email': 'user@email.com'}, login_attempt(None, 'user@email.com'))
+
+
+class LoginApiThrottleTests(TestCase):
+    def setUp(self):
+        login_throttle.clear_local()
+        self.email = '{}@email.com'.format(uuid.uuid4().hex[:12])
+        self.user = get_user_model().objects.create_user(email=self.email, password='password')
+        self.client = APIClient(REMOTE_ADDR='10.{}.{}.{}'.format(*uuid.uuid4().bytes[:3]))
+
+    @override_settings(LOGIN_THROTTLE_RATES={'email': (2, 60), 'ip': (100, 60)})
+    def test_failed_logins_are_throttled_before_authentication(self):
+        for _ in range(2):
+            res = self.client.post(LOGIN_USER_API, {'email': self.email, 'password': 'wrong'})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with mock.patch('account.serializers.user.authenticate') as authenticate:
+            res = self.client.post(LOGIN_USER_API, {'email': self.email.upper(), 'password': 'password'})
+            authenticate.assert_not_called()
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+
+    @override_settings(LOGIN_THROTTLE_RATES={'email': (100, 60), 'ip': (2, 60)})
+    def test_per_ip(self):
+        for i in range(2):
+            self.client.post(LOGIN_USER_API, {'email': 'nobody{}@email.com'.format(i), 'password': 'wrong'})
+        res = self.client.post(LOGIN_USER_API, {'email': self.email, 'password': 'password'})
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        other_client = APIClient(REMOTE_ADDR='10.255.{}.{}'.format(*uuid.uuid4().bytes[:2]))
+        res = other_client.post(LOGIN_USER_API, {'email': self.email, 'password': 'password'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(LOGIN_THROTTLE_RATES={'email': (2, 60), 'ip': (100, 60)})
+    def test_successful_logins_are_not_counted(self):
+        for _ in range(3):
+            res = self.client.post(LOGIN_USER_API, {'email': self.email, 'password': 'password'})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -1,15 +1,27 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import RefreshTokenClaim
+from ..revocation import RevokedTokenSet, claim_token, is_token_revoked
 
 
 REGISTER_USER_API = reverse('account:register')
 LOGIN_USER_API = reverse('account:login')
 VERIFY_TOKEN_API = reverse('account:token_verify')
 REFRESH_TOKEN_API = reverse('account:token_refresh')
+REVOKE_TOKEN_API = reverse('account:token_revoke')
 USER_INFO_API = reverse('account:me')
 
 
@@ -100,3 +112,89 @@ class UserTokenGenerationTest(TestCase):
         self.client.credentials()
         res = self.client.get(USER_INFO_API)
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenRevocationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(**USER_PAYLOAD)
+        res = self.client.post(LOGIN_USER_API, USER_PAYLOAD)
+        self.refreshtoken = res.data.get('tokens').get('refresh')
+
+    def test_refresh_token_rotated(self):
+        res = self.client.post(REFRESH_TOKEN_API, { 'refresh': self.refreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        newrefreshtoken = res.data.get('refresh')
+        self.assertNotEqual(self.refreshtoken, newrefreshtoken)
+
+        # used refresh token is revoked
+        res = self.client.post(REFRESH_TOKEN_API, { 'refresh': self.refreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(VERIFY_TOKEN_API, { 'token': self.refreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # rotated one still works
+        res = self.client.post(REFRESH_TOKEN_API, { 'refresh': newrefreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_claim_once(self):
+        refresh = RefreshToken(self.refreshtoken)
+        self.assertTrue(claim_token(refresh))
+        self.assertTrue(is_token_revoked(refresh))
+        self.assertFalse(claim_token(refresh))
+
+    def test_claim_does_not_rely_on_cache(self):
+        refresh = RefreshToken(self.refreshtoken)
+        # a concurrent refresh which passed the revocation check before the first claim landed
+        with mock.patch('account.revocation.is_token_revoked', return_value=False):
+            self.assertTrue(claim_token(refresh))
+            self.assertFalse(claim_token(refresh))
+        self.assertEqual(1, RefreshTokenClaim.objects.filter(jti=refresh['jti']).count())
+
+    def test_purge_expired_claims(self):
+        claim_token(RefreshToken(self.refreshtoken))
+        RefreshTokenClaim.objects.create(jti='expired', expires=timezone.now() - timedelta(seconds=1))
+        call_command('purge_token_claims', stdout=StringIO())
+        self.assertFalse(RefreshTokenClaim.objects.filter(jti='expired').exists())
+        self.assertEqual(1, RefreshTokenClaim.objects.count())
+
+    def test_revoke_refresh_token(self):
+        res = self.client.post(REVOKE_TOKEN_API, { 'refresh': self.refreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.post(REFRESH_TOKEN_API, { 'refresh': self.refreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ACCESS_LOG_POLICY=[{'url_name': 'account:token_verify', 'action': 'count'}])
+    def test_revocation_check_without_queries(self):
+        client = APIClient()
+        with self.assertNumQueries(0):
+            res = client.post(VERIFY_TOKEN_API, { 'token': self.refreshtoken })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class RevokedTokenSetTest(TestCase):
+    def test_contains_until_expired(self):
+        revoked = RevokedTokenSet()
+        revoked.add('jti', 4102444800)
+        self.assertTrue(revoked.contains('jti', 4102444800))
+        self.assertFalse(revoked.contains('other', 4102444800))
+
+    def test_add_reports_revoked(self):
+        jti = uuid.uuid4().hex
+        self.assertTrue(RevokedTokenSet().add(jti, 4102444800))
+        # e.g. revoked by another worker
+        self.assertFalse(RevokedTokenSet().add(jti, 4102444800))
+
+    def test_shared_between_processes(self):
+        RevokedTokenSet().add('shared-jti', 4102444800)
+        self.assertTrue(RevokedTokenSet().contains('shared-jti', 4102444800))
+
+    def test_compact_drops_expired_buckets(self):
+        revoked = RevokedTokenSet()
+        revoked.add('jti1', 4102444800)
+        revoked.add('jti2', 4102444800 + revoked.bucket_seconds)
+        self.assertEqual(2, len(revoked))
+
+        self.assertEqual(1, revoked.compact(now=4102444800 + revoked.bucket_seconds))
+        self.assertEqual(1, len(revoked))
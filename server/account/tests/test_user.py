@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.contrib.sessions.models import Session
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -97,6 +98,25 @@ class LoginUserTest(TestCase):
         self.assertIn('refresh', res.data['tokens'])
         self.assertIn('access', res.data['tokens'])
 
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_login_user_stateless(self):
+        with self.assertNumQueries(2):  # user, last_login update
+            res = self.client.post(LOGIN_USER_API, USER_PAYLOAD)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('sessionid', res.cookies)
+        self.assertEqual(0, Session.objects.count())
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    @override_settings(
+        ACCOUNT_STATELESS_LOGIN=False,
+        SCOPED_MIDDLEWARE={'': ['django.contrib.sessions.middleware.SessionMiddleware']},
+    )
+    def test_login_user_with_session(self):
+        res = self.client.post(LOGIN_USER_API, USER_PAYLOAD)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('sessionid', res.cookies)
+
     def test_login_user_fail(self):
         res = self.client.post(LOGIN_USER_API, {'email': 'randomemail@naver.com', 'password': 'notcorrect'})
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
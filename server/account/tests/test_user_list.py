@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..models import SignupRouteCategory, UserRouteMap
+
+
+USER_LIST_API = reverse('account:user-list')
+
+
+class UserListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@email.com',
+            password='password',
+        )
+        self.client.force_authenticate(self.admin_user)
+
+        joined = timezone.now() - timedelta(days=10)
+        self.users = []
+        for i in range(5):
+            user = get_user_model().objects.create_user(
+                email='user{}@email.com'.format(i),
+                password='password',
+                date_joined=joined,
+                is_verified=i % 2 == 0,
+            )
+            self.users.append(user)
+        # the newest users first, ties on date_joined broken by id
+        self.users.reverse()
+
+    def test_list_requires_staff(self):
+        self.client.force_authenticate(self.users[0])
+        res = self.client.get(USER_LIST_API)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cursor_pages_cover_all_users(self):
+        emails = []
+        url = USER_LIST_API + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['results']), 2)
+            emails += [user['email'] for user in res.data['results']]
+            url = res.data['next']
+
+        expected = [self.admin_user.email] + [user.email for user in self.users]
+        self.assertEqual(expected, emails)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(USER_LIST_API, {'cursor': 'garbage'})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_is_verified(self):
+        res = self.client.get(USER_LIST_API, {'is_verified': 'true'})
+        self.assertEqual(3, len(res.data['results']))
+
+    def test_filter_date_range(self):
+        res = self.client.get(USER_LIST_API, {
+            'joined_before': (timezone.now() - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        self.assertEqual(5, len(res.data['results']))
+
+    def test_filter_route(self):
+        category = SignupRouteCategory.objects.create(name='search')
+        UserRouteMap.objects.create(user=self.users[0], category=category, description='a')
+        UserRouteMap.objects.create(user=self.users[0], category=category, description='b')
+
+        res = self.client.get(USER_LIST_API, {'route': category.pk})
+        self.assertEqual([self.users[0].email], [user['email'] for user in res.data['results']])
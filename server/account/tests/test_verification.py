@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..verification import (
+    make_email_verification_token,
+    make_password_reset_token,
+    read_email_verification_token,
+)
+
+
+def email_verify_url(email, token):
+    return reverse('account:email-verify', args=[email, token])
+
+
+def new_password_url(email, token):
+    return reverse('account:new-password', args=[email, token])
+
+
+class EmailVerificationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+
+    @override_settings(ACCESS_LOG_POLICY=[{'action': 'count'}])
+    def test_verify_email_success(self):
+        token = make_email_verification_token(self.user)
+        with self.assertNumQueries(1):
+            res = self.client.get(email_verify_url(self.user.email, token))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({'id': self.user.pk, 'email': self.user.email, 'is_verified': True}, res.json())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+
+    def test_verify_email_other_email_fails(self):
+        token = make_email_verification_token(self.user)
+        res = self.client.get(email_verify_url('user2@email.com', token))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_verify_email_tampered_token_fails(self):
+        token = make_email_verification_token(self.user)
+        res = self.client.get(email_verify_url(self.user.email, token[:-1] + 'x'))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(EMAIL_VERIFICATION_TOKEN_MAX_AGE=timedelta(seconds=-1))
+    def test_expired_token_rejected(self):
+        token = make_email_verification_token(self.user)
+        self.assertIsNone(read_email_verification_token(token, self.user.email))
+
+    def test_password_reset_token_not_accepted(self):
+        token = make_password_reset_token(self.user)
+        self.assertIsNone(read_email_verification_token(token, self.user.email))
+
+
+class PasswordResetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@email.com',
+            password='password',
+        )
+
+    def test_reset_password_success(self):
+        token = make_password_reset_token(self.user)
+        res = self.client.post(new_password_url(self.user.email, token), {'new_password': 'password2'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('password2'))
+
+    def test_reset_password_token_is_single_use(self):
+        token = make_password_reset_token(self.user)
+        self.client.post(new_password_url(self.user.email, token), {'new_password': 'password2'})
+        res = self.client.post(new_password_url(self.user.email, token), {'new_password': 'password3'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('password2'))
+
+    def test_email_verification_token_not_accepted(self):
+        token = make_email_verification_token(self.user)
+        res = self.client.post(new_password_url(self.user.email, token), {'new_password': 'password2'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,115 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError
+from django.db.models import QuerySet
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from ..flushing import PeriodicFlusher
+from ..models import AccessLog, VisitorSketch
+from ..sketches import HyperLogLog
+from ..visitors import VisitorCounter, visitor_counter, unique_visitors, rebuild_rollups
+
+
+VISITORS_API = reverse('account:visitors')
+EMAIL_CHECK_API = reverse('account:email-check')
+
+
+class VisitorCounterTests(TestCase):
+    def setUp(self):
+        self.counter = VisitorCounter()
+
+    def observe(self, date, count, offset=0):
+        for i in range(offset, offset + count):
+            self.counter.observe(date, '10.0.{}.{}'.format(*divmod(i, 256)), i + 1)
+
+    def test_flush_merges_into_rollups(self):
+        self.observe('2020-01-01', 3000)
+        self.observe('2020-01-02', 10)
+        self.assertEqual(4, self.counter.flush())
+        self.assertEqual(4, VisitorSketch.objects.count())
+
+        # another worker saw an overlapping set of visitors
+        other = VisitorCounter()
+        for i in range(2000, 4000):
+            other.observe('2020-01-01', '10.0.{}.{}'.format(*divmod(i, 256)), i + 1)
+        other.flush()
+        self.assertEqual(4, VisitorSketch.objects.count())
+
+        visitors = unique_visitors(date(2020, 1, 1), date(2020, 1, 31))
+        first, second = visitors['days']
+        self.assertAlmostEqual(4000, first['ip_addr'], delta=120)
+        self.assertAlmostEqual(4000, first['user'], delta=120)
+        self.assertEqual({'date': '2020-01-02', 'ip_addr': 10, 'user': 10}, second)
+        self.assertAlmostEqual(4000, visitors['total']['ip_addr'], delta=120)
+
+    def test_nothing_is_written_until_flushed(self):
+        with self.assertNumQueries(0):
+            self.observe('2020-01-01', 2000)
+        self.assertFalse(VisitorSketch.objects.exists())
+        self.assertEqual(0, VisitorCounter().flush())
+
+    def test_failed_flush_is_retried(self):
+        self.observe('2020-01-01', 10)
+        with mock.patch('account.visitors.merge_into_rollup', side_effect=DatabaseError), \
+                self.assertLogs('account.visitors', 'ERROR'):
+            self.assertEqual(0, self.counter.flush())
+        self.observe('2020-01-01', 10, offset=10)
+        self.assertEqual(2, self.counter.flush())
+        registers = VisitorSketch.objects.get(date='2020-01-01', dimension=VisitorSketch.IP_ADDR).registers
+        self.assertEqual(20, HyperLogLog.from_bytes(bytes(registers)).count())
+
+    def test_lost_row_race_is_retried(self):
+        self.observe('2020-01-01', 10)
+        # the row keeps being created by others, the sketch is kept rather than dropped
+        with mock.patch.object(QuerySet, 'create', side_effect=IntegrityError), \
+                self.assertLogs('account.visitors', 'ERROR'):
+            self.assertEqual(0, self.counter.flush())
+        self.assertEqual(2, self.counter.flush())
+
+    def test_flusher_survives_errors(self):
+        flush = mock.Mock(side_effect=[ValueError, None])
+        flusher = PeriodicFlusher(flush, 60, 'test-flusher')
+        with self.assertLogs('account.flushing', 'ERROR'):
+            flusher.run_once()
+        flusher.run_once()
+        self.assertEqual(2, flush.call_count)
+
+    def test_middleware_feeds_counter(self):
+        visitor_counter.take()
+        Client(REMOTE_ADDR='10.0.0.7').get(EMAIL_CHECK_API, {'email': 'user@email.com'})
+        sketches = visitor_counter.take()
+        self.assertEqual(1, sketches[timezone.localdate().isoformat(), VisitorSketch.IP_ADDR].count())
+
+    def test_rebuild_rollups(self):
+        for i in range(5):
+            AccessLog.objects.create(
+                created_date='2020-01-01', created_month='2020-01', request_method='GET',
+                ip_addr='10.0.0.{}'.format(i % 3),
+            )
+        self.assertEqual(2, rebuild_rollups(date(2020, 1, 1), date(2020, 1, 2)))
+        visitors = unique_visitors(date(2020, 1, 1), date(2020, 1, 2))
+        self.assertEqual({'ip_addr': 3, 'user': 0}, visitors['total'])
+
+        out = StringIO()
+        call_command('unique_visitors', '--since', '2020-01-01', '--until', '2020-01-02', stdout=out)
+        self.assertIn('2020-01-01', out.getvalue())
+
+    def test_api_requires_staff(self):
+        user = get_user_model().objects.create_user(email='user1@email.com', password='password')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + user.tokens['access'])
+        self.assertEqual(status.HTTP_403_FORBIDDEN, client.get(VISITORS_API).status_code)
+
+        admin_user = get_user_model().objects.create_superuser(email='admin@email.com', password='password')
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + admin_user.tokens['access'])
+        res = client.get(VISITORS_API, {'since': '2020-01-01', 'until': '2020-01-31'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({'ip_addr': 0, 'user': 0}, res.data['total'])
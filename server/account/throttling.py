@@ -0,0 +1,139 @@
+"""
+Sliding window throttling of failed logins, per email and per client IP.
+
+Failures are counted in the shared cache in fixed windows. The count over
+the last `window` seconds is estimated from the current and the previous
+window, weighting the previous one by how much of it still overlaps the
+sliding window. Attempts over the limit are rejected before `authenticate`
+runs, so they do not cost a password hash.
+
+Every attempt is counted as a failure before it is checked, and refunded
+when it is rejected or succeeds. Concurrent attempts thereby see each
+other, so a parallel burst cannot pass the check before any of its
+failures are counted. The limit holds as far as the cache's `incr` is
+atomic (memcached, Redis); on the file or local memory cache concurrent
+increments may be lost, so there the limit is best-effort.
+
+Each process also remembers the keys it found over the limit, until they
+are expected to be allowed again, and rejects their attempts without
+asking the cache.
+"""
+import hashlib
+import time
+from threading import Lock
+from django.conf import settings
+from django.core.cache import cache
+from .middleware.tracking import make_ip_address_aware_request
+
+
+# (failed attempts, per seconds) by scope
+DEFAULT_LOGIN_THROTTLE_RATES = {
+    'email': (5, 15 * 60),
+    'ip': (100, 15 * 60),
+}
+
+# locally blocked keys kept before expired ones are dropped
+MAX_BLOCKED_KEYS = 10000
+
+
+def login_attempt(request, email):
+    """
+    Returns the throttled keys of a login attempt, by scope
+    """
+    attempt = {'email': (email or '').strip().lower()}
+    if request is not None:
+        make_ip_address_aware_request(request)
+        if request.ip_addr:
+            attempt['ip'] = request.ip_addr
+    return attempt
+
+
+class LoginThrottle:
+    def __init__(self, key_prefix='account:login-throttle:'):
+        self.key_prefix = key_prefix
+        self._lock = Lock()
+        self._blocked = {}
+
+    @property
+    def rates(self):
+        return getattr(settings, 'LOGIN_THROTTLE_RATES', DEFAULT_LOGIN_THROTTLE_RATES) or {}
+
+    def _window_keys(self, scope, key, window, now):
+        digest = hashlib.md5(key.encode()).hexdigest()
+        index = int(now // window)
+        base = '{}{}:{}:'.format(self.key_prefix, scope, digest)
+        return base + str(index - 1), base + str(index), now - index * window
+
+    def _block(self, scope, key, until):
+        with self._lock:
+            if len(self._blocked) >= MAX_BLOCKED_KEYS:
+                now = time.time()
+                self._blocked = {k: u for k, u in self._blocked.items() if u > now}
+            self._blocked[scope, key] = until
+
+    def _incr(self, key, window):
+        # kept while it is the current or the previous window
+        if cache.add(key, 1, 2 * window):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, 2 * window)
+            return 1
+
+    def count(self, attempt):
+        """
+        Counts the attempt as failed, returns (seconds until it would be
+        allowed, 0 when it is, counted keys). Allowed attempts which succeed
+        are refunded with `refund(counted keys)`, rejected ones already are.
+        """
+        now = time.time()
+        rates = {scope: self.rates[scope] for scope in attempt if scope in self.rates}
+        if not rates:
+            return 0, []
+
+        for scope in rates:
+            until = self._blocked.get((scope, attempt[scope]))
+            if until is not None and until > now:
+                return until - now, []
+
+        windows = {scope: self._window_keys(scope, attempt[scope], window, now) for scope, (_, window) in rates.items()}
+        counted = [windows[scope][1] for scope in rates]
+        currents = {scope: self._incr(windows[scope][1], window) for scope, (_, window) in rates.items()}
+        previous_counts = cache.get_many([previous for previous, _, _ in windows.values()])
+
+        wait = 0
+        for scope, (limit, window) in rates.items():
+            previous_key, _, elapsed = windows[scope]
+            # failures before this attempt
+            previous, current = previous_counts.get(previous_key, 0), currents[scope] - 1
+            if previous * (1 - elapsed / window) + current < limit:
+                continue
+            if current >= limit:
+                # the count can only drop below the limit in the next window
+                scope_wait = window - elapsed
+            else:
+                scope_wait = window * (1 - (limit - current) / previous) - elapsed
+            scope_wait = max(scope_wait, 1)
+            self._block(scope, attempt[scope], now + scope_wait)
+            wait = max(wait, scope_wait)
+
+        if wait:
+            self.refund(counted)
+            return wait, []
+        return 0, counted
+
+    def refund(self, counted):
+        for key in counted:
+            try:
+                cache.decr(key)
+            except ValueError:
+                # the window has expired meanwhile
+                pass
+
+    def clear_local(self):
+        with self._lock:
+            self._blocked = {}
+
+
+login_throttle = LoginThrottle()
@@ -2,17 +2,26 @@
 URLs for core app
 """
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 from .views import (
     router,
     RegisterView,
     LoginView,
     MeView,
+    MeProfileView,
+    UserListView,
+    UserDetailView,
     SendUserVerificationEmailView,
     VerifyUserEmailView,
     SendUserPasswordChangeEmailView,
     UpdateUserPasswordView,
     EmailCheckView,
+    TokenRefreshView,
+    TokenVerifyView,
+    TokenRevokeView,
+    JWKSView,
+    AccessLogStatsView,
+    AccessLogTailView,
+    VisitorsView,
 )
 
 
@@ -23,6 +32,9 @@ urlpatterns = router.urls + [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('me/', MeView.as_view(), name='me'),
+    path('me/profile/', MeProfileView.as_view(), name='me-profile'),
+    path('users/', UserListView.as_view(), name='user-list'),
+    path('users/<int:pk>/', UserDetailView.as_view(), name='user-detail'),
     path('request-email-verification/', SendUserVerificationEmailView.as_view(), name='request-email-verification'),
     path('email-verify/<str:email>/<str:token>/', VerifyUserEmailView.as_view(), name='email-verify'),
     path('reset-password/', SendUserPasswordChangeEmailView.as_view(), name='reset-password'),
@@ -30,4 +42,9 @@ urlpatterns = router.urls + [
     path('email-check/', EmailCheckView.as_view(), name='email-check'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
+    path('.well-known/jwks.json', JWKSView.as_view(), name='jwks'),
+    path('access-logs/stats/', AccessLogStatsView.as_view(), name='access-log-stats'),
+    path('access-logs/tail/', AccessLogTailView.as_view(), name='access-log-tail'),
+    path('access-logs/visitors/', VisitorsView.as_view(), name='visitors'),
 ]
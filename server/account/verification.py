@@ -0,0 +1,60 @@
+"""
+Signed, expiring tokens for email verification and password reset links.
+
+Tokens carry everything needed to check them, so verifying a link does not
+touch the database. A password reset token also carries a fingerprint of the
+current password hash, which makes it single-use: once the password changes,
+the fingerprint no longer matches.
+"""
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+
+EMAIL_VERIFICATION_SALT = 'account.verification.email'
+PASSWORD_RESET_SALT = 'account.verification.password-reset'
+
+
+def password_fingerprint(user):
+    return salted_hmac(PASSWORD_RESET_SALT, user.password).hexdigest()[:16]
+
+
+def make_email_verification_token(user):
+    return signing.dumps({'u': user.pk, 'e': user.email}, salt=EMAIL_VERIFICATION_SALT)
+
+
+def make_password_reset_token(user):
+    return signing.dumps(
+        {'u': user.pk, 'e': user.email, 'p': password_fingerprint(user)},
+        salt=PASSWORD_RESET_SALT,
+    )
+
+
+def _load(token, email, salt, max_age):
+    try:
+        payload = signing.loads(token, salt=salt, max_age=max_age)
+    except signing.BadSignature:  # also raised when expired
+        return None
+    if not isinstance(payload, dict) or payload.get('e') != email:
+        return None
+    return payload
+
+
+def read_email_verification_token(token, email):
+    """
+    Returns the pk of the user to be verified, or None if the token is invalid
+    """
+    payload = _load(token, email, EMAIL_VERIFICATION_SALT, settings.EMAIL_VERIFICATION_TOKEN_MAX_AGE)
+    return payload and payload['u']
+
+
+def read_password_reset_token(token, email):
+    """
+    Returns the token payload, or None if the token is invalid.
+    Check it against the user with `password_reset_token_matches`.
+    """
+    return _load(token, email, PASSWORD_RESET_SALT, settings.PASSWORD_RESET_TOKEN_MAX_AGE)
+
+
+def password_reset_token_matches(payload, user):
+    return user.pk == payload['u'] and constant_time_compare(payload['p'], password_fingerprint(user))
@@ -1,14 +1,38 @@
 from rest_framework import routers
+from .analytics import (
+    AccessLogStatsView,
+    AccessLogTailView,
+    VisitorsView,
+)
+from .category import (
+    SignupRouteCategoryViewSet,
+    DropoutReasonCategoryViewSet,
+)
+from .token import (
+    TokenRefreshView,
+    TokenVerifyView,
+    TokenRevokeView,
+    JWKSView,
+)
 from .user import (
     RegisterView,
     LoginView,
     MeView,
+    MeProfileView,
+    UserListView,
+    UserDetailView,
     SendUserVerificationEmailView,
     VerifyUserEmailView,
     SendUserPasswordChangeEmailView,
     UpdateUserPasswordView,
     EmailCheckView,
+    UserRouteMapViewSet,
+    UserDropoutReasonMapViewSet,
 )
 
 
 router = routers.DefaultRouter()
+router.register('signup-route-categories', SignupRouteCategoryViewSet)
+router.register('dropout-reason-categories', DropoutReasonCategoryViewSet)
+router.register('me/routes', UserRouteMapViewSet, basename='route')
+router.register('me/dropout-reasons', UserDropoutReasonMapViewSet, basename='dropout-reason')
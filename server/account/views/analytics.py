@@ -0,0 +1,141 @@
+import json
+import os
+import time
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..analytics import summarize
+from ..livetail import live_tail, matches
+from ..middleware.policy import compile_status
+from ..renderers import JSONRenderer, EventStreamRenderer
+from ..serializers import PeriodQuerySerializer, AccessLogStatsQuerySerializer, AccessLogTailQuerySerializer
+from ..visitors import unique_visitors
+
+
+class AccessLogStatsView(APIView):
+    """
+    Access log statistics of a period, the last 7 days by default
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        serializer = AccessLogStatsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(summarize(**serializer.validated_data))
+
+
+class VisitorsView(APIView):
+    """
+    Estimated distinct IP addresses and users of a period, this month by default
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        serializer = PeriodQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(unique_visitors(**serializer.validated_data))
+
+
+class TailSubscription:
+    """
+    Streamed content of a live tail, which unsubscribes when the response is
+    closed, even if it was never iterated
+    """
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.events.close()
+            live_tail.unsubscribe()
+
+
+class AccessLogTailView(APIView):
+    """
+    Requests of all workers as they happen, as Server-Sent Events.
+
+    Filtered by `status` (code or class like '5xx'), `uri` (path prefix),
+    `user` and `method`. A stream holds a server thread, so it needs a
+    threaded server (see gunicorn.conf.py), at most LIVE_TAIL_MAX_SUBSCRIBERS
+    streams are served per worker, and each ends after LIVE_TAIL_MAX_SECONDS.
+    EventSource resumes it from Last-Event-ID when it reconnects to the same
+    worker. A client which falls behind the buffer gets a 'dropped' event
+    and is disconnected.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+    renderer_classes = (JSONRenderer, EventStreamRenderer)
+    poll_interval = 0.25
+    keepalive_interval = 15
+
+    def get(self, request):
+        serializer = AccessLogTailQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+
+        if not request.META.get('wsgi.multithread'):
+            # a stream would take the whole worker
+            return Response(
+                {'detail': 'The live tail needs threaded workers.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        if not live_tail.subscribe(limit=getattr(settings, 'LIVE_TAIL_MAX_SUBSCRIBERS', 2)):
+            return Response(
+                {'detail': 'Too many live tails on this worker.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '10'},
+            )
+
+        response = StreamingHttpResponse(
+            TailSubscription(self.stream(
+                statuses=compile_status(filters['status']) if 'status' in filters else None,
+                prefix=filters.get('uri'),
+                user=filters.get('user'),
+                method=filters.get('method'),
+                after=self.resume_after(request),
+            )),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # nginx would buffer the stream otherwise
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def resume_after(self, request):
+        # event ids are '<pid>:<sequence>', sequences of another worker mean nothing here
+        try:
+            pid, seq = request.META['HTTP_LAST_EVENT_ID'].split(':')
+            if int(pid) == os.getpid():
+                return int(seq)
+        except (KeyError, ValueError):
+            pass
+        return None
+
+    def stream(self, after=None, **filters):
+        buffer = live_tail.buffer
+        cursor = buffer.last if after is None or after > buffer.last else after
+        deadline = time.monotonic() + getattr(settings, 'LIVE_TAIL_MAX_SECONDS', 300)
+        last_write = time.monotonic()
+        yield 'retry: 2000\n\n'
+
+        while time.monotonic() < deadline:
+            records, cursor, lost = buffer.read(cursor)
+            if lost:
+                yield 'event: dropped\ndata: {}\n\n'
+                return
+            events = [
+                'id: {}:{}\ndata: {}\n\n'.format(os.getpid(), seq, json.dumps(record))
+                for seq, record in records if matches(record, **filters)
+            ]
+            if events:
+                yield ''.join(events)
+                last_write = time.monotonic()
+            elif time.monotonic() - last_write >= self.keepalive_interval:
+                # also finds out about clients which are gone
+                yield ': keepalive\n\n'
+                last_write = time.monotonic()
+            time.sleep(self.poll_interval)
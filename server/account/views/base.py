@@ -1,14 +1,20 @@
-from django.utils import timezone
-from rest_framework import viewsets
+from rest_framework import permissions, viewsets
 
 
 class BaseModelViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
-        instance.deleted = timezone.now()
+        deleted_by = ''
         try:
             user = self.request.user
             if user.is_authenticated:
-                instance.deleted_by = user.email
+                deleted_by = user.email
         except KeyError:
             pass
-        instance.save()
+        instance.soft_delete(by=deleted_by)
+
+
+class IsAdminOrReadOnly(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return bool(request.user and request.user.is_staff)
@@ -0,0 +1,44 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from ..conditional import ConditionalGetMixin
+from ..models import SignupRouteCategory, DropoutReasonCategory
+from ..registry import signup_route_categories, dropout_reason_categories
+from ..serializers import SignupRouteCategorySerializer, DropoutReasonCategorySerializer
+from .base import BaseModelViewSet, IsAdminOrReadOnly
+
+
+class CategoryViewSet(ConditionalGetMixin, BaseModelViewSet):
+    """
+    Reads are served from the in-memory category registry, and tagged with its version
+    """
+    registry = None
+    permission_classes = (IsAdminOrReadOnly,)
+
+    def get_etag(self, request, user_id):
+        return '{}-{}'.format(self.registry.model._meta.model_name, self.registry.loaded_version())
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.registry.all(), many=True)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            category = self.registry.get(int(kwargs[self.lookup_field]))
+        except ValueError:
+            category = None
+        if category is None:
+            raise NotFound()
+        serializer = self.get_serializer(category)
+        return Response(serializer.data)
+
+
+class SignupRouteCategoryViewSet(CategoryViewSet):
+    queryset = SignupRouteCategory.objects.all()
+    serializer_class = SignupRouteCategorySerializer
+    registry = signup_route_categories
+
+
+class DropoutReasonCategoryViewSet(CategoryViewSet):
+    queryset = DropoutReasonCategory.objects.all()
+    serializer_class = DropoutReasonCategorySerializer
+    registry = dropout_reason_categories
@@ -0,0 +1,37 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenViewBase
+from .. import keys
+from ..serializers import (
+    RotatingTokenRefreshSerializer,
+    RevocationAwareTokenVerifySerializer,
+    TokenRevokeSerializer,
+)
+
+
+class TokenRefreshView(TokenViewBase):
+    """
+    Rotates the refresh token, revoking the one which was used
+    """
+    serializer_class = RotatingTokenRefreshSerializer
+
+
+class TokenVerifyView(TokenViewBase):
+    serializer_class = RevocationAwareTokenVerifySerializer
+
+
+class TokenRevokeView(TokenViewBase):
+    serializer_class = TokenRevokeSerializer
+
+
+class JWKSView(APIView):
+    """
+    Public keys for verifying tokens, in JSON Web Key Set format
+    """
+    permission_classes = ()
+    authentication_classes = ()
+
+    def get(self, request):
+        if keys.key_ring is None:
+            return Response({'keys': []})
+        return Response(keys.key_ring.jwks())
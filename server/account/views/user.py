@@ -1,18 +1,35 @@
 import os
 from django.conf import settings
-from django.contrib.auth import get_user_model, login
+from django.contrib.auth import get_user_model, login, user_logged_in
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.core.validators import validate_email
+from django.db.models import prefetch_related_objects
 from django.template.loader import render_to_string
 from rest_framework import generics, status, mixins, permissions
-from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from ..conditional import ConditionalGetMixin, user_version
+from ..deletion import request_deletion
+from ..filters import UserFilter
+from ..pagination import KeysetPagination
+from ..registry import signup_route_categories, dropout_reason_categories
+from ..verification import (
+    make_email_verification_token,
+    make_password_reset_token,
+    read_email_verification_token,
+    read_password_reset_token,
+    password_reset_token_matches,
+)
 from ..serializers import (
     UserSerializer,
+    UserListSerializer,
     UpdateUserPasswordSerializer,
     LoginSerializer,
+    UserRouteMapSerializer,
+    UserDropoutReasonMapSerializer,
+    UserProfileSerializer,
 )
+from .base import BaseModelViewSet
 
 
 # hard coded first, but fix later once we have frontend
@@ -43,7 +60,7 @@ def send_verify_email_request(recepient, token, request):
 
 def send_password_change_email_request(recepient, token, request):
     host = os.environ.get('{}_WEB_HOST'.format(settings.ENVVAR_PREFIX), 'http://localhost:3000')
-    body = '{host}/user/new-password/{recepient}/{token}'.format(host, recepient, token)
+    body = '{host}/user/new-password/{recepient}/{token}'.format(host=host, recepient=recepient, token=token)
     email = EmailMessage('Activate your account', body, to=[recepient])
     email.send()
 
@@ -57,20 +74,31 @@ class LoginView(generics.GenericAPIView, mixins.CreateModelMixin):
     serializer_class = LoginSerializer
 
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         user = serializer.validated_data.get('user')
-        login(request, user)
+        if getattr(settings, 'ACCOUNT_STATELESS_LOGIN', False):
+            # API clients authenticate with the returned JWT, so skip the session row,
+            # cookie and CSRF rotation. Receivers still run, which updates last_login
+            # with a single UPDATE.
+            user_logged_in.send(sender=user.__class__, request=request, user=user)
+        else:
+            login(request, user)
         user_serializer = UserSerializer(user)
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
 
-class MeView(generics.RetrieveUpdateAPIView):
+class MeView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = get_user_model().objects.all()
     serializer_class = UserSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
+    def get_etag(self, request, user_id):
+        if user_id is None:
+            return None
+        return 'me-{}-{}'.format(user_id, user_version(user_id).get())
+
     def get(self, request):
         serializer = self.serializer_class(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -87,14 +115,55 @@ class MeView(generics.RetrieveUpdateAPIView):
         except Exception as e:
             return Response({ 'updated': False, 'error': str(e) }, status=status.HTTP_400_BAD_REQUEST)
 
+    def delete(self, request):
+        # deactivated now, related rows are deleted in batches by run_account_deletions
+        job = request_deletion(request.user, by=request.user.email)
+        return Response({ 'deletion': job.pk, 'state': job.state }, status=status.HTTP_202_ACCEPTED)
+
+
+class MeProfileView(ConditionalGetMixin, generics.RetrieveAPIView):
+    serializer_class = UserProfileSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_etag(self, request, user_id):
+        if user_id is None:
+            return None
+        # routes and dropout reasons are shown with their categories
+        return 'profile-{}-{}-{}-{}'.format(
+            user_id,
+            user_version(user_id).get(),
+            signup_route_categories.version.get(),
+            dropout_reason_categories.version.get(),
+        )
+
+    def get_object(self):
+        # request.user is already loaded by authentication, only prefetch the relations
+        user = self.request.user
+        prefetch_related_objects([user], *get_user_model().objects.profile_lookups())
+        return user
+
+
+class UserListView(generics.ListAPIView):
+    queryset = get_user_model().objects.only(*UserListSerializer.Meta.fields)
+    serializer_class = UserListSerializer
+    permission_classes = (permissions.IsAdminUser,)
+    filterset_class = UserFilter
+    pagination_class = KeysetPagination
+
+
+class UserDetailView(generics.RetrieveAPIView):
+    queryset = get_user_model().objects.with_profile()
+    serializer_class = UserProfileSerializer
+    permission_classes = (permissions.IsAdminUser,)
+
 
 class SendUserVerificationEmailView(generics.GenericAPIView, mixins.CreateModelMixin):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        email_verify_token, created = Token.objects.get_or_create(user=self.request.user)
+        email_verify_token = make_email_verification_token(self.request.user)
         try:
-            send_verify_email_request(request.user.email, email_verify_token.key, request)
+            send_verify_email_request(request.user.email, email_verify_token, request)
             return Response(status=status.HTTP_200_OK)
         except:  # TODO: exception class를 구체화 해야 할 필요가 있음. (ex, SMTP 발송 실패)
             import traceback
@@ -103,29 +172,28 @@ class SendUserVerificationEmailView(generics.GenericAPIView, mixins.CreateModelM
 
 
 class VerifyUserEmailView(generics.GenericAPIView, mixins.RetrieveModelMixin, mixins.CreateModelMixin):
-    serializer_class = UserSerializer
-
     def get(self, request, *args, **kwargs):
         token = kwargs.get('token')
         email = kwargs.get('email')
-        user = Token.objects.get(key=token).user
-        if user.email != email:
+        user_id = read_email_verification_token(token, email)
+        if user_id is None:
             return Response({ "error": "Invalid url" }, status=status.HTTP_400_BAD_REQUEST)
 
-        user.is_verified = True
-        user.save()
-
-        serializer = self.serializer_class(user)
-        return Response(serializer.data)
+        # the signed token already proves the email, so only a single UPDATE is needed
+        updated = get_user_model().objects.filter(pk=user_id, email=email).update(is_verified=True)
+        if not updated:
+            return Response({ "error": "Invalid url" }, status=status.HTTP_400_BAD_REQUEST)
+        user_version(user_id).bump()
+        return Response({'id': user_id, 'email': email, 'is_verified': True})
 
 
 class SendUserPasswordChangeEmailView(generics.GenericAPIView, mixins.CreateModelMixin):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        passwordChangeToken = Token.objects.get_or_create(user=self.request.user)
+        password_change_token = make_password_reset_token(self.request.user)
         try:
-            send_password_change_email_request(self.request.user.email, passwordChangeToken[0].key, request)
+            send_password_change_email_request(self.request.user.email, password_change_token, request)
             return Response(status=status.HTTP_200_OK)
         except:  # TODO: exception class를 구체화 해야 할 필요가 있음. (ex, SMTP 발송 실패)
             return Response(status=status.HTTP_400_BAD_REQUEST)
@@ -139,14 +207,18 @@ class UpdateUserPasswordView(generics.GenericAPIView, mixins.CreateModelMixin):
         token = kwargs.get('token')
         email = kwargs.get('email')
 
-        user = Token.objects.get(key=token).user
-        if user.email != email:
+        payload = read_password_reset_token(token, email)
+        if payload is None:
             return Response({ "error": "Invalid url" }, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
+
+        user = self.get_queryset().filter(pk=payload['u']).first()
+        if user is None or not password_reset_token_matches(payload, user):
+            return Response({ "error": "Invalid url" }, status=status.HTTP_400_BAD_REQUEST)
         user.set_password(serializer.validated_data.get('new_password'))
-        user.save()
+        user.save(update_fields=['password'])
         user_serializer = UserSerializer(user)
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
@@ -162,3 +234,25 @@ class EmailCheckView(generics.GenericAPIView, mixins.RetrieveModelMixin):
         if get_user_model().objects.filter(email=email).exists():
             return Response({ 'available': False }, status=status.HTTP_400_BAD_REQUEST)
         return Response({ 'available': True }, status=status.HTTP_200_OK)
+
+
+class UserRouteMapViewSet(BaseModelViewSet):
+    serializer_class = UserRouteMapSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.request.user.routes.all()
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class UserDropoutReasonMapViewSet(BaseModelViewSet):
+    serializer_class = UserDropoutReasonMapSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.request.user.dropout_reasons.all()
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
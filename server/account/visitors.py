@@ -0,0 +1,183 @@
+"""
+Distinct visitors per day by IP address and user, with HyperLogLog sketches.
+
+TrackingMiddleware hands every request to `visitor_counter.observe()`,
+which only appends to an in-process buffer. Buffers are folded into
+in-process sketches once they grow, and a background thread merges the
+sketches into `VisitorSketch` rows every `VISITOR_SKETCH_FLUSH_INTERVAL`
+seconds, so the request path never writes to the database. Merging is a
+register-wise maximum, which makes it safe for any number of workers to
+flush into the same row.
+
+Visitors seen since the last flush are lost when a worker dies.
+"""
+import logging
+import threading
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, router, transaction
+from django.utils import timezone
+from .analytics import stream
+from .flushing import PeriodicFlusher
+from .models import AccessLog, VisitorSketch
+from .sketches import HyperLogLog
+
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = (VisitorSketch.IP_ADDR, VisitorSketch.USER)
+
+# buffered values per sketch before they are folded into it
+FOLD_SIZE = 1024
+
+
+def add_values(sketch, dimension, values):
+    if dimension == VisitorSketch.USER:
+        sketch.add_integers(np.asarray(values, dtype=np.int64))
+    else:
+        sketch.add_strings(values)
+
+
+def merge_into_rollup(date, dimension, sketch):
+    """
+    Merges a sketch into the stored sketch of a day
+    """
+    using = router.db_for_write(VisitorSketch)
+    rows = VisitorSketch.objects.using(using)
+    for attempt in range(2):
+        try:
+            with transaction.atomic(using=using):
+                row = rows.select_for_update().filter(date=date, dimension=dimension).first()
+                if row is None:
+                    rows.create(date=date, dimension=dimension, registers=sketch.to_bytes())
+                else:
+                    row.registers = HyperLogLog.from_bytes(bytes(row.registers)).merge(sketch).to_bytes()
+                    row.save(update_fields=['registers', 'updated'])
+            return
+        except IntegrityError:
+            # the row was created by another worker, merge into it
+            if attempt:
+                raise
+
+
+class VisitorCounter:
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self._sketches = {}
+        self._flusher = PeriodicFlusher(self.flush, flush_interval, 'visitor-sketch-flusher') if flush_interval else None
+
+    def observe(self, date, ip_addr, user_id):
+        with self._lock:
+            if ip_addr:
+                self._buffer(date, VisitorSketch.IP_ADDR, ip_addr)
+            if user_id:
+                self._buffer(date, VisitorSketch.USER, user_id)
+        if self._flusher is not None:
+            self._flusher.start()
+
+    def _buffer(self, date, dimension, value):
+        key = (date, dimension)
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(value)
+        if len(buffer) >= FOLD_SIZE:
+            self._fold(key)
+
+    def _fold(self, key):
+        buffer = self._buffers.pop(key, None)
+        if buffer:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = HyperLogLog()
+            add_values(sketch, key[1], buffer)
+
+    def take(self):
+        """
+        Returns the sketches observed since the last call, by (date, dimension)
+        """
+        with self._lock:
+            for key in list(self._buffers):
+                self._fold(key)
+            sketches, self._sketches = self._sketches, {}
+        return sketches
+
+    def restore(self, sketches):
+        with self._lock:
+            for key, sketch in sketches.items():
+                if key in self._sketches:
+                    sketch.merge(self._sketches[key])
+                self._sketches[key] = sketch
+
+    def flush(self):
+        """
+        Merges observed sketches into the rollup table, sketches which fail
+        to be stored are kept for the next flush
+        """
+        sketches = self.take()
+        failed = {}
+        for (date, dimension), sketch in sorted(sketches.items()):
+            try:
+                merge_into_rollup(date, dimension, sketch)
+            except DatabaseError:
+                logger.exception('Failed to store visitor sketch of %s (%s)', date, dimension)
+                failed[date, dimension] = sketch
+        if failed:
+            self.restore(failed)
+        return len(sketches) - len(failed)
+
+
+visitor_counter = VisitorCounter(getattr(settings, 'VISITOR_SKETCH_FLUSH_INTERVAL', None))
+
+
+def unique_visitors(since=None, until=None):
+    """
+    Returns estimated distinct IP addresses and users of [since, until]
+    (dates, inclusive) as a whole and per day, by default of this month
+    """
+    until = until or timezone.localdate()
+    since = since or until.replace(day=1)
+    days = {}
+    rows = VisitorSketch.objects.filter(date__gte=since.isoformat(), date__lte=until.isoformat())
+    for date, dimension, registers in rows.order_by('date').values_list('date', 'dimension', 'registers').iterator():
+        days.setdefault(date, {dimension: HyperLogLog() for dimension in DIMENSIONS})[dimension].merge(
+            HyperLogLog.from_bytes(bytes(registers))
+        )
+
+    total = {dimension: HyperLogLog() for dimension in DIMENSIONS}
+    per_day = []
+    for date, sketches in days.items():
+        for dimension, sketch in sketches.items():
+            total[dimension].merge(sketch)
+        per_day.append(dict(date=date, **{dimension: sketch.count() for dimension, sketch in sketches.items()}))
+    return {
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'total': {dimension: sketch.count() for dimension, sketch in total.items()},
+        'days': per_day,
+    }
+
+
+def rebuild_rollups(since, until, chunk_size=10000):
+    """
+    Rebuilds the stored sketches of [since, until] from access logs, returns
+    the number of rebuilt days. Requests which the access log policy only
+    counted are not in the logs, so rebuilt days may come out lower.
+    """
+    rebuilt = 0
+    date = since
+    while date <= until:
+        sketches = {dimension: HyperLogLog() for dimension in DIMENSIONS}
+        queryset = AccessLog.objects.filter(created_date=date.isoformat())
+        for ip_addrs, user_ids in stream(queryset, ('ip_addr', 'user_id'), chunk_size):
+            add_values(sketches[VisitorSketch.IP_ADDR], VisitorSketch.IP_ADDR, [ip for ip in ip_addrs if ip])
+            add_values(sketches[VisitorSketch.USER], VisitorSketch.USER, [pk for pk in user_ids if pk])
+        with transaction.atomic(using=router.db_for_write(VisitorSketch)):
+            for dimension, sketch in sketches.items():
+                VisitorSketch.objects.update_or_create(
+                    date=date.isoformat(), dimension=dimension, defaults={'registers': sketch.to_bytes()},
+                )
+        rebuilt += 1
+        date += timedelta(days=1)
+    return rebuilt
@@ -0,0 +1,56 @@
+"""
+gunicorn settings, `gunicorn -c gunicorn.conf.py` from this directory.
+
+The app is loaded once in the master (`preload_app`), including the
+warm-up of account.startup, and forked into the workers. gc.freeze()
+keeps the garbage collector from touching, and so copying, the objects
+the workers inherit.
+
+Live access log tail: /accounts/access-logs/tail/ (account.livetail)
+streams for up to LIVE_TAIL_MAX_SECONDS, which a sync worker can neither
+afford nor survive past its timeout, so the endpoint answers 503 on sync
+workers. To serve it, switch every worker to threads, e.g.
+SCAFFOLD_WORKER_CLASS=gthread SCAFFOLD_THREADS=4. This changes the server
+model of the whole app. Each open tail then holds one thread of its worker,
+at most LIVE_TAIL_MAX_SUBSCRIBERS of them per worker.
+"""
+import gc
+import multiprocessing
+import os
+
+
+wsgi_app = 'scaffold.wsgi:application'
+bind = os.environ.get('SCAFFOLD_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('SCAFFOLD_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+# sync workers unless configured otherwise, see "Live access log tail" above
+worker_class = os.environ.get('SCAFFOLD_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('SCAFFOLD_THREADS', 1))
+
+# recycle workers, spread so that they do not restart together
+max_requests = 1000
+max_requests_jitter = 100
+
+
+def when_ready(server):
+    # after the app was preloaded, before the first worker is forked
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    # connections must not be shared with the master or other workers
+    connections.close_all()
+
+
+def worker_exit(server, worker):
+    from account.accesscounts import access_counter
+    from account.activity import activity_tracker
+    from account.livetail import live_tail
+    from account.visitors import visitor_counter
+
+    visitor_counter.flush()
+    access_counter.flush()
+    activity_tracker.flush()
+    live_tail.close()
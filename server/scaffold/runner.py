@@ -0,0 +1,28 @@
+"""
+Test runner of the project, `TEST_RUNNER` in settings
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs tests against a cache of their own. The file based cache of
+    development outlives test runs, and throttles, claims and versions left
+    in it by earlier runs would leak into later ones.
+    """
+    cache_settings = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tests',
+        }
+    }
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES=self.cache_settings)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
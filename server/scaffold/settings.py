@@ -51,27 +51,74 @@ INSTALLED_APPS = [
     'corsheaders',
     'django_filters',
     'rest_framework',
-    'rest_framework.authtoken',
     # in-house apps
     'account',
 ]
 
 MIDDLEWARE = [
+    # resolves request.ip_addr, refuses denied clients before anything else runs
+    'account.middleware.IPAccessMiddleware',
     # high-order 3rd-party middlewares
     'corsheaders.middleware.CorsMiddleware',
     # django default middlewares
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    # 3rd-party middlewares
-    # in-house middlewares
-    'account.middleware.TrackingMiddleware',
+    # per-route middlewares, see SCOPED_MIDDLEWARE
+    'account.middleware.RouteScopedMiddleware',
 ]
 
+# Middleware chains by path prefix, the longest matching prefix wins
+SCOPED_MIDDLEWARE = {
+    # JWT-only API: no sessions, CSRF, messages or clickjacking headers
+    '/accounts/': [
+        'account.middleware.TrackingMiddleware',
+    ],
+    # static assets are not tracked
+    '/static/': [],
+    '': [
+        # django default middlewares
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+        # in-house middlewares
+        'account.middleware.TrackingMiddleware',
+    ],
+}
+
+# Which requests TrackingMiddleware logs, counts or samples (see account.middleware.policy).
+# The first matching rule wins, requests matching no rule are logged.
+ACCESS_LOG_POLICY = [
+    {'status': '5xx', 'action': 'log'},
+    {'min_latency': 500, 'action': 'log'},
+    {'url_name': 'account:token_verify', 'status': '2xx', 'action': 'sample', 'rate': 0.01},
+]
+
+# seconds between writes of in-process counts of requests the policy does not log (see account.accesscounts)
+ACCESS_COUNT_FLUSH_INTERVAL = 60
+
+# seconds between merges of in-process visitor sketches into the database (see account.visitors)
+VISITOR_SKETCH_FLUSH_INTERVAL = 60
+
+# seconds between writes of in-process last seen times, and the least seconds
+# between two writes of the same user's last seen time (see account.activity)
+ACTIVITY_FLUSH_INTERVAL = 60
+ACTIVITY_WRITE_INTERVAL = 300
+
+# Proxies whose X-Forwarded-For entries are believed, CIDRs (see account.networks).
+# Comma separated in the environment, e.g. the load balancer's subnet.
+TRUSTED_PROXIES = [
+    network for network in get_project_envvar('TRUSTED_PROXIES', '127.0.0.0/8,::1/128').split(',') if network.strip()
+]
+# When not empty, only clients in these CIDRs are served
+IP_ALLOW_LIST = []
+# Clients in these CIDRs are refused with 403
+IP_DENY_LIST = []
+
+# admin checks only look for its middlewares in MIDDLEWARE, they are in SCOPED_MIDDLEWARE['']
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = '{}.urls'.format(PROJECT_NAME)
 
 TEMPLATES = [
@@ -100,6 +147,7 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
     }
 }
 
@@ -112,9 +160,33 @@ DATABASES = {
 #         'NAME': get_project_envvar('DB_NAME', PROJECT_NAME),
 #         'USER': get_project_envvar('DB_USER', 'postgres'),
 #         'PASSWORD': get_project_envvar('DB_PASSWORD', 'postgres'),
+#         'CONN_MAX_AGE': 60,
 #     }
 # }
 
+# Read replicas of 'default' for users and categories (see account.routers), e.g.
+#     DATABASES['replica'] = {..., 'TEST': {'MIRROR': 'default'}}
+#     DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+# Alias access logs, their dictionaries and visitor sketches are stored in. Another
+# alias must be migrated separately: `manage.py migrate --database=<alias>`.
+ACCESS_LOG_DATABASE = 'default'
+
+DATABASE_ROUTERS = ['account.routers.PrimaryReplicaRouter']
+
+# Applied to every new SQLite connection (see account.db). WAL lets reads run
+# alongside the single writer, busy_timeout (ms) makes writers wait for the lock.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# seconds between health checks of a persistent connection, made at the start of a request
+DB_HEALTH_CHECK_INTERVAL = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -158,14 +230,39 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 AUTH_USER_MODEL = 'account.User'
 
+# Import the URLconf and warm resolver, template and DRF caches when the WSGI app loads (see account.startup)
+ACCOUNT_WARM_UP = get_project_envvar('WARM_UP', '1') == '1'
+
+# Log in through the API without creating a session (JWT only). When disabled,
+# SessionMiddleware must be added to the '/accounts/' chain of SCOPED_MIDDLEWARE.
+ACCOUNT_STATELESS_LOGIN = True
+
 
 # Django REST Framework
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.JWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # orjson backed, fall back to the stdlib json when it is not installed
+    'DEFAULT_RENDERER_CLASSES': (
+        'account.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'account.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+
+# failed logins allowed per email and per client IP, as (attempts, seconds),
+# over a sliding window (see account.throttling). Exact only with an atomic cache incr (memcached, Redis).
+LOGIN_THROTTLE_RATES = {
+    'email': (5, 15 * 60),
+    'ip': (100, 15 * 60),
 }
 
 
@@ -180,13 +277,21 @@ EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = 'no-reply@some-domain.com'
 SERVER_EMAIL = 'no-reply@some-domain.com'
 
+# lifetime of signed links (see account.verification)
+EMAIL_VERIFICATION_TOKEN_MAX_AGE = timedelta(days=3)
+PASSWORD_RESET_TOKEN_MAX_AGE = timedelta(hours=1)
+
 
 # simple jwt
 
+# With both ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION, a refresh token
+# is claimed by a unique insert into account_refresh_token_claims, as cache.add
+# is not atomic on the file based cache. Expired claims are deleted by the
+# purge_token_claims command. Other revocations only live in the cache.
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-    'ROTATE_REFRESH_TOKENS': False,
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
 
     'ALGORITHM': 'HS256',
@@ -209,6 +314,12 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Asymmetric signing with key ids (see account.keys), requires `cryptography`.
+# When set, ALGORITHM/SIGNING_KEY above are ignored: tokens are signed with the newest
+# `<kid>.key` in the directory and verified by `kid` against its `.key`/`.pub` files.
+JWT_KEYS_DIR = get_project_envvar('JWT_KEYS_DIR', None)
+JWT_KEYS_CHECK_INTERVAL = 30
+
 
 # django-cors-headers
 
@@ -264,3 +375,32 @@ CACHES = {
         'LOCATION': os.path.join(BASE_DIR, '_artifacts_/caches'),
     }
 }
+
+
+# tests run against a cache of their own (see scaffold.runner)
+TEST_RUNNER = 'scaffold.runner.TestRunner'
+
+
+# Access log archive
+
+# closed months moved out of the database by archive_access_logs (see account.archive)
+ACCESS_LOG_ARCHIVE_DIR = get_project_envvar('ACCESS_LOG_ARCHIVE_DIR', os.path.join(BASE_DIR, '_artifacts_/archive'))
+
+
+# Live access log tail
+
+# Unix datagram sockets of workers with live tail subscribers (see account.livetail),
+# empty to only tail the requests of the worker serving the stream
+LIVE_TAIL_DIR = get_project_envvar('LIVE_TAIL_DIR', os.path.join(BASE_DIR, '_artifacts_/livetail'))
+# requests kept per worker, subscribers falling further behind are disconnected
+LIVE_TAIL_BUFFER_SIZE = 4096
+# seconds before a stream is closed, EventSource reconnects
+LIVE_TAIL_MAX_SECONDS = 300
+# streams per worker, each holds one of its threads
+LIVE_TAIL_MAX_SUBSCRIBERS = 2
+
+
+# Category registry
+
+# seconds between checks of the shared registry version (see account.registry)
+CATEGORY_REGISTRY_CHECK_INTERVAL = 1
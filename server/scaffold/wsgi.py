@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'scaffold.settings')
 
 application = get_wsgi_application()
+
+# only for serving, not for management commands or tests (see account.startup)
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'ACCOUNT_WARM_UP', False):
+    from account.startup import warm_up
+    warm_up()